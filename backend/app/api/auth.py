@@ -13,7 +13,12 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.api.exceptions import raise_bad_request, raise_forbidden, raise_unauthorized
+from app.api.exceptions import (
+    raise_bad_request,
+    raise_forbidden,
+    raise_service_unavailable,
+    raise_unauthorized,
+)
 from app.database import get_db
 from app.models.practitioner import Practitioner
 from app.schemas.practitioner import (
@@ -22,10 +27,13 @@ from app.schemas.practitioner import (
     PractitionerResponse,
     TokenResponse,
 )
+from app.services.password_hasher import PasswordHasherOverloadedError, password_hasher
 from app.services.practitioner_service import PractitionerService
-from app.services.security import matches_registration_password, verify_password
+from app.services.security import matches_registration_password
+from app.observability.metrics import auth_metrics
+from app.observability.timing import TimedRoute, timed
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -48,15 +56,17 @@ async def get_current_practitioner(
     db: AsyncSession = Depends(get_db)
 ) -> Practitioner:
     """Dependency to get current authenticated practitioner."""
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        practitioner_id: str = payload.get("sub")
-        if practitioner_id is None:
+    with timed("auth"):
+        try:
+            payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+            practitioner_id: str = payload.get("sub")
+            if practitioner_id is None:
+                raise_unauthorized("Credenciales inválidas")
+        except jwt.InvalidTokenError:
             raise_unauthorized("Credenciales inválidas")
-    except jwt.InvalidTokenError:
-        raise_unauthorized("Credenciales inválidas")
 
-    practitioner = await PractitionerService(db).get_by_id(practitioner_id)
+        # Instantánea cacheada (TTL): ahorra una consulta en cada petición autenticada.
+        practitioner = await PractitionerService(db).get_for_auth(practitioner_id)
 
     if practitioner is None:
         raise_unauthorized("Credenciales inválidas")
@@ -68,7 +78,11 @@ async def get_current_practitioner(
     return practitioner
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post(
+    "/login",
+    response_model=TokenResponse,
+    responses={503: {"description": "Demasiados inicios de sesión simultáneos (ver Retry-After)"}},
+)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_db)
@@ -77,23 +91,32 @@ async def login(
     Login endpoint.
 
     Autentica al practitioner por email y contraseña verificando el `password_hash`
-    almacenado con bcrypt y devuelve un token JWT de acceso.
+    almacenado con bcrypt y devuelve un token JWT de acceso. bcrypt se ejecuta
+    en un pool de hilos acotado: una ráfaga de logins no bloquea el resto de la
+    API y, si la cola se llena, se responde 503 con Retry-After.
     """
     practitioner = await PractitionerService(db).get_by_email(form_data.username)
 
     # La verificación se ejecuta también cuando el email no existe para que el
     # tiempo de respuesta no revele qué perfiles están dados de alta.
-    password_ok = verify_password(
-        form_data.password,
-        practitioner.password_hash if practitioner else None,
-    )
+    try:
+        with timed("auth"), auth_metrics.password_check():
+            password_ok = await password_hasher.verify(
+                form_data.password,
+                practitioner.password_hash if practitioner else None,
+            )
+    except PasswordHasherOverloadedError as exc:
+        raise_service_unavailable(str(exc), exc.retry_after_seconds)
 
     if not practitioner or not password_ok:
+        auth_metrics.record_login("invalid_credentials")
         raise_unauthorized(INVALID_CREDENTIALS_DETAIL)
 
     if not practitioner.active:
+        auth_metrics.record_login("inactive")
         raise_unauthorized(INACTIVE_PROFILE_DETAIL)
 
+    auth_metrics.record_login("success")
     access_token = create_access_token(data={"sub": practitioner.id})
 
     return TokenResponse(
@@ -142,6 +165,8 @@ async def register_practitioner(
 
     try:
         practitioner = await service.create(payload.model_dump(exclude={"registration_password"}))
+    except PasswordHasherOverloadedError as exc:
+        raise_service_unavailable(str(exc), exc.retry_after_seconds)
     except ValueError as exc:
         raise_bad_request(str(exc))
 
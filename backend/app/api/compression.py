@@ -0,0 +1,194 @@
+"""
+ConsultaMed Backend - Compression Middleware
+
+Compresión negociada (brotli o gzip, según `Accept-Encoding`) de las
+respuestas de texto: listados de consultas con notas SOAP, ficha del paciente,
+plantillas. Es prosa en español muy repetitiva y suele quedarse en una fracción
+de su tamaño, lo que se nota en consultas con conexiones lentas.
+
+Solo se comprime:
+- contenido de tipo texto o JSON (los PDF de WeasyPrint ya llevan sus flujos
+  comprimidos con Flate; comprimirlos de nuevo gasta CPU para casi nada),
+- respuestas sin `Content-Encoding` previo y con cuerpo de al menos
+  `minimum_size` bytes (o en streaming, donde no se conoce el tamaño).
+
+El tiempo de compresión se suma a la fase `compress` de Server-Timing.
+"""
+import time
+import zlib
+from typing import Callable, Optional, Tuple
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.observability.timing import record_phase
+
+# Preferencia ante igual calidad (q) en Accept-Encoding: brotli comprime más
+SUPPORTED_ENCODINGS = ("br", "gzip")
+
+# Niveles para contenido dinámico: buena relación tamaño/CPU por respuesta
+BROTLI_QUALITY = 4
+GZIP_LEVEL = 6
+
+COMPRESSIBLE_MEDIA_TYPES = frozenset(
+    {
+        "application/json",
+        "application/problem+json",
+        "application/javascript",
+        "application/xml",
+        "image/svg+xml",
+    }
+)
+
+# Sin cuerpo que comprimir
+BODYLESS_STATUS = frozenset({204, 304})
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Codificación soportada preferida por el cliente, o None.
+
+    Respeta los valores q (`gzip;q=0` la excluye) y `*` para las codificaciones
+    no mencionadas; a igual q, el orden de `SUPPORTED_ENCODINGS`.
+    """
+    weights: dict[str, float] = {}
+    wildcard: Optional[float] = None
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "*":
+            wildcard = q
+        else:
+            weights[coding] = q
+
+    best: Optional[str] = None
+    best_q = 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        q = weights.get(coding, wildcard if wildcard is not None else 0.0)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    """True para texto y JSON (incluidos los tipos `+json`)."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type.endswith("+json")
+        or media_type in COMPRESSIBLE_MEDIA_TYPES
+    )
+
+
+class _Encoder:
+    """Compresor incremental con la misma interfaz para brotli y gzip."""
+
+    def __init__(self, coding: str) -> None:
+        self._process: Callable[[bytes], bytes]
+        self._flush: Callable[[], bytes]
+        self._finish: Callable[[], bytes]
+        if coding == "br":
+            compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._process = compressor.process
+            self._flush = compressor.flush
+            self._finish = compressor.finish
+        else:
+            gzip = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._process = gzip.compress
+            self._flush = lambda: gzip.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = gzip.flush
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        """Comprime un fragmento; en streaming vacía el compresor para no retener datos."""
+        started = time.perf_counter()
+        output = self._process(data) + (self._finish() if final else self._flush())
+        record_phase("compress", time.perf_counter() - started)
+        return output
+
+
+class CompressionMiddleware:
+    """
+    Args:
+        app: Aplicación ASGI envuelta.
+        minimum_size: Tamaño mínimo del cuerpo (bytes) para comprimir; por
+            debajo la cabecera extra y la CPU no compensan.
+    """
+
+    def __init__(self, app: ASGIApp, *, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        coding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message: Optional[Message] = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, encoder, passthrough
+            if message["type"] == "http.response.start":
+                # Se retiene hasta ver el primer fragmento del cuerpo
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body: bytes = message.get("body", b"")
+            more_body: bool = message.get("more_body", False)
+
+            if encoder is None:
+                assert start_message is not None
+                compress, headers = self._should_compress(start_message, coding, body, more_body)
+                if not compress:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                assert coding is not None
+                encoder = _Encoder(coding)
+                body = encoder.encode(body, final=not more_body)
+                headers["Content-Encoding"] = coding
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(start_message)
+            else:
+                body = encoder.encode(body, final=not more_body)
+
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _should_compress(
+        self, start_message: Message, coding: Optional[str], body: bytes, more_body: bool
+    ) -> Tuple[bool, MutableHeaders]:
+        """Decide si comprimir y anota `Vary` en las respuestas que podrían variar."""
+        headers = MutableHeaders(scope=start_message)
+        if not is_compressible(headers.get("content-type", "")):
+            return False, headers
+        headers.add_vary_header("Accept-Encoding")
+        if (
+            coding is None
+            or start_message["status"] in BODYLESS_STATUS
+            or "content-encoding" in headers
+        ):
+            return False, headers
+        return more_body or len(body) >= self.minimum_size, headers
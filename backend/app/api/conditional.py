@@ -0,0 +1,55 @@
+"""
+ConsultaMed Backend - Conditional GET Helpers
+
+ETags débiles e `If-None-Match` para las vistas que el frontend vuelve a pedir
+al montarse (ficha de paciente, consulta, plantillas).
+
+El endpoint calcula primero la versión de lo que devolvería (consulta pequeña,
+ver `app.services.row_version`) y, si coincide con la del cliente, responde 304
+sin cargar ni serializar nada. `Cache-Control: private, no-cache` hace que el
+navegador guarde la respuesta y la revalide siempre: el frontend no necesita
+cambios, el 304 le llega como la respuesta guardada.
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Response, status
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(*parts: Any) -> str:
+    """ETag débil (`W/"..."`) a partir de los valores que versionan la respuesta."""
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return f'W/"{hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Comparación débil de `If-None-Match` con `etag` (RFC 9110, 13.1.2).
+
+    Acepta listas separadas por comas y `*`.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == target
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    """Respuesta 304 sin cuerpo con el ETag vigente."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    """Añade el ETag y la política de revalidación a una respuesta 200."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
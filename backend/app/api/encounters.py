@@ -1,20 +1,36 @@
 """
 ConsultaMed Backend - Encounters Endpoints
 """
-from typing import Optional, List, cast
-from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy import func, select
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, List, cast
+from uuid import uuid4
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.api.auth import get_current_practitioner
-from app.api.exceptions import raise_not_found
+from app.api.conditional import etag_matches, not_modified, set_etag, weak_etag
+from app.api.exceptions import raise_bad_request, raise_not_found
+from app.api.responses import json_response
 from app.models.practitioner import Practitioner
 from app.models.patient import Patient
 from app.models.encounter import Encounter
 from app.models.condition import Condition
 from app.models.medication_request import MedicationRequest
+from app.services.pagination import (
+    InvalidCursorError,
+    PaginationMode,
+    TotalMode,
+    decode_cursor,
+    encode_cursor,
+    fetch_page,
+    keyset_predicate,
+)
+from app.services.row_version import row_set_version, row_version
+from app.services.subresource_sync import apply_sync, plan_sync
 
 # Schemas atómicos FHIR-compatible
 from app.schemas.encounter import (
@@ -23,8 +39,24 @@ from app.schemas.encounter import (
     EncounterResponse,
     EncounterListResponse,
 )
+from app.schemas.condition import ConditionResponse
+from app.schemas.medication import MedicationResponse
+from app.observability.timing import TimedRoute
+
+router = APIRouter(route_class=TimedRoute)
+
+ENCOUNTER_CURSOR_SCOPE = "encounters"
+
+# Columnas que el cliente controla en cada sub-recurso (contenido comparado en el diff)
+CONDITION_SYNC_FIELDS = ("code_text", "code_coding_code")
+MEDICATION_SYNC_FIELDS = ("medication_text", "dosage_text", "duration_value", "duration_unit")
+# Un cambio de fármaco es una prescripción nueva, no una edición de la anterior
+MEDICATION_SYNC_IDENTITY = ("medication_text",)
+# Índice de cada sub-recurso en la lista del cliente (el primer diagnóstico es el principal)
+SUBRESOURCE_ORDER_FIELD = "sort_order"
 
-router = APIRouter()
+# SQLSTATE de Postgres para foreign_key_violation
+FOREIGN_KEY_VIOLATION = "23503"
 
 
 # ============================================
@@ -109,46 +141,64 @@ def _apply_soap_fields(
     )
 
 
-def _create_conditions(
-    db: AsyncSession,
-    data: EncounterCreate | EncounterUpdate,
+def _condition_rows(
+    data: EncounterCreate,
     *,
     subject_id: str,
     encounter_id: str,
-) -> None:
-    """Crea recursos Condition vinculados a un Encounter."""
-    for cond_data in data.conditions:
-        db.add(Condition(
-            subject_id=subject_id,
-            encounter_id=encounter_id,
-            code_text=cond_data.code_text,
-            code_coding_code=cond_data.code_coding_code,
-        ))
-
-
-def _create_medications(
-    db: AsyncSession,
-    data: EncounterCreate | EncounterUpdate,
+) -> List[Dict[str, Any]]:
+    """Filas Condition de un Encounter nuevo, con ID generado en cliente."""
+    return [
+        {
+            "id": str(uuid4()),
+            "subject_id": subject_id,
+            "encounter_id": encounter_id,
+            "code_text": cond_data.code_text,
+            "code_coding_code": cond_data.code_coding_code,
+            "clinical_status": "active",
+            SUBRESOURCE_ORDER_FIELD: position,
+        }
+        for position, cond_data in enumerate(data.conditions)
+    ]
+
+
+def _medication_rows(
+    data: EncounterCreate,
     *,
     subject_id: str,
     encounter_id: str,
     requester_id: str,
-) -> None:
-    """Crea recursos MedicationRequest vinculados a un Encounter."""
-    for med_data in data.medications:
-        db.add(MedicationRequest(
-            subject_id=subject_id,
-            encounter_id=encounter_id,
-            requester_id=requester_id,
-            medication_text=med_data.medication_text,
-            dosage_text=med_data.dosage_text,
-            duration_value=med_data.duration_value,
-            duration_unit=med_data.duration_unit,
-        ))
+) -> List[Dict[str, Any]]:
+    """Filas MedicationRequest de un Encounter nuevo, con ID generado en cliente."""
+    return [
+        {
+            "id": str(uuid4()),
+            "subject_id": subject_id,
+            "encounter_id": encounter_id,
+            "requester_id": requester_id,
+            "medication_text": med_data.medication_text,
+            "dosage_text": med_data.dosage_text,
+            "duration_value": med_data.duration_value,
+            "duration_unit": med_data.duration_unit,
+            "status": "active",
+            SUBRESOURCE_ORDER_FIELD: position,
+        }
+        for position, med_data in enumerate(data.medications)
+    ]
+
+
+def _is_foreign_key_violation(exc: IntegrityError) -> bool:
+    """True si el error de integridad es una FK inexistente (SQLSTATE 23503)."""
+    return getattr(exc.orig, "sqlstate", None) == FOREIGN_KEY_VIOLATION
 
 
 async def _reload_encounter(db: AsyncSession, encounter_id: str) -> Encounter:
-    """Recarga un Encounter con sus relaciones (conditions, medications)."""
+    """
+    Recarga un Encounter con sus relaciones (conditions, medications).
+
+    `populate_existing` refresca las colecciones ya cargadas en la sesión, que
+    las sentencias masivas de `apply_sync` no actualizan.
+    """
     stmt = (
         select(Encounter)
         .options(
@@ -156,11 +206,28 @@ async def _reload_encounter(db: AsyncSession, encounter_id: str) -> Encounter:
             selectinload(Encounter.medications),
         )
         .where(Encounter.id == encounter_id)
+        .execution_options(populate_existing=True)
     )
     result = await db.execute(stmt)
     return result.scalar_one()
 
 
+async def _encounter_version(db: AsyncSession, encounter_id: str) -> Optional[Any]:
+    """
+    Versión de fila del Encounter y de sus sub-recursos (ETag de `get_encounter`).
+
+    Los sub-recursos se sincronizan por diff sin tocar la fila del Encounter,
+    así que entran en la versión por separado. None si la consulta no existe.
+    """
+    stmt = select(
+        row_version(Encounter.__tablename__),
+        row_set_version(Condition, Condition.encounter_id == encounter_id),
+        row_set_version(MedicationRequest, MedicationRequest.encounter_id == encounter_id),
+    ).where(Encounter.id == encounter_id)
+    result = await db.execute(stmt)
+    return result.one_or_none()
+
+
 # ============================================
 # Endpoints
 # ============================================
@@ -170,15 +237,27 @@ async def list_patient_encounters(
     patient_id: str,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    pagination: PaginationMode = Query(
+        "offset", description="offset (por defecto) o cursor (keyset, coste constante)"
+    ),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    total_mode: TotalMode = Query(
+        "window", description="window (exacto), estimate (planificador) o none (solo has_more)"
+    ),
     db: AsyncSession = Depends(get_db),
     current_user: Practitioner = Depends(get_current_practitioner),
-) -> EncounterListResponse:
+) -> Response:
     """
     List all encounters for a patient.
     
-    Returns encounters with conditions and medications.
+    Returns encounters with conditions and medications, newest first.
+    Paginated by offset (default) or keyset cursor over (period_start, id).
+    Total computed in the page query (`total_mode`), no separate COUNT.
     """
     await _ensure_patient_exists(db, patient_id)
+
+    mode: PaginationMode = "cursor" if cursor else pagination
+    sort_key = (Encounter.period_start, Encounter.id)
     
     # Get encounters with related data
     stmt = (
@@ -188,34 +267,66 @@ async def list_patient_encounters(
             selectinload(Encounter.medications),
         )
         .where(Encounter.subject_id == patient_id)
-        .order_by(Encounter.period_start.desc())
-        .limit(limit)
-        .offset(offset)
+        .order_by(Encounter.period_start.desc(), Encounter.id.desc())
     )
+
+    if mode == "cursor":
+        if cursor:
+            try:
+                after = decode_cursor(cursor, ENCOUNTER_CURSOR_SCOPE, (datetime, str))
+            except InvalidCursorError as e:
+                raise_bad_request(str(e))
+            stmt = stmt.where(keyset_predicate(sort_key, after, descending=True))
+        offset = 0
+
+    page = await fetch_page(
+        db,
+        stmt,
+        limit=limit,
+        offset=offset,
+        total_mode=total_mode,
+        seeking=mode == "cursor" and bool(cursor),
+    )
+    encounters: List[Encounter] = page.items
+
+    next_cursor = None
+    if mode == "cursor" and page.has_more:
+        last = encounters[-1]
+        next_cursor = encode_cursor(ENCOUNTER_CURSOR_SCOPE, (last.period_start, last.id))
     
-    result = await db.execute(stmt)
-    encounters = result.scalars().all()
-    
-    # Get total count
-    count_stmt = select(func.count(Encounter.id)).where(Encounter.subject_id == patient_id)
-    count_result = await db.execute(count_stmt)
-    total = int(count_result.scalar_one() or 0)
-    
-    return EncounterListResponse(
-        items=cast(List[EncounterResponse], list(encounters)),
-        total=total,
+    # Única validación: filas ORM -> EncounterResponse; se codifica sin revalidar
+    return json_response(
+        EncounterListResponse(
+            items=cast(List[EncounterResponse], encounters),
+            total=page.total,
+            next_cursor=next_cursor,
+            has_more=page.has_more,
+            total_is_estimate=page.total_is_estimate,
+        )
     )
 
 
 @router.get("/{encounter_id}", response_model=EncounterResponse)
 async def get_encounter(
     encounter_id: str,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: Practitioner = Depends(get_current_practitioner),
-) -> EncounterResponse:
+) -> Response:
     """
     Get encounter by ID with full details.
+
+    Weak ETag: `If-None-Match` with the current one returns 304 after a
+    version-only query.
     """
+    version = await _encounter_version(db, encounter_id)
+    if version is None:
+        raise_not_found("Consulta")
+
+    etag = weak_etag("encounter", *version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
     stmt = (
         select(Encounter)
         .options(
@@ -231,7 +342,9 @@ async def get_encounter(
     if not encounter:
         raise_not_found("Consulta")
 
-    return cast(EncounterResponse, encounter)
+    response = json_response(EncounterResponse.model_validate(encounter))
+    set_etag(response, etag)
+    return response
 
 
 @router.post("/patient/{patient_id}", status_code=status.HTTP_201_CREATED, response_model=EncounterResponse)
@@ -245,26 +358,57 @@ async def create_encounter(
     Create new encounter for patient (FHIR Create interaction).
 
     Creates Encounter + Condition(s) + MedicationRequest(s).
-    """
-    await _ensure_patient_exists(db, patient_id)
 
+    Los IDs se generan en cliente, las filas hijas se insertan en un INSERT
+    masivo por tabla y la respuesta se construye con los datos ya conocidos
+    (sin releer). Un paciente inexistente se detecta por la FK (404), sin
+    consulta previa.
+    """
     encounter = Encounter(
+        id=str(uuid4()),
         subject_id=patient_id,
         participant_id=current_user.id,
         status="finished",
+        period_start=datetime.now(timezone.utc),
     )
     _apply_soap_fields(encounter, encounter_data)
-    db.add(encounter)
-    await db.flush()  # Obtener encounter.id
-
-    _create_conditions(db, encounter_data, subject_id=patient_id, encounter_id=encounter.id)
-    _create_medications(
-        db, encounter_data,
+    condition_rows = _condition_rows(
+        encounter_data, subject_id=patient_id, encounter_id=encounter.id
+    )
+    medication_rows = _medication_rows(
+        encounter_data,
         subject_id=patient_id, encounter_id=encounter.id, requester_id=current_user.id,
     )
 
-    await db.commit()
-    return cast(EncounterResponse, await _reload_encounter(db, encounter.id))
+    db.add(encounter)
+    try:
+        # El autoflush del primer INSERT hijo escribe antes el Encounter
+        if condition_rows:
+            await db.execute(insert(Condition), condition_rows)
+        if medication_rows:
+            await db.execute(insert(MedicationRequest), medication_rows)
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        if _is_foreign_key_violation(exc):
+            raise_not_found("Paciente")
+        raise
+
+    return EncounterResponse(
+        id=encounter.id,
+        subject_id=encounter.subject_id,
+        status=encounter.status,
+        period_start=encounter.period_start,
+        reason_text=encounter.reason_text,
+        subjective_text=encounter.subjective_text,
+        objective_text=encounter.objective_text,
+        assessment_text=encounter.assessment_text,
+        plan_text=encounter.plan_text,
+        recommendations_text=encounter.recommendations_text,
+        note=encounter.note,
+        conditions=[ConditionResponse.model_validate(row) for row in condition_rows],
+        medications=[MedicationResponse.model_validate(row) for row in medication_rows],
+    )
 
 
 @router.put("/{encounter_id}", response_model=EncounterResponse)
@@ -277,8 +421,8 @@ async def update_encounter(
     """
     Update an existing encounter (FHIR R5 Update interaction).
 
-    Reemplaza campos SOAP y sub-recursos (Conditions, Medications)
-    mediante estrategia delete + recreate.
+    Reemplaza campos SOAP y sincroniza sub-recursos (Conditions, Medications)
+    por diff: las filas sin cambios conservan su ID y no se reescriben.
     """
     # 1. Fetch con relaciones
     stmt = (
@@ -297,23 +441,41 @@ async def update_encounter(
     # 2. Actualizar campos SOAP
     _apply_soap_fields(encounter, encounter_data)
 
-    # 3. Reemplazar Conditions (delete + recreate)
-    for cond in list(encounter.conditions):
-        await db.delete(cond)
-    await db.flush()
-    _create_conditions(
-        db, encounter_data,
-        subject_id=encounter.subject_id, encounter_id=encounter.id,
+    # 3-4. Sincronizar sub-recursos por diff: solo INSERT/UPDATE/DELETE de lo
+    # que cambió (un autosave que solo toca el SOAP no reescribe filas hijas).
+    # `sort_order` guarda el orden del cliente: un cambio de orden también se
+    # escribe (y cambia el ETag de la consulta).
+    condition_plan = plan_sync(
+        encounter.conditions,
+        [c.model_dump() for c in encounter_data.conditions],
+        CONDITION_SYNC_FIELDS,
+        order_field=SUBRESOURCE_ORDER_FIELD,
+    )
+    await apply_sync(
+        db, Condition, condition_plan,
+        insert_values={"subject_id": encounter.subject_id, "encounter_id": encounter.id},
     )
 
-    # 4. Reemplazar Medications (delete + recreate)
-    for med in list(encounter.medications):
-        await db.delete(med)
-    await db.flush()
-    _create_medications(
-        db, encounter_data,
-        subject_id=encounter.subject_id, encounter_id=encounter.id,
-        requester_id=current_user.id,
+    medication_plan = plan_sync(
+        encounter.medications,
+        [m.model_dump() for m in encounter_data.medications],
+        MEDICATION_SYNC_FIELDS,
+        MEDICATION_SYNC_IDENTITY,
+        order_field=SUBRESOURCE_ORDER_FIELD,
+    )
+    await apply_sync(
+        db, MedicationRequest, medication_plan,
+        insert_values={
+            "subject_id": encounter.subject_id,
+            "encounter_id": encounter.id,
+            "requester_id": current_user.id,
+        },
+        # Una prescripción modificada (mismo fármaco, otra pauta) pasa a
+        # firmarla quien la modifica, con fecha de la modificación
+        update_values={
+            "requester_id": current_user.id,
+            "authored_on": datetime.now(timezone.utc),
+        },
     )
 
     # 5. Commit & reload
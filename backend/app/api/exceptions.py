@@ -70,3 +70,21 @@ def raise_forbidden(detail: str = "No autorizado") -> NoReturn:
         status_code=status.HTTP_403_FORBIDDEN,
         detail=detail
     )
+
+
+def raise_service_unavailable(detail: str, retry_after_seconds: int) -> NoReturn:
+    """
+    Lanza HTTPException 503 cuando un recurso está saturado temporalmente.
+
+    Args:
+        detail: Mensaje descriptivo del error
+        retry_after_seconds: Segundos sugeridos al cliente antes de reintentar
+
+    Raises:
+        HTTPException: 503 Service Unavailable con cabecera Retry-After
+    """
+    raise HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": str(retry_after_seconds)},
+    )
@@ -1,26 +1,34 @@
 """
 ConsultaMed Backend - Patients Endpoints
 """
+from datetime import date
 from typing import Optional
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.api.auth import get_current_practitioner
+from app.api.conditional import etag_matches, not_modified, set_etag, weak_etag
 from app.api.exceptions import raise_not_found, raise_bad_request
+from app.api.responses import json_response
+from app.models.patient import age_from_birth_date
 from app.models.practitioner import Practitioner
+from app.services.pagination import InvalidCursorError, PaginationMode, TotalMode
 from app.services.patient_service import PatientService
 from app.schemas.patient import (
     PatientCreate,
     PatientUpdate,
     PatientResponse,
+    PatientDetailResponse,
     PatientListResponse,
     PatientSummary,
     AllergyCreate,
     AllergyResponse,
+    RecentEncounter,
 )
+from app.observability.timing import TimedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 @router.get("/", response_model=PatientListResponse)
@@ -28,68 +36,106 @@ async def list_patients(
     search: Optional[str] = Query(None, min_length=2, description="Search by name or DNI"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    pagination: PaginationMode = Query(
+        "offset", description="offset (por defecto) o cursor (keyset, coste constante)"
+    ),
+    cursor: Optional[str] = Query(None, description="next_cursor de la página anterior"),
+    total_mode: TotalMode = Query(
+        "window", description="window (exacto), estimate (planificador) o none (solo has_more)"
+    ),
     db: AsyncSession = Depends(get_db),
     current_user: Practitioner = Depends(get_current_practitioner),
-) -> PatientListResponse:
+) -> Response:
     """
     List patients with optional search.
     
     - Search by partial name or DNI (minimum 2 characters)
-    - Paginated results
+    - Paginated results: offset (default) or keyset cursor (`pagination=cursor`)
+    - Total computed in the page query (`total_mode`), no separate COUNT
+    - Allergy and encounter counts projected in that same query
     """
     service = PatientService(db)
-    patients, total = await service.search(search or "", limit, offset)
-
-    encounter_stats = await service.get_encounter_stats([p.id for p in patients])
-
-    items = []
-    for patient in patients:
-        encounter_count, last_encounter_at = encounter_stats.get(patient.id, (0, None))
-        items.append(
-            PatientSummary(
-                id=patient.id,
-                identifier_value=patient.identifier_value,
-                name_given=patient.name_given,
-                name_family=patient.name_family,
-                birth_date=patient.birth_date,
-                age=patient.age,
-                gender=patient.gender,
-                telecom_phone=patient.telecom_phone,
-                has_allergies=patient.has_allergies,
-                allergy_count=sum(
-                    1 for allergy in patient.allergies if allergy.clinical_status == "active"
-                ),
-                encounter_count=encounter_count,
-                last_encounter_at=last_encounter_at,
-            )
+    mode: PaginationMode = "cursor" if cursor else pagination
+    try:
+        page = await service.search_summaries(
+            search or "", limit, offset, mode=mode, cursor=cursor, total_mode=total_mode
+        )
+    except InvalidCursorError as e:
+        raise_bad_request(str(e))
+
+    # Filas ya proyectadas en una sola consulta: sin entidades ORM ni carga de relaciones.
+    # Tipos ya garantizados por las columnas: se construye sin validar.
+    today = date.today()
+    items = [
+        PatientSummary.model_construct(
+            id=row.id,
+            identifier_value=row.identifier_value,
+            name_given=row.name_given,
+            name_family=row.name_family,
+            birth_date=row.birth_date,
+            age=age_from_birth_date(row.birth_date, today),
+            gender=row.gender,
+            telecom_phone=row.telecom_phone,
+            has_allergies=row.allergy_count > 0,
+            allergy_count=row.allergy_count,
+            encounter_count=row.encounter_count,
+            last_encounter_at=row.last_encounter_at,
+        )
+        for row in page.items
+    ]
+
+    return json_response(
+        PatientListResponse(
+            items=items,
+            total=page.total,
+            limit=limit,
+            offset=offset if mode == "offset" else 0,
+            next_cursor=page.next_cursor,
+            has_more=page.has_more,
+            total_is_estimate=page.total_is_estimate,
         )
-    
-    return PatientListResponse(
-        items=items,
-        total=total,
-        limit=limit,
-        offset=offset,
     )
 
 
-@router.get("/{patient_id}", response_model=PatientResponse)
+@router.get("/{patient_id}", response_model=PatientDetailResponse)
 async def get_patient(
     patient_id: str,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_user: Practitioner = Depends(get_current_practitioner),
-) -> PatientResponse:
+) -> Response:
     """
     Get patient by ID.
     
-    Returns full patient data including allergies and recent encounters.
+    Returns full patient data including allergies and the latest encounters
+    (bounded; older ones via GET /encounters/patient/{patient_id}).
+    Weak ETag: `If-None-Match` with the current one returns 304 after a
+    version-only query.
     """
     service = PatientService(db)
-    patient = await service.get_by_id(patient_id)
+    version = await service.get_detail_version(patient_id)
+    if version is None:
+        raise_not_found("Paciente")
 
-    if not patient:
+    # `age` se calcula con la fecha de hoy: el ETag cambia cada día para no
+    # servir un 304 con la edad de antes del cumpleaños
+    etag = weak_etag("patient", *version, date.today().isoformat())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    detail = await service.get_detail(patient_id)
+
+    if not detail:
         raise_not_found("Paciente")
 
-    return PatientResponse.model_validate(patient)
+    record = PatientDetailResponse.model_validate(detail.patient)
+    record.recent_encounters = [
+        RecentEncounter.model_validate(encounter) for encounter in detail.recent_encounters
+    ]
+    record.has_more_encounters = detail.has_more_encounters
+    response = json_response(record)
+    set_etag(response, etag)
+    return response
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=PatientResponse)
@@ -172,8 +218,7 @@ async def add_allergy(
     service = PatientService(db)
     
     # Check patient exists
-    patient = await service.get_by_id(patient_id)
-    if not patient:
+    if not await service.exists(patient_id):
         raise_not_found("Paciente")
 
     allergy = await service.add_allergy(patient_id, allergy_data.model_dump())
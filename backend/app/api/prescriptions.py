@@ -15,13 +15,15 @@ from sqlalchemy.orm import selectinload
 
 from app.database import get_db
 from app.api.auth import get_current_practitioner
-from app.api.exceptions import raise_not_found, raise_bad_request
+from app.api.exceptions import raise_not_found, raise_bad_request, raise_service_unavailable
 from app.models.encounter import Encounter
 from app.models.practitioner import Practitioner
+from app.services.pdf_cache import pdf_cache, prescription_cache_key
+from app.services.pdf_renderer import PDFRenderOverloadedError, pdf_render_pool
 from app.services.pdf_service import PDFService
+from app.observability.timing import TimedRoute, timed
 
-router = APIRouter()
-pdf_service = PDFService()
+router = APIRouter(route_class=TimedRoute)
 
 
 def _resolve_encounter_instructions(encounter: Encounter) -> str:
@@ -135,7 +137,7 @@ async def get_prescription_preview(
     encounter = await _get_encounter_or_404(db, encounter_id)
     payload = _build_prescription_payload(encounter, current_practitioner)
 
-    return pdf_service.generate_prescription_preview(
+    return PDFService.generate_prescription_preview(
         patient=payload["patient"],
         practitioner=payload["practitioner"],
         encounter=payload["encounter"],
@@ -144,7 +146,10 @@ async def get_prescription_preview(
     )
 
 
-@router.get("/{encounter_id}/pdf")
+@router.get(
+    "/{encounter_id}/pdf",
+    responses={503: {"description": "Cola de generación de PDF llena (ver Retry-After)"}},
+)
 async def download_prescription_pdf(
     encounter_id: str,
     db: AsyncSession = Depends(get_db),
@@ -153,7 +158,10 @@ async def download_prescription_pdf(
     """
     Generate prescription PDF.
     
-    Uses WeasyPrint to generate PDF from HTML template.
+    Uses WeasyPrint to generate PDF from HTML template, rendered in a bounded
+    worker pool so the event loop keeps serving other requests. Responds 503
+    with Retry-After when the render queue is full. Identical prescriptions
+    are served from a content-addressed cache.
     """
     encounter = await _get_encounter_or_404(db, encounter_id)
 
@@ -162,14 +170,15 @@ async def download_prescription_pdf(
 
     payload = _build_prescription_payload(encounter, current_practitioner)
 
-    # Generar PDF
-    pdf_bytes = pdf_service.generate_prescription_pdf(
-        patient=payload["patient"],
-        practitioner=payload["practitioner"],
-        encounter=payload["encounter"],
-        medications=payload["medications"],
-        instructions=payload["instructions"],
-    )
+    # Receta sin cambios → PDF cacheado; si no, render fuera del event loop
+    try:
+        with timed("render"):
+            pdf_bytes = await pdf_cache.get_or_render(
+                prescription_cache_key(payload),
+                lambda: pdf_render_pool.render(payload),
+            )
+    except PDFRenderOverloadedError as e:
+        raise_service_unavailable(str(e), e.retry_after_seconds)
 
     issued_on = encounter.period_start.date()
     filename = _build_prescription_filename(
@@ -0,0 +1,43 @@
+"""
+ConsultaMed Backend - JSON Responses
+
+Serialización JSON rápida para toda la API.
+
+`FastJSONResponse` codifica con el serializador de pydantic-core (Rust) en vez
+del módulo `json` de la biblioteca estándar; es la clase de respuesta por
+defecto de la aplicación.
+
+`json_response` es la vía directa para los modelos que el endpoint acaba de
+construir a partir de filas de la base de datos: FastAPI, al recibir un modelo,
+lo vuelca a dict, lo valida de nuevo contra `response_model`, lo pasa por
+`jsonable_encoder` y solo entonces lo codifica. Devolviendo la respuesta ya
+codificada se salta todo eso; `response_model` sigue declarado para OpenAPI.
+"""
+from typing import Any, Mapping, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+from app.observability.timing import timed
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse codificada por pydantic-core (acepta modelos, fechas, UUID...)."""
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def json_response(
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> FastJSONResponse:
+    """
+    Respuesta JSON de un modelo ya construido, sin revalidarlo.
+
+    Solo para modelos creados por el propio endpoint (el tipo ya es el de
+    `response_model`); el tiempo de codificación cuenta en la fase `serialize`.
+    """
+    with timed("serialize"):
+        return FastJSONResponse(content, status_code=status_code, headers=headers)
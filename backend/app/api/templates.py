@@ -1,20 +1,30 @@
 """
 ConsultaMed Backend - Templates Endpoints
 """
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Query, status, Depends
+from fastapi import APIRouter, Header, Query, Response, status, Depends
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, func
+from sqlalchemy import select
 
 from app.database import get_db
 from app.api.auth import get_current_practitioner
+from app.api.conditional import etag_matches, not_modified, set_etag, weak_etag
 from app.api.exceptions import raise_not_found, raise_forbidden
+from app.api.responses import json_response
 from app.models.template import TreatmentTemplate
 from app.models.practitioner import Practitioner
+from app.services.pagination import TotalMode
+from app.services.template_cache import (
+    CachedTemplate,
+    get_template_catalog,
+    get_template_usage,
+    invalidate_templates,
+)
+from app.observability.timing import TimedRoute, timed
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute)
 
 
 # ============================================
@@ -40,7 +50,17 @@ class TemplateResponse(BaseModel):
 
 class TemplateListResponse(BaseModel):
     items: List[TemplateResponse]
-    total: int
+    total: Optional[int]
+    has_more: bool = False
+    total_is_estimate: bool = False
+
+
+class TemplateMatch(TemplateResponse):
+    score: float  # Similitud + extras por favorito y uso (ver template_matching)
+
+
+class TemplateMatchListResponse(BaseModel):
+    items: List[TemplateMatch]
 
 
 class TemplateCreate(BaseModel):
@@ -80,6 +100,30 @@ def _to_medication_items(raw_medications: Optional[list[dict[str, str]]]) -> Lis
     return [MedicationItem.model_validate(item) for item in raw_medications]
 
 
+def _to_response(template: CachedTemplate) -> TemplateResponse:
+    """Build the API schema from a cached template."""
+    return TemplateResponse(
+        id=template.id,
+        name=template.name,
+        diagnosis_text=template.diagnosis_text,
+        diagnosis_code=template.diagnosis_code,
+        medications=_to_medication_items(list(template.medications)),
+        instructions=template.instructions,
+        is_favorite=template.is_favorite,
+        is_global=template.is_global,
+    )
+
+
+async def _rank_templates(
+    db: AsyncSession, practitioner_id: str, diagnosis: str, limit: int
+) -> List[Tuple[CachedTemplate, float]]:
+    """Rank visible templates for a diagnosis (cached templates and usage)."""
+    catalog = await get_template_catalog(db, practitioner_id)
+    usage = await get_template_usage(db, practitioner_id)
+    with timed("match"):
+        return catalog.rank(diagnosis, usage, limit=limit)
+
+
 # ============================================
 # Endpoints
 # ============================================
@@ -90,67 +134,39 @@ async def list_templates(
     favorites_only: bool = Query(False, description="Filter favorites only"),
     limit: int = Query(50, le=100),
     offset: int = Query(0, ge=0),
+    total_mode: TotalMode = Query(
+        "window", description="window (exacto), estimate (planificador) o none (solo has_more)"
+    ),
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
     current_practitioner: Practitioner = Depends(get_current_practitioner),
-) -> TemplateListResponse:
+) -> Response:
     """
     List treatment templates.
+
+    Served from the per-worker template cache: filtering, favourites ordering
+    and pagination run in memory, so the total is always exact (`null` only
+    with `total_mode=none`). Weak ETag from the cached global and own template
+    versions: `If-None-Match` with the current one returns 304.
     """
-    # Incluir templates del usuario Y templates globales (practitioner_id IS NULL)
-    query = select(TreatmentTemplate).where(
-        or_(
-            TreatmentTemplate.practitioner_id == current_practitioner.id,
-            TreatmentTemplate.practitioner_id.is_(None)
-        )
-    )
-    
-    # Filtrar por favoritos
-    if favorites_only:
-        query = query.where(TreatmentTemplate.is_favorite.is_(True))
-    
-    # Búsqueda por nombre o diagnóstico
-    if search:
-        search_term = f"%{search}%"
-        query = query.where(
-            or_(
-                TreatmentTemplate.name.ilike(search_term),
-                TreatmentTemplate.diagnosis_text.ilike(search_term),
-            )
+    catalog = await get_template_catalog(db, current_practitioner.id)
+
+    etag = weak_etag("templates", current_practitioner.id, *catalog.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    matches = catalog.search(search, favorites_only)
+    page = matches[offset:offset + limit]
+
+    response = json_response(
+        TemplateListResponse(
+            items=[_to_response(t) for t in page],
+            total=None if total_mode == "none" else len(matches),
+            has_more=offset + len(page) < len(matches),
         )
-    
-    # Ordenar: favoritos primero, luego por nombre
-    query = query.order_by(
-        TreatmentTemplate.is_favorite.desc(),
-        TreatmentTemplate.name.asc(),
-    )
-    
-    # Contar total
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-    
-    # Aplicar paginación
-    query = query.offset(offset).limit(limit)
-    
-    result = await db.execute(query)
-    templates = result.scalars().all()
-    
-    return TemplateListResponse(
-        items=[
-            TemplateResponse(
-                id=str(t.id),
-                name=t.name,
-                diagnosis_text=t.diagnosis_text,
-                diagnosis_code=t.diagnosis_code,
-                medications=_to_medication_items(t.medications),
-                instructions=t.instructions,
-                is_favorite=t.is_favorite,
-                is_global=t.practitioner_id is None,
-            )
-            for t in templates
-        ],
-        total=total,
     )
+    set_etag(response, etag)
+    return response
 
 
 @router.get("/match")
@@ -162,35 +178,39 @@ async def match_template(
     """
     Find best matching template for a diagnosis.
     
-    Used for auto-loading treatment when selecting diagnosis.
+    Used for auto-loading treatment when selecting diagnosis. Best hit of
+    `GET /templates/matches`.
     """
-    # Buscar template que coincida con el diagnóstico (incluye globales)
-    result = await db.execute(
-        select(TreatmentTemplate)
-        .where(
-            or_(
-                TreatmentTemplate.practitioner_id == current_practitioner.id,
-                TreatmentTemplate.practitioner_id.is_(None)
-            ),
-            TreatmentTemplate.diagnosis_text.ilike(f"%{diagnosis}%"),
-        )
-        .order_by(TreatmentTemplate.is_favorite.desc())
-        .limit(1)
-    )
-    template = result.scalar_one_or_none()
+    matches = await _rank_templates(db, current_practitioner.id, diagnosis, limit=1)
 
-    if not template:
+    if not matches:
         raise_not_found("Template para este diagnóstico")
 
-    return TemplateResponse(
-        id=str(template.id),
-        name=template.name,
-        diagnosis_text=template.diagnosis_text,
-        diagnosis_code=template.diagnosis_code,
-        medications=_to_medication_items(template.medications),
-        instructions=template.instructions,
-        is_favorite=template.is_favorite,
-        is_global=template.practitioner_id is None,
+    template, _ = matches[0]
+    return _to_response(template)
+
+
+@router.get("/matches", response_model=TemplateMatchListResponse)
+async def match_templates(
+    diagnosis: str = Query(..., min_length=2, description="Diagnosis text or ICD-10 code to match"),
+    limit: int = Query(5, ge=1, le=20),
+    db: AsyncSession = Depends(get_db),
+    current_practitioner: Practitioner = Depends(get_current_practitioner),
+) -> TemplateMatchListResponse:
+    """
+    Top-k templates for a diagnosis, best first.
+
+    Trigram similarity (tolerates accents, word order and typos) over name,
+    diagnosis and ICD-10 code, plus a bonus for favourites and for diagnoses
+    the practitioner recorded often in the last year. Served from the template
+    cache; an empty list means nothing is similar enough.
+    """
+    matches = await _rank_templates(db, current_practitioner.id, diagnosis, limit=limit)
+    return TemplateMatchListResponse(
+        items=[
+            TemplateMatch(**_to_response(template).model_dump(), score=round(score, 3))
+            for template, score in matches
+        ]
     )
 
 
@@ -203,30 +223,13 @@ async def get_template(
     """
     Get template by ID (incluye templates globales).
     """
-    result = await db.execute(
-        select(TreatmentTemplate).where(
-            TreatmentTemplate.id == template_id,
-            or_(
-                TreatmentTemplate.practitioner_id == current_practitioner.id,
-                TreatmentTemplate.practitioner_id.is_(None)
-            ),
-        )
-    )
-    template = result.scalar_one_or_none()
+    catalog = await get_template_catalog(db, current_practitioner.id)
+    template = catalog.get(template_id)
 
     if not template:
         raise_not_found("Template")
 
-    return TemplateResponse(
-        id=str(template.id),
-        name=template.name,
-        diagnosis_text=template.diagnosis_text,
-        diagnosis_code=template.diagnosis_code,
-        medications=_to_medication_items(template.medications),
-        instructions=template.instructions,
-        is_favorite=template.is_favorite,
-        is_global=template.practitioner_id is None,
-    )
+    return _to_response(template)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=TemplateResponse)
@@ -251,6 +254,7 @@ async def create_template(
     db.add(template)
     await db.commit()
     await db.refresh(template)
+    invalidate_templates(current_practitioner.id)
     
     return TemplateResponse(
         id=str(template.id),
@@ -307,6 +311,7 @@ async def update_template(
     
     await db.commit()
     await db.refresh(template)
+    invalidate_templates(current_practitioner.id)
     
     return TemplateResponse(
         id=str(template.id),
@@ -348,3 +353,4 @@ async def delete_template(
     
     await db.delete(template)
     await db.commit()
+    invalidate_templates(current_practitioner.id)
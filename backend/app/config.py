@@ -2,6 +2,7 @@
 ConsultaMed Backend - Configuration Settings
 """
 from functools import lru_cache
+from typing import Optional
 
 from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -39,6 +40,24 @@ class Settings(BaseSettings):
         validation_alias="CONSULTAMED_REGISTRATION_PASSWORD",
     )
 
+    # Caché del profesional autenticado (evita recargarlo en cada petición).
+    # Un cambio hecho desde otro proceso (CLI) tarda como mucho este TTL en
+    # aplicarse; 0 desactiva la caché.
+    AUTH_CACHE_TTL_SECONDS: float = Field(
+        default=60.0,
+        ge=0,
+        validation_alias="CONSULTAMED_AUTH_CACHE_TTL_SECONDS",
+    )
+
+    # Caché de plantillas de tratamiento por worker. Las escrituras desde la API
+    # invalidan la del proceso que las atiende; en el resto de workers (y tras
+    # cambios desde el CLI) tardan como mucho este TTL. 0 la desactiva.
+    TEMPLATE_CACHE_TTL_SECONDS: float = Field(
+        default=60.0,
+        ge=0,
+        validation_alias="CONSULTAMED_TEMPLATE_CACHE_TTL_SECONDS",
+    )
+
     # CORS
     FRONTEND_URL: str = Field(
         default="http://localhost:3000",
@@ -56,6 +75,124 @@ class Settings(BaseSettings):
         validation_alias="CONSULTAMED_SQLALCHEMY_ECHO",
     )
 
+    # Pool de conexiones (dimensionar según concurrencia real, ver get_pool_stats)
+    DB_POOL_SIZE: int = Field(
+        default=10,
+        ge=1,
+        validation_alias="CONSULTAMED_DB_POOL_SIZE",
+    )
+    DB_MAX_OVERFLOW: int = Field(
+        default=10,
+        ge=0,
+        validation_alias="CONSULTAMED_DB_MAX_OVERFLOW",
+    )
+    DB_POOL_TIMEOUT_SECONDS: float = Field(
+        default=10.0,
+        gt=0,
+        validation_alias="CONSULTAMED_DB_POOL_TIMEOUT_SECONDS",
+    )
+    DB_POOL_RECYCLE_SECONDS: int = Field(
+        default=1800,
+        validation_alias="CONSULTAMED_DB_POOL_RECYCLE_SECONDS",
+    )  # -1 desactiva el reciclado
+    DB_POOL_PRE_PING: bool = Field(
+        default=True,
+        validation_alias="CONSULTAMED_DB_POOL_PRE_PING",
+    )
+    # Sentencias preparadas cacheadas por conexión (0 = desactivado, p. ej. tras PgBouncer)
+    DB_STATEMENT_CACHE_SIZE: int = Field(
+        default=100,
+        ge=0,
+        validation_alias="CONSULTAMED_DB_STATEMENT_CACHE_SIZE",
+    )
+
+    # Generación de PDF fuera del event loop: procesos dedicados a WeasyPrint
+    # (0 = un único hilo en el propio proceso) y renders en espera admitidos
+    # antes de responder 503.
+    PDF_RENDER_WORKERS: int = Field(
+        default=2,
+        ge=0,
+        validation_alias="CONSULTAMED_PDF_RENDER_WORKERS",
+    )
+    PDF_RENDER_MAX_QUEUE: int = Field(
+        default=8,
+        ge=0,
+        validation_alias="CONSULTAMED_PDF_RENDER_MAX_QUEUE",
+    )
+
+    # bcrypt fuera del event loop (ver app/services/password_hasher.py): hilos
+    # dedicados y operaciones en espera admitidas antes de responder 503.
+    BCRYPT_WORKERS: int = Field(
+        default=2,
+        ge=1,
+        validation_alias="CONSULTAMED_BCRYPT_WORKERS",
+    )
+    BCRYPT_MAX_QUEUE: int = Field(
+        default=32,
+        ge=0,
+        validation_alias="CONSULTAMED_BCRYPT_MAX_QUEUE",
+    )
+
+    # Caché de recetas ya renderizadas (ver app/services/pdf_cache.py).
+    # El nivel en disco guarda datos de salud: desactivado salvo que se indique
+    # un directorio local con permisos restringidos.
+    PDF_CACHE_MEMORY_MB: int = Field(
+        default=32,
+        ge=0,
+        validation_alias="CONSULTAMED_PDF_CACHE_MEMORY_MB",
+    )  # 0 desactiva el nivel en memoria
+    PDF_CACHE_DIR: Optional[str] = Field(
+        default=None,
+        validation_alias="CONSULTAMED_PDF_CACHE_DIR",
+    )
+    PDF_CACHE_DISK_MAX_MB: int = Field(
+        default=512,
+        ge=0,
+        validation_alias="CONSULTAMED_PDF_CACHE_DISK_MAX_MB",
+    )
+
+    # Observabilidad: cabecera Server-Timing (db, auth, render, serialize, compress) y
+    # log de peticiones que superen el umbral (0 desactiva el log).
+    SERVER_TIMING_ENABLED: bool = Field(
+        default=True,
+        validation_alias="CONSULTAMED_SERVER_TIMING_ENABLED",
+    )
+    SLOW_REQUEST_MS: float = Field(
+        default=1000,
+        ge=0,
+        validation_alias="CONSULTAMED_SLOW_REQUEST_MS",
+    )
+    # SQL: log de sentencias lentas (parámetros ocultos) y aviso de N+1 cuando
+    # una misma sentencia se repite en una petición (0 desactiva cada uno).
+    SLOW_QUERY_MS: float = Field(
+        default=200,
+        ge=0,
+        validation_alias="CONSULTAMED_SLOW_QUERY_MS",
+    )
+    N_PLUS_ONE_THRESHOLD: int = Field(
+        default=5,
+        ge=0,
+        validation_alias="CONSULTAMED_N_PLUS_ONE_THRESHOLD",
+    )
+    # Endpoint /metrics (formato Prometheus). Sin autenticación: solo expone
+    # contadores agregados, nunca datos de pacientes.
+    METRICS_ENABLED: bool = Field(
+        default=True,
+        validation_alias="CONSULTAMED_METRICS_ENABLED",
+    )
+
+    # Compresión brotli/gzip de respuestas JSON y de texto (ver
+    # app/api/compression.py) a partir de este tamaño en bytes.
+    COMPRESSION_ENABLED: bool = Field(
+        default=True,
+        validation_alias="CONSULTAMED_COMPRESSION_ENABLED",
+    )
+    COMPRESSION_MIN_BYTES: int = Field(
+        default=1024,
+        ge=0,
+        validation_alias="CONSULTAMED_COMPRESSION_MIN_BYTES",
+    )
+
     @staticmethod
     def _ensure_asyncpg(url: str) -> str:
         """Normaliza URLs de Postgres para SQLAlchemy async (asyncpg)."""
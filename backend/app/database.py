@@ -1,23 +1,108 @@
 """
 ConsultaMed Backend - Database Configuration
 """
+import time
 from collections.abc import AsyncGenerator
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
 
 from fastapi import HTTPException, status
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
 
-from app.config import settings
+from app.config import Settings, settings
 
 DATABASE_UNAVAILABLE_DETAIL = "Database unavailable"
 
+# True mientras un checkout ya se está midiendo en este contexto de ejecución
+_measuring_acquire: ContextVar[bool] = ContextVar("measuring_pool_acquire", default=False)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Pool async de SQLAlchemy que mide cuánto espera cada petición por una conexión.
+
+    `QueuePool.status()` solo muestra el estado instantáneo; para saber si el pool
+    se queda corto en hora punta hace falta acumular esperas y timeouts.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.acquire_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeout_count = 0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        # QueuePool._do_get se llama a sí mismo al reintentar: solo se mide la
+        # llamada externa para no contar dos veces la misma espera. La marca va
+        # en una ContextVar (propia de cada greenlet o hilo), no en el pool:
+        # compartida, un checkout en espera ocultaría todos los concurrentes.
+        if _measuring_acquire.get():
+            return super()._do_get()
+
+        token = _measuring_acquire.set(True)
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeout_count += 1
+            raise
+        finally:
+            _measuring_acquire.reset(token)
+            waited = time.perf_counter() - started
+            self.acquire_count += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Instantánea de contadores del pool de conexiones."""
+
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    acquire_count: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+    timeout_count: int
+
+    @property
+    def wait_seconds_avg(self) -> float:
+        """Espera media por conexión desde el arranque."""
+        if not self.acquire_count:
+            return 0.0
+        return self.wait_seconds_total / self.acquire_count
+
+
+def build_engine_options(config: Settings) -> dict[str, Any]:
+    """Opciones de `create_async_engine` derivadas de la configuración."""
+    return {
+        "echo": config.SQLALCHEMY_ECHO,
+        "future": True,
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": config.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "connect_args": {
+            # Caché de SQLAlchemy (la que realmente usa el dialecto asyncpg)
+            # y caché propia de asyncpg, controladas por el mismo ajuste.
+            "prepared_statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        },
+    }
+
 
 # Create async engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.SQLALCHEMY_ECHO,
-    future=True,
-)
+engine = create_async_engine(settings.DATABASE_URL, **build_engine_options(settings))
 
 # Session factory
 async_session_maker = async_sessionmaker(
@@ -27,6 +112,27 @@ async_session_maker = async_sessionmaker(
 )
 
 
+def get_pool_stats(pool: Any = None) -> PoolStats:
+    """
+    Lee los contadores del pool en tiempo de ejecución.
+
+    Args:
+        pool: Pool a inspeccionar; por defecto el del engine de la aplicación.
+    """
+    pool = pool if pool is not None else engine.sync_engine.pool
+    return PoolStats(
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=max(pool.overflow(), 0),
+        max_overflow=getattr(pool, "_max_overflow", 0),
+        acquire_count=getattr(pool, "acquire_count", 0),
+        wait_seconds_total=getattr(pool, "wait_seconds_total", 0.0),
+        wait_seconds_max=getattr(pool, "wait_seconds_max", 0.0),
+        timeout_count=getattr(pool, "timeout_count", 0),
+    )
+
+
 class Base(DeclarativeBase):
     """Base class for SQLAlchemy models."""
     pass
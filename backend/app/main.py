@@ -1,16 +1,39 @@
 """
 ConsultaMed Backend - FastAPI Application Entry Point
 """
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.__version__ import __version__
 from app.config import settings
+from app.api.compression import CompressionMiddleware
+from app.api.responses import FastJSONResponse
 from app.api.router import api_router
-from app.database import DATABASE_UNAVAILABLE_DETAIL, async_session_maker
+from app.database import DATABASE_UNAVAILABLE_DETAIL, async_session_maker, engine, get_pool_stats
+from app.observability.metrics import PROMETHEUS_CONTENT_TYPE, auth_metrics, format_metrics
+from app.observability.middleware import ServerTimingMiddleware
+from app.observability.sql import instrument_engine
+from app.observability.timing import route_latency
+from app.services.password_hasher import password_hasher
+from app.services.pdf_cache import pdf_cache
+from app.services.pdf_renderer import pdf_render_pool
+from app.services.practitioner_service import practitioner_cache
+from app.services.template_cache import template_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Arranque y parada: libera los procesos de PDF y los hilos de bcrypt al apagar."""
+    yield
+    pdf_render_pool.shutdown()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title="ConsultaMed API",
@@ -18,6 +41,8 @@ app = FastAPI(
     version=__version__,
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS Middleware - Allow both localhost and 127.0.0.1
@@ -35,6 +60,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
+)
+
+if settings.COMPRESSION_ENABLED:
+    # Compresión negociada (br/gzip); dentro de Server-Timing, que mide su coste
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES)
+
+# Tiempos por fase (Server-Timing) y latencias por ruta; el último middleware
+# añadido es el más externo, así que mide también CORS.
+instrument_engine(engine, slow_query_ms=settings.SLOW_QUERY_MS)
+app.add_middleware(
+    ServerTimingMiddleware,
+    enabled=settings.SERVER_TIMING_ENABLED,
+    slow_request_ms=settings.SLOW_REQUEST_MS,
+    n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD,
+    timing_allow_origins=cors_origins,
 )
 
 # Include API Router
@@ -79,3 +120,23 @@ async def health_check() -> JSONResponse:
         )
 
     return JSONResponse(status_code=200, content={"status": "healthy"})
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> Response:
+        """Métricas del proceso en formato de exposición de Prometheus."""
+        body = format_metrics(
+            routes=route_latency.snapshot(),
+            pool=get_pool_stats(),
+            pdf_render=pdf_render_pool.stats(),
+            pdf_cache=pdf_cache.stats(),
+            caches={
+                "practitioner": practitioner_cache.stats(),
+                "templates": template_cache.stats(),
+            },
+            auth=auth_metrics.snapshot(),
+            password_hasher=password_hasher.stats(),
+        )
+        return Response(content=body, media_type=PROMETHEUS_CONTENT_TYPE)
@@ -3,6 +3,7 @@ ConsultaMed Backend - Models Package
 """
 from app.models.practitioner import Practitioner
 from app.models.patient import Patient
+from app.models.patient_summary import PatientSummaryRecord
 from app.models.allergy import AllergyIntolerance
 from app.models.encounter import Encounter
 from app.models.condition import Condition
@@ -12,6 +13,7 @@ from app.models.template import TreatmentTemplate
 __all__ = [
     "Practitioner",
     "Patient",
+    "PatientSummaryRecord",
     "AllergyIntolerance",
     "Encounter",
     "Condition",
@@ -3,7 +3,7 @@ ConsultaMed Backend - Condition Model (FHIR Condition)
 """
 from datetime import datetime
 from uuid import uuid4
-from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy import String, Integer, DateTime, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -61,6 +61,9 @@ class Condition(Base):
         comment="active|recurrence|relapse|inactive|remission|resolved"
     )
     
+    # Orden en la consulta: el primero (0) es el diagnóstico principal
+    sort_order: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    
     # Meta
     recorded_date: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -100,8 +100,19 @@ class Encounter(Base):
     # Relationships
     patient = relationship("Patient", back_populates="encounters")
     practitioner = relationship("Practitioner", back_populates="encounters")
-    conditions = relationship("Condition", back_populates="encounter", cascade="all, delete-orphan")
-    medications = relationship("MedicationRequest", back_populates="encounter", cascade="all, delete-orphan")
+    # En el orden del cliente (sin order_by, Postgres las devuelve en orden físico)
+    conditions = relationship(
+        "Condition",
+        back_populates="encounter",
+        cascade="all, delete-orphan",
+        order_by="(Condition.sort_order, Condition.id)",
+    )
+    medications = relationship(
+        "MedicationRequest",
+        back_populates="encounter",
+        cascade="all, delete-orphan",
+        order_by="(MedicationRequest.sort_order, MedicationRequest.id)",
+    )
     
     def __repr__(self) -> str:
         return f"<Encounter {self.id[:8]} - {self.period_start}>"
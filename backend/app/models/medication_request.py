@@ -89,6 +89,9 @@ class MedicationRequest(Base):
         comment="s|min|h|d|wk|mo|a (UCUM)"
     )
     
+    # Orden en la receta, el enviado por el cliente
+    sort_order: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    
     # Meta
     authored_on: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
@@ -2,7 +2,7 @@
 ConsultaMed Backend - Patient Model (FHIR Patient)
 """
 from datetime import datetime, date
-from typing import Any
+from typing import Any, Optional
 from uuid import uuid4
 from sqlalchemy import String, Boolean, DateTime, Date
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -16,6 +16,14 @@ from app.fhir.base_mapping import (
 )
 
 
+def age_from_birth_date(birth_date: date, today: Optional[date] = None) -> int:
+    """Edad en años cumplidos a fecha de hoy (o de `today`)."""
+    today = today or date.today()
+    return today.year - birth_date.year - (
+        (today.month, today.day) < (birth_date.month, birth_date.day)
+    )
+
+
 class Patient(Base):
     """
     Patient model (FHIR Patient resource).
@@ -88,10 +96,7 @@ class Patient(Base):
     @property
     def age(self) -> int:
         """Calculate age from birth_date."""
-        today = date.today()
-        return today.year - self.birth_date.year - (
-            (today.month, today.day) < (self.birth_date.month, self.birth_date.day)
-        )
+        return age_from_birth_date(self.birth_date)
     
     @property
     def has_allergies(self) -> bool:
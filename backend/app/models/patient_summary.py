@@ -0,0 +1,36 @@
+"""
+ConsultaMed Backend - Patient Summary Model
+
+Agregados por paciente para el listado (nº de consultas, última consulta y
+nº de alergias activas). Los mantienen triggers de base de datos sobre
+`encounters`, `allergy_intolerances` y `patients` (migración
+20261017090200_patient_summary.sql): la aplicación solo los lee.
+"""
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import DateTime, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.database import Base
+
+
+class PatientSummaryRecord(Base):
+    """Fila de `patient_summary` (solo lectura desde la aplicación)."""
+    __tablename__ = "patient_summary"
+
+    patient_id: Mapped[str] = mapped_column(
+        UUID(as_uuid=False),
+        ForeignKey("patients.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    active_allergy_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    encounter_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_encounter_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<PatientSummary {self.patient_id}: {self.encounter_count} consultas>"
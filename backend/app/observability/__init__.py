@@ -0,0 +1,5 @@
+"""
+ConsultaMed Backend - Observability Package
+
+Medición por petición (fases y latencias por ruta) e instrumentación de SQL.
+"""
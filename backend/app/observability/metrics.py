@@ -0,0 +1,283 @@
+"""
+ConsultaMed Backend - Prometheus Metrics
+
+Exposición en formato de texto de Prometheus (versión 0.0.4) de los contadores
+que ya recoge la aplicación:
+- latencia de peticiones por ruta y estado (histogramas de `route_latency`);
+- pool de conexiones a la base de datos;
+- pool de render de PDF (duración, cola, rechazos);
+- verificación de contraseñas bcrypt (duración y cola del pool) y resultado
+  de los logins;
+- aciertos de las cachés en memoria.
+
+Se genera a mano (sin `prometheus_client`): las métricas viven en los propios
+servicios y aquí solo se formatean en cada scrape. Todos los valores son del
+proceso que atiende la petición; con varios workers de uvicorn cada uno
+expone los suyos.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+from app.observability.timing import LatencyHistogram, RouteLatencySnapshot
+
+if TYPE_CHECKING:
+    from app.database import PoolStats
+    from app.services.cache import CacheStats
+    from app.services.password_hasher import PasswordHasherStats
+    from app.services.pdf_cache import PDFCacheStats
+    from app.services.pdf_renderer import PDFRenderStats
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRIC_PREFIX = "consultamed"
+
+# bcrypt con coste 12 tarda del orden de 0,2-0,3 s por verificación
+PASSWORD_CHECK_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+
+LOGIN_OUTCOMES = ("success", "invalid_credentials", "inactive")
+
+
+@dataclass(frozen=True)
+class AuthMetricsSnapshot:
+    """Contadores de autenticación en un instante."""
+
+    buckets: Tuple[float, ...]
+    bucket_counts: Tuple[int, ...]
+    password_checks: int
+    password_check_seconds_total: float
+    login_outcomes: Tuple[Tuple[str, int], ...]
+
+
+class AuthMetrics:
+    """Duración de las verificaciones bcrypt y resultado de los intentos de login."""
+
+    def __init__(self) -> None:
+        self._password_checks = LatencyHistogram(buckets=PASSWORD_CHECK_BUCKETS, window=1)
+        self._login_outcomes: Dict[str, int] = dict.fromkeys(LOGIN_OUTCOMES, 0)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def password_check(self) -> Iterator[None]:
+        """Mide una verificación de contraseña."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            with self._lock:
+                self._password_checks.observe(seconds)
+
+    def record_login(self, outcome: str) -> None:
+        """Cuenta un intento de login (`success`, `invalid_credentials`, `inactive`)."""
+        with self._lock:
+            self._login_outcomes[outcome] = self._login_outcomes.get(outcome, 0) + 1
+
+    def snapshot(self) -> AuthMetricsSnapshot:
+        with self._lock:
+            return AuthMetricsSnapshot(
+                buckets=self._password_checks.buckets,
+                bucket_counts=tuple(self._password_checks.bucket_counts),
+                password_checks=self._password_checks.count,
+                password_check_seconds_total=self._password_checks.sum_seconds,
+                login_outcomes=tuple(self._login_outcomes.items()),
+            )
+
+
+auth_metrics = AuthMetrics()
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Exposition:
+    """Acumula familias de métricas en formato de texto de Prometheus."""
+
+    def __init__(self) -> None:
+        self._lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> str:
+        full_name = f"{METRIC_PREFIX}_{name}"
+        self._lines.append(f"# HELP {full_name} {help_text}")
+        self._lines.append(f"# TYPE {full_name} {kind}")
+        return full_name
+
+    def sample(self, name: str, value: float, labels: Mapping[str, str] | None = None) -> None:
+        if labels:
+            rendered = ",".join(f'{key}="{_escape_label(str(val))}"' for key, val in labels.items())
+            name = f"{name}{{{rendered}}}"
+        self._lines.append(f"{name} {_format_value(value)}")
+
+    def metric(self, name: str, kind: str, help_text: str, value: float) -> None:
+        """Familia con una sola serie sin etiquetas."""
+        self.sample(self.family(name, kind, help_text), value)
+
+    def histogram_samples(
+        self,
+        name: str,
+        buckets: Iterable[float],
+        bucket_counts: Iterable[int],
+        count: int,
+        sum_seconds: float,
+        labels: Mapping[str, str] | None = None,
+    ) -> None:
+        """Series `_bucket` (acumuladas, hasta `+Inf`), `_sum` y `_count`."""
+        labels = dict(labels or {})
+        cumulative = 0
+        for upper, observed in zip((*buckets, math.inf), bucket_counts):
+            cumulative += observed
+            self.sample(f"{name}_bucket", cumulative, {**labels, "le": _format_value(upper)})
+        self.sample(f"{name}_sum", sum_seconds, labels)
+        self.sample(f"{name}_count", count, labels)
+
+    def text(self) -> str:
+        return "\n".join(self._lines) + "\n"
+
+
+def _route_metrics(out: _Exposition, routes: Iterable[RouteLatencySnapshot]) -> None:
+    name = out.family(
+        "http_request_duration_seconds",
+        "histogram",
+        "Duración de las peticiones HTTP por ruta y código de estado.",
+    )
+    for snapshot in routes:
+        out.histogram_samples(
+            name,
+            snapshot.buckets,
+            snapshot.bucket_counts,
+            snapshot.count,
+            snapshot.sum_seconds,
+            {"route": snapshot.route, "status": str(snapshot.status)},
+        )
+
+
+def _pool_metrics(out: _Exposition, pool: "PoolStats") -> None:
+    out.metric("db_pool_size", "gauge", "Conexiones permanentes del pool.", pool.size)
+    out.metric("db_pool_checked_out", "gauge", "Conexiones prestadas en este momento.", pool.checked_out)
+    out.metric("db_pool_checked_in", "gauge", "Conexiones libres en el pool.", pool.checked_in)
+    out.metric("db_pool_overflow", "gauge", "Conexiones abiertas por encima del tamaño del pool.", pool.overflow)
+    out.metric("db_pool_max_overflow", "gauge", "Máximo de conexiones de desbordamiento.", pool.max_overflow)
+    out.metric("db_pool_acquisitions_total", "counter", "Conexiones entregadas por el pool.", pool.acquire_count)
+    out.metric(
+        "db_pool_wait_seconds_total", "counter", "Tiempo total esperando una conexión.", pool.wait_seconds_total
+    )
+    out.metric("db_pool_wait_seconds_max", "gauge", "Espera máxima por una conexión.", pool.wait_seconds_max)
+    out.metric(
+        "db_pool_timeouts_total", "counter", "Esperas de conexión agotadas (pool_timeout).", pool.timeout_count
+    )
+
+
+def _pdf_render_metrics(out: _Exposition, render: "PDFRenderStats") -> None:
+    out.metric("pdf_render_workers", "gauge", "Workers de render de PDF.", render.workers)
+    out.metric("pdf_render_capacity", "gauge", "Renders admitidos entre en curso y en espera.", render.capacity)
+    out.metric("pdf_render_in_flight", "gauge", "Renders en curso o en espera.", render.in_flight)
+    out.metric("pdf_render_queue_depth", "gauge", "Renders esperando un worker libre.", render.queue_depth)
+    name = out.family("pdf_render_duration_seconds", "summary", "Duración del render de PDF en el worker.")
+    out.sample(f"{name}_sum", render.render_seconds_total)
+    out.sample(f"{name}_count", render.renders)
+    out.metric("pdf_render_duration_seconds_max", "gauge", "Render de PDF más lento.", render.render_seconds_max)
+    out.metric(
+        "pdf_render_queue_seconds_total", "counter", "Tiempo total en cola antes del render.", render.queue_seconds_total
+    )
+    out.metric("pdf_render_failures_total", "counter", "Renders de PDF fallidos.", render.failures)
+    out.metric("pdf_render_rejected_total", "counter", "Renders rechazados por saturación (503).", render.rejected)
+
+
+def _auth_metrics(out: _Exposition, auth: AuthMetricsSnapshot, hasher: "PasswordHasherStats") -> None:
+    name = out.family(
+        "password_verify_duration_seconds",
+        "histogram",
+        "Duración de las verificaciones de contraseña del login (espera en el pool de bcrypt incluida).",
+    )
+    out.histogram_samples(
+        name, auth.buckets, auth.bucket_counts, auth.password_checks, auth.password_check_seconds_total
+    )
+    name = out.family("login_attempts_total", "counter", "Intentos de login por resultado.")
+    for outcome, count in auth.login_outcomes:
+        out.sample(name, count, {"outcome": outcome})
+
+    out.metric("bcrypt_workers", "gauge", "Hilos dedicados a bcrypt.", hasher.workers)
+    out.metric("bcrypt_in_flight", "gauge", "Operaciones bcrypt en curso o en espera.", hasher.in_flight)
+    out.metric("bcrypt_queue_depth", "gauge", "Operaciones bcrypt esperando un hilo libre.", hasher.queue_depth)
+    name = out.family("bcrypt_work_seconds", "summary", "Tiempo de CPU de bcrypt (hash y verificación).")
+    out.sample(f"{name}_sum", hasher.work_seconds_total)
+    out.sample(f"{name}_count", hasher.operations)
+    name = out.family("bcrypt_queue_seconds", "summary", "Espera en cola antes de ejecutar bcrypt.")
+    out.sample(f"{name}_sum", hasher.queue_seconds_total)
+    out.sample(f"{name}_count", hasher.operations)
+    out.metric("bcrypt_queue_seconds_max", "gauge", "Espera máxima en la cola de bcrypt.", hasher.queue_seconds_max)
+    out.metric("bcrypt_rejected_total", "counter", "Operaciones bcrypt rechazadas por saturación (503).", hasher.rejected)
+
+
+def _cache_metrics(
+    out: _Exposition, caches: Mapping[str, "CacheStats"], pdf_cache: "PDFCacheStats"
+) -> None:
+    hits = out.family("cache_hits_total", "counter", "Lecturas servidas desde caché.")
+    for cache, stats in caches.items():
+        out.sample(hits, stats.hits, {"cache": cache})
+    out.sample(hits, pdf_cache.memory_hits, {"cache": "pdf", "tier": "memory"})
+    out.sample(hits, pdf_cache.disk_hits, {"cache": "pdf", "tier": "disk"})
+
+    misses = out.family("cache_misses_total", "counter", "Lecturas que no estaban en caché.")
+    for cache, stats in caches.items():
+        out.sample(misses, stats.misses, {"cache": cache})
+    out.sample(misses, pdf_cache.misses, {"cache": "pdf"})
+
+    ratio = out.family("cache_hit_ratio", "gauge", "Aciertos / lecturas desde el arranque.")
+    for cache, stats in caches.items():
+        out.sample(ratio, stats.hit_ratio, {"cache": cache})
+    out.sample(ratio, pdf_cache.hit_ratio, {"cache": "pdf"})
+
+    entries = out.family("cache_entries", "gauge", "Entradas guardadas en caché.")
+    for cache, stats in caches.items():
+        out.sample(entries, stats.size, {"cache": cache})
+    out.sample(entries, pdf_cache.memory_entries, {"cache": "pdf"})
+
+    evictions = out.family("cache_evictions_total", "counter", "Entradas expulsadas por falta de espacio.")
+    for cache, stats in caches.items():
+        out.sample(evictions, stats.evictions, {"cache": cache})
+
+    out.metric("pdf_cache_memory_bytes", "gauge", "Bytes de PDF en la caché en memoria.", pdf_cache.memory_bytes)
+
+
+def format_metrics(
+    *,
+    routes: Iterable[RouteLatencySnapshot],
+    pool: "PoolStats",
+    pdf_render: "PDFRenderStats",
+    pdf_cache: "PDFCacheStats",
+    caches: Mapping[str, "CacheStats"],
+    auth: AuthMetricsSnapshot,
+    password_hasher: "PasswordHasherStats",
+) -> str:
+    """
+    Genera el cuerpo de `/metrics` a partir de las instantáneas de cada servicio.
+
+    Args:
+        routes: Histogramas de latencia por ruta (`route_latency.snapshot()`).
+        pool: Contadores del pool de conexiones (`get_pool_stats()`).
+        pdf_render: Contadores del pool de render (`pdf_render_pool.stats()`).
+        pdf_cache: Contadores de la caché de PDF (`pdf_cache.stats()`).
+        caches: Cachés TTL por nombre (p. ej. `{"practitioner": ...}`).
+        auth: Verificaciones de contraseña y logins (`auth_metrics.snapshot()`).
+        password_hasher: Contadores del pool de bcrypt (`password_hasher.stats()`).
+    """
+    out = _Exposition()
+    _route_metrics(out, routes)
+    _pool_metrics(out, pool)
+    _pdf_render_metrics(out, pdf_render)
+    _auth_metrics(out, auth, password_hasher)
+    _cache_metrics(out, caches, pdf_cache)
+    return out.text()
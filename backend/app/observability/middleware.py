@@ -0,0 +1,121 @@
+"""
+ConsultaMed Backend - Server-Timing Middleware
+
+Middleware ASGI que abre las mediciones de cada petición, añade la cabecera
+`Server-Timing` (visible en la pestaña Network de las devtools), alimenta
+los histogramas por ruta y registra en el log las peticiones lentas y los
+posibles N+1 (misma sentencia SQL repetida en una petición).
+"""
+import logging
+from typing import Iterable, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.observability.sql import repeated_statements
+from app.observability.timing import (
+    RouteLatencyRegistry,
+    end_request,
+    format_server_timing,
+    route_latency,
+    start_request,
+)
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class ServerTimingMiddleware:
+    """
+    Args:
+        app: Aplicación ASGI envuelta.
+        enabled: Emitir la cabecera Server-Timing (las métricas se recogen igual).
+        slow_request_ms: Umbral del log de peticiones lentas (0 lo desactiva).
+        n_plus_one_threshold: Repeticiones de una misma sentencia SQL en una
+            petición a partir de las que se avisa de un posible N+1 (0 desactiva).
+        timing_allow_origins: Orígenes (frontend) a los que se permite leer
+            los tiempos desde el navegador (`Timing-Allow-Origin`).
+        registry: Histogramas por ruta (por defecto los globales).
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        enabled: bool = True,
+        slow_request_ms: float = 0,
+        n_plus_one_threshold: int = 0,
+        timing_allow_origins: Iterable[str] = (),
+        registry: Optional[RouteLatencyRegistry] = None,
+    ) -> None:
+        self.app = app
+        self.enabled = enabled
+        self.slow_request_seconds = slow_request_ms / 1000
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.timing_allow_origins = frozenset(timing_allow_origins)
+        self.registry = registry if registry is not None else route_latency
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = start_request()
+        status_code = 500
+        response_started: Optional[float] = None
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started = timings.elapsed()
+                if self.enabled:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", format_server_timing(timings, response_started))
+                    origin = _request_origin(scope)
+                    if origin in self.timing_allow_origins:
+                        headers.append("Timing-Allow-Origin", origin)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request(token)
+            total = timings.elapsed()
+            route = timings.route or _fallback_route(scope)
+            self.registry.observe(route, status_code, total)
+
+            logger.debug(
+                "%s → %d en %.1f ms, %d consultas SQL", route, status_code, total * 1000, timings.queries
+            )
+            if self.slow_request_seconds and total >= self.slow_request_seconds:
+                logger.warning(
+                    "Petición lenta: %s → %d en %.1f ms (%s)",
+                    route,
+                    status_code,
+                    total * 1000,
+                    format_server_timing(timings, response_started or total),
+                )
+            for statement, count in repeated_statements(timings, self.n_plus_one_threshold):
+                logger.warning(
+                    "Posible N+1 en %s: sentencia ejecutada %d veces: %s",
+                    route,
+                    count,
+                    " ".join(statement.split())[:300],
+                )
+
+
+def _request_origin(scope: Scope) -> Optional[str]:
+    for name, value in scope.get("headers", ()):
+        if name == b"origin":
+            return str(value.decode("latin-1"))
+    return None
+
+
+def _fallback_route(scope: Scope) -> str:
+    # Rutas sin TimedRoute (/, /health, /docs): sin parámetros, la ruta es el path.
+    # Las no encontradas se agrupan para no crear una serie por URL.
+    if "endpoint" in scope:
+        return f"{scope['method']} {scope['path']}"
+    return UNMATCHED_ROUTE
@@ -0,0 +1,173 @@
+"""
+ConsultaMed Backend - SQL Instrumentation
+
+Eventos del engine de SQLAlchemy que, por petición:
+- cuentan las sentencias y suman su tiempo a la fase `db`;
+- registran en el log las sentencias lentas, con los parámetros ocultos
+  (solo su tipo: nunca datos de pacientes en los logs);
+- detectan N+1: la misma sentencia repetida muchas veces en una petición.
+
+El dialecto asyncpg ejecuta los eventos dentro del greenlet de SQLAlchemy,
+que hereda el contexto de la tarea async: la ContextVar de la petición es
+visible desde aquí.
+
+Para tests, `assert_max_queries` falla si un bloque (p. ej. una llamada a un
+endpoint) ejecuta más sentencias de las permitidas.
+"""
+import logging
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.observability.timing import RequestTimings, current_timings
+
+logger = logging.getLogger(__name__)
+
+_STARTED_KEY = "consultamed_query_started"
+
+# Longitud máxima de una sentencia en el log
+_STATEMENT_LOG_CHARS = 1000
+
+_instrumented_engines: "weakref.WeakSet[Engine]" = weakref.WeakSet()
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> Any:
+    """Sustituye cada valor por su tipo (`<str>`, `<int>`...) para poder loguearlo."""
+    if executemany:
+        return f"<{len(parameters)} filas>"
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return tuple(f"<{type(value).__name__}>" for value in parameters)
+    return f"<{type(parameters).__name__}>"
+
+
+class _SqlInstrumentation:
+    def __init__(self, slow_query_ms: float) -> None:
+        self.slow_query_seconds = slow_query_ms / 1000
+
+    def before_cursor_execute(
+        self, conn: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+    def after_cursor_execute(
+        self, conn: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        seconds = time.perf_counter() - conn.info[_STARTED_KEY].pop()
+        timings = current_timings()
+        if timings is not None:
+            timings.add_query(statement, seconds)
+
+        if self.slow_query_seconds and seconds >= self.slow_query_seconds:
+            logger.warning(
+                "Consulta lenta (%.1f ms) en %s: %s | parámetros: %s",
+                seconds * 1000,
+                timings.route if timings is not None and timings.route else "-",
+                " ".join(statement.split())[:_STATEMENT_LOG_CHARS],
+                redact_parameters(parameters, executemany),
+            )
+
+    def handle_error(self, exception_context: Any) -> None:
+        # Una sentencia fallida no llega a after_cursor_execute: se contabiliza aquí
+        conn = exception_context.connection
+        if conn is not None and conn.info.get(_STARTED_KEY):
+            seconds = time.perf_counter() - conn.info[_STARTED_KEY].pop()
+            timings = current_timings()
+            if timings is not None:
+                timings.add_query(exception_context.statement or "", seconds)
+
+
+def _sync_engine(engine: AsyncEngine | Engine) -> Engine:
+    return engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+
+
+def instrument_engine(engine: AsyncEngine | Engine, *, slow_query_ms: float = 0) -> None:
+    """
+    Registra los eventos de medición en `engine` (una sola vez por engine).
+
+    Args:
+        engine: Engine de la aplicación (async o sync).
+        slow_query_ms: Umbral del log de consultas lentas (0 lo desactiva).
+    """
+    sync_engine = _sync_engine(engine)
+    if sync_engine in _instrumented_engines:
+        return
+    _instrumented_engines.add(sync_engine)
+
+    instrumentation = _SqlInstrumentation(slow_query_ms)
+    event.listen(sync_engine, "before_cursor_execute", instrumentation.before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", instrumentation.after_cursor_execute)
+    event.listen(sync_engine, "handle_error", instrumentation.handle_error)
+
+
+def repeated_statements(timings: RequestTimings, threshold: int) -> List[tuple[str, int]]:
+    """Sentencias ejecutadas al menos `threshold` veces en la petición (posible N+1)."""
+    if threshold <= 0:
+        return []
+    return sorted(
+        ((statement, count) for statement, count in timings.statement_counts.items() if count >= threshold),
+        key=lambda item: -item[1],
+    )
+
+
+class QueryCounter:
+    """Sentencias ejecutadas en un engine mientras el contador está activo."""
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _record(
+        self, conn: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine: Optional[AsyncEngine | Engine] = None) -> Iterator[QueryCounter]:
+    """
+    Cuenta las sentencias que ejecuta `engine` (por defecto el de la aplicación)
+    dentro del bloque.
+    """
+    if engine is None:
+        from app.database import engine as app_engine
+
+        engine = app_engine
+    sync_engine = _sync_engine(engine)
+    counter = QueryCounter()
+    event.listen(sync_engine, "before_cursor_execute", counter._record)
+    try:
+        yield counter
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", counter._record)
+
+
+@contextmanager
+def assert_max_queries(
+    maximum: int, engine: Optional[AsyncEngine | Engine] = None
+) -> Iterator[QueryCounter]:
+    """
+    Falla si el bloque ejecuta más de `maximum` sentencias SQL.
+
+    Pensado para tests de endpoints: una regresión N+1 (una consulta por fila)
+    hace fallar el test en lugar de pasar desapercibida.
+
+        with assert_max_queries(4):
+            response = await client.get("/api/v1/patients/?search=gar")
+    """
+    with count_queries(engine) as counter:
+        yield counter
+    if counter.count > maximum:
+        listing = "\n".join(f"  {i}. {' '.join(s.split())[:200]}" for i, s in enumerate(counter.statements, 1))
+        raise AssertionError(
+            f"Se esperaban como máximo {maximum} consultas SQL y se ejecutaron {counter.count}:\n{listing}"
+        )
@@ -0,0 +1,231 @@
+"""
+ConsultaMed Backend - Request Timing
+
+Tiempo de pared por fase de cada petición (db, auth, render, match,
+serialize, compress) e histogramas de latencia por ruta.
+
+Las fases se acumulan en un `RequestTimings` guardado en una ContextVar que
+crea `ServerTimingMiddleware`; fuera de una petición (tests, CLI) las
+funciones de este módulo no hacen nada. Las fases pueden solaparse: el SQL
+que se ejecuta dentro de la autenticación cuenta en `auth` y en `db`.
+"""
+import bisect
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Coroutine, Deque, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+# Orden de las entradas en la cabecera Server-Timing
+PHASES = ("db", "auth", "render", "match", "serialize", "compress")
+
+# Límites superiores (segundos) de los buckets de latencia
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class RequestTimings:
+    """Fases medidas durante una petición."""
+
+    started: float = field(default_factory=time.perf_counter)
+    phases: Dict[str, float] = field(default_factory=dict)
+    route: Optional[str] = None
+    endpoint_finished: Optional[float] = None
+    queries: int = 0
+    statement_counts: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def add_query(self, statement: str, seconds: float) -> None:
+        """Una sentencia SQL: suma a la fase `db` y a su contador por texto."""
+        self.add("db", seconds)
+        self.queries += 1
+        self.statement_counts[statement] = self.statement_counts.get(statement, 0) + 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Mediciones de la petición en curso (None fuera de una petición)."""
+    return _current.get()
+
+
+def start_request() -> Tuple[RequestTimings, Any]:
+    """Abre las mediciones de una petición; devuelve el token para `end_request`."""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token: Any) -> None:
+    _current.reset(token)
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    """Suma `seconds` a la fase indicada de la petición en curso."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Mide el bloque (incluidos sus `await`) como parte de `phase`."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(phase, time.perf_counter() - started)
+
+
+def format_server_timing(timings: RequestTimings, total_seconds: float) -> str:
+    """Valor de la cabecera `Server-Timing` (duraciones en milisegundos)."""
+    entries = []
+    for phase in PHASES:
+        if phase not in timings.phases:
+            continue
+        entry = f"{phase};dur={timings.phases[phase] * 1000:.1f}"
+        if phase == "db":
+            entry += f';desc="{timings.queries} queries"'
+        entries.append(entry)
+    entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute que etiqueta la petición con su plantilla de ruta y mide la
+    serialización (validación del response_model + render JSON), es decir,
+    el tiempo entre que termina el endpoint y se construye la respuesta.
+    Los endpoints que devuelven `json_response` codifican dentro y lo miden ahí.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, _mark_endpoint_finished(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        methods = ",".join(sorted(self.methods or ()))
+        label = f"{methods} {self.path_format}"
+
+        async def timed_handler(request: Request) -> Response:
+            timings = _current.get()
+            if timings is not None:
+                timings.route = label
+            response = await handler(request)
+            if timings is not None and timings.endpoint_finished is not None:
+                timings.add("serialize", time.perf_counter() - timings.endpoint_finished)
+            return response
+
+        return timed_handler
+
+
+def _mark_endpoint_finished(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    # include_router vuelve a crear cada ruta con el endpoint ya envuelto
+    if getattr(endpoint, "_marks_endpoint_finished", False):
+        return endpoint
+
+    # `wraps` conserva firma y anotaciones: FastAPI sigue resolviendo
+    # parámetros, dependencias y response_model del endpoint original.
+    @wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            timings = _current.get()
+            if timings is not None:
+                timings.endpoint_finished = time.perf_counter()
+
+    setattr(wrapper, "_marks_endpoint_finished", True)
+    return wrapper
+
+
+class LatencyHistogram:
+    """Histograma acumulado + ventana de las últimas muestras para percentiles."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS, window: int = 1000) -> None:
+        self.buckets = buckets
+        self.bucket_counts: List[int] = [0] * (len(buckets) + 1)  # último = +Inf
+        self.count = 0
+        self.sum_seconds = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum_seconds += seconds
+        self.recent.append(seconds)
+
+    def percentile(self, pct: float) -> float:
+        """Percentil (rango más cercano) sobre la ventana reciente, en segundos."""
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        rank = max(1, math.ceil(len(ordered) * pct / 100))
+        return ordered[rank - 1]
+
+
+@dataclass(frozen=True)
+class RouteLatencySnapshot:
+    """Latencias de una ruta y código de estado."""
+
+    route: str
+    status: int
+    count: int
+    sum_seconds: float
+    buckets: Tuple[float, ...]
+    bucket_counts: Tuple[int, ...]
+    p50_seconds: float
+    p95_seconds: float
+    p99_seconds: float
+
+
+class RouteLatencyRegistry:
+    """Histogramas de latencia por (ruta, estado), compartidos por el proceso."""
+
+    def __init__(self, window: int = 1000) -> None:
+        self.window = window
+        self._histograms: Dict[Tuple[str, int], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get((route, status))
+            if histogram is None:
+                histogram = self._histograms[(route, status)] = LatencyHistogram(window=self.window)
+            histogram.observe(seconds)
+
+    def snapshot(self) -> List[RouteLatencySnapshot]:
+        with self._lock:
+            return [
+                RouteLatencySnapshot(
+                    route=route,
+                    status=status,
+                    count=h.count,
+                    sum_seconds=h.sum_seconds,
+                    buckets=h.buckets,
+                    bucket_counts=tuple(h.bucket_counts),
+                    p50_seconds=h.percentile(50),
+                    p95_seconds=h.percentile(95),
+                    p99_seconds=h.percentile(99),
+                )
+                for (route, status), h in sorted(self._histograms.items())
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+route_latency = RouteLatencyRegistry()
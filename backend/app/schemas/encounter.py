@@ -107,4 +107,15 @@ class EncounterListResponse(BaseModel):
     Future-proof: preparado para migrar a FHIR Bundle con paginación por cursores.
     """
     items: List[EncounterResponse] = Field(..., description="Lista de encounters")
-    total: int = Field(..., description="Total de resultados disponibles")
+    total: Optional[int] = Field(
+        ...,
+        description="Total de resultados; null con total_mode=none o en páginas de cursor tras la primera",
+    )
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor opaco de la página siguiente (solo en pagination=cursor)",
+    )
+    has_more: bool = Field(False, description="Hay más resultados tras esta página")
+    total_is_estimate: bool = Field(
+        False, description="total es una estimación del planificador (total_mode=estimate)"
+    )
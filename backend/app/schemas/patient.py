@@ -73,7 +73,7 @@ class PatientSummary(BaseModel):
 
 
 class PatientResponse(PatientBase):
-    """Full patient response with allergies and encounters."""
+    """Full patient response with allergies."""
     model_config = ConfigDict(from_attributes=True)
 
     id: str
@@ -83,9 +83,39 @@ class PatientResponse(PatientBase):
     meta_updated_at: datetime
 
 
+class RecentEncounter(BaseModel):
+    """Encounter line shown in the patient record (no SOAP notes)."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    status: str
+    period_start: datetime
+    reason_text: Optional[str]
+
+
+class PatientDetailResponse(PatientResponse):
+    """Patient record with its latest encounters (bounded)."""
+    recent_encounters: List[RecentEncounter] = []
+    has_more_encounters: bool = Field(
+        False,
+        description="Hay consultas más antiguas: paginar con GET /encounters/patient/{id}",
+    )
+
+
 class PatientListResponse(BaseModel):
     """Paginated list of patients."""
     items: List[PatientSummary]
-    total: int
+    total: Optional[int] = Field(
+        ...,
+        description="Total de resultados; null con total_mode=none o en páginas de cursor tras la primera",
+    )
     limit: int
     offset: int
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor opaco de la página siguiente (solo en pagination=cursor)",
+    )
+    has_more: bool = Field(False, description="Hay más resultados tras esta página")
+    total_is_estimate: bool = Field(
+        False, description="total es una estimación del planificador (total_mode=estimate)"
+    )
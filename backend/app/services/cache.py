@@ -0,0 +1,104 @@
+"""
+ConsultaMed Backend - In-Process Caches
+
+Caché TTL en memoria del proceso para datos casi estáticos que se leen en cada
+petición. Cada worker de uvicorn tiene la suya: las invalidaciones explícitas
+solo alcanzan al proceso que las ejecuta, y el TTL acota cuánto tarda el resto
+en ver un cambio hecho en otro proceso (p. ej. desde el CLI administrativo).
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Contadores de una caché (para métricas y diagnóstico)."""
+
+    size: int
+    max_entries: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Caché clave→valor con caducidad por entrada y expulsión LRU.
+
+    Con `ttl_seconds <= 0` queda desactivada: `get` siempre falla y `set` no guarda.
+    No usa locks: está pensada para el event loop de un worker (sin `await`
+    entre lectura y escritura).
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[K, tuple[float, V]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, key: K) -> Optional[V]:
+        """Devuelve el valor vigente o None (entrada ausente o caducada)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self._misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def set(self, key: K, value: V) -> None:
+        """Guarda `value` durante `ttl_seconds`, expulsando la entrada menos usada si no cabe."""
+        if not self.enabled:
+            return
+        self._entries[key] = (self._clock() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """Elimina una entrada (no falla si no existe)."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Vacía la caché y reinicia los contadores."""
+        self._entries.clear()
+        self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            size=len(self._entries),
+            max_entries=self.max_entries,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+        )
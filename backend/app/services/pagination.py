@@ -0,0 +1,218 @@
+"""
+ConsultaMed Backend - Pagination Helpers
+
+Paginación por keyset (cursor) además del OFFSET clásico.
+
+Con OFFSET la base de datos recorre y descarta todas las filas anteriores, así
+que las páginas profundas son cada vez más lentas, y las filas insertadas entre
+dos cargas desplazan los resultados. Con keyset la página siguiente empieza
+justo después de la última clave de ordenación vista: cuesta lo mismo que la
+primera y no se salta ni repite filas.
+
+El total se obtiene sin un segundo `SELECT COUNT(*)` (ver `fetch_page`):
+- "window": `count(*) OVER ()` en la misma consulta de la página (exacto).
+- "estimate": filas estimadas por el planificador (`EXPLAIN`), sin recorrer
+  la tabla; útil en búsquedas amplias donde el total exacto es caro.
+- "none": sin total; el cliente usa `has_more` para saber si hay más páginas.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Generic, List, Literal, Optional, Sequence, TypeVar
+
+from sqlalchemy import Select, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.elements import ClauseElement, ColumnElement
+
+T = TypeVar("T")
+
+PaginationMode = Literal["offset", "cursor"]
+TotalMode = Literal["window", "estimate", "none"]
+
+
+class InvalidCursorError(ValueError):
+    """Cursor manipulado, truncado o emitido por otro listado."""
+
+    def __init__(self) -> None:
+        super().__init__("Cursor de paginación inválido")
+
+
+@dataclass
+class Page(Generic[T]):
+    """Una página de resultados y, en modo cursor, la clave para pedir la siguiente."""
+
+    items: List[T]
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    total_is_estimate: bool = False
+
+
+def encode_cursor(scope: str, values: Sequence[Any]) -> str:
+    """
+    Codifica una clave de ordenación como token opaco (base64url de JSON).
+
+    Args:
+        scope: Listado que emite el cursor (p. ej. "patients"); evita reutilizar
+            un cursor de pacientes para paginar consultas.
+        values: Valores de la clave de ordenación de la última fila devuelta.
+    """
+    payload = [scope, *(v.isoformat() if isinstance(v, datetime) else v for v in values)]
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def keyset_predicate(
+    sort_key: Sequence[Any], after: Sequence[Any], *, descending: bool = False
+) -> ColumnElement[bool]:
+    """
+    Condición "fila posterior a `after`" para una clave de ordenación compuesta.
+
+    Cada valor del cursor se vincula con el tipo de su columna: sin él asyncpg
+    lo envía como VARCHAR o TIMESTAMP sin zona, y Postgres no sabe comparar
+    `uuid > varchar` ni respeta la zona horaria del cursor.
+    """
+    bound = tuple_(*(literal(value, type_=column.type) for column, value in zip(sort_key, after)))
+    key = tuple_(*sort_key)
+    return key < bound if descending else key > bound
+
+
+def decode_cursor(token: str, scope: str, kinds: Sequence[type]) -> List[Any]:
+    """
+    Decodifica un cursor emitido por `encode_cursor`.
+
+    Args:
+        token: Cursor recibido del cliente.
+        scope: Listado esperado.
+        kinds: Tipo de cada valor de la clave (`str` o `datetime`).
+
+    Raises:
+        InvalidCursorError: si el token no es un cursor válido para este listado.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError) as exc:
+        raise InvalidCursorError() from exc
+
+    if not isinstance(payload, list) or len(payload) != len(kinds) + 1 or payload[0] != scope:
+        raise InvalidCursorError()
+
+    values: List[Any] = []
+    for kind, value in zip(kinds, payload[1:]):
+        if not isinstance(value, str):
+            raise InvalidCursorError()
+        if kind is datetime:
+            try:
+                values.append(datetime.fromisoformat(value))
+            except ValueError as exc:
+                raise InvalidCursorError() from exc
+        else:
+            values.append(value)
+    return values
+
+
+class _Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` de una consulta, conservando sus parámetros enlazados."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select[Any]) -> None:
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler: SQLCompiler, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_total(db: AsyncSession, stmt: Select[Any]) -> int:
+    """
+    Número de filas que el planificador estima para `stmt` (sin ejecutarla).
+
+    Depende de las estadísticas de `ANALYZE`: es barato pero aproximado.
+    """
+    result = await db.execute(_Explain(stmt.order_by(None).limit(None).offset(None)))
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def fetch_page(
+    db: AsyncSession,
+    stmt: Select[Any],
+    *,
+    limit: int,
+    offset: int = 0,
+    total_mode: TotalMode = "window",
+    seeking: bool = False,
+) -> Page[Any]:
+    """
+    Ejecuta la consulta de una página y calcula el total sin un COUNT aparte.
+
+    Siempre pide `limit + 1` filas para saber si existe una página siguiente.
+
+    Args:
+        db: Sesión de base de datos.
+        stmt: Consulta ya filtrada y ordenada (en modo cursor, con el predicado
+            keyset). Con una única entidad o columna los `items` son sus
+            valores; con una proyección de varias columnas, las filas (`Row`).
+        limit: Tamaño de página.
+        offset: Desplazamiento (solo paginación por offset).
+        total_mode: "window", "estimate" o "none" (ver docstring del módulo).
+        seeking: True si `stmt` incluye un predicado keyset (página de cursor
+            posterior a la primera). La consulta solo ve las filas restantes,
+            así que el total no se informa; la primera página ya lo devolvió.
+
+    Returns:
+        Page con `items`, `total` (None si no se calcula) y `has_more`.
+        `next_cursor` lo rellena quien construye la clave de ordenación.
+    """
+    page_stmt = stmt.limit(limit + 1)
+    if offset:
+        page_stmt = page_stmt.offset(offset)
+    if total_mode == "window" and not seeking:
+        page_stmt = page_stmt.add_columns(func.count().over().label("window_total"))
+
+    rows = (await db.execute(page_stmt)).all()
+    if len(stmt.column_descriptions) == 1:
+        items = [row[0] for row in rows[:limit]]
+    else:
+        items = list(rows[:limit])
+    has_more = len(rows) > limit
+
+    if seeking or total_mode == "none":
+        return Page(items=items, total=None, has_more=has_more)
+
+    if total_mode == "window":
+        if rows:
+            return Page(items=items, total=int(rows[0][-1]), has_more=has_more)
+        if offset == 0:
+            return Page(items=items, total=0, has_more=False)
+        # Offset más allá del final: la ventana no devuelve filas, se cuenta aparte.
+        count_stmt = select_count(stmt)
+        total = int((await db.execute(count_stmt)).scalar_one() or 0)
+        return Page(items=items, total=total, has_more=False)
+
+    # estimate: si la página no está llena el total exacto ya se conoce.
+    if not has_more and (items or offset == 0):
+        return Page(items=items, total=offset + len(items), has_more=False)
+    estimated = await estimate_total(db, stmt)
+    seen = offset + len(items) + (1 if has_more else 0)
+    return Page(
+        items=items,
+        total=max(estimated, seen),
+        has_more=has_more,
+        total_is_estimate=True,
+    )
+
+
+def select_count(stmt: Select[Any]) -> Select[Any]:
+    """`SELECT count(*)` sobre el conjunto filtrado de `stmt` (sin orden ni página)."""
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
@@ -0,0 +1,179 @@
+"""
+ConsultaMed Backend - Password Hashing Pool
+
+Ejecuta bcrypt fuera del event loop.
+
+Cada verificación con coste 12 consume ~250 ms de CPU. Dentro del handler
+async congela el worker entero: en un cambio de turno, con todos entrando a
+la vez, se paraban también los listados y las recetas. Aquí el hashing y la
+verificación se envían a un pool de hilos acotado (bcrypt libera el GIL), de
+modo que una ráfaga de logins solo alarga la espera de los propios logins.
+Por encima de `workers + max_queue` operaciones pendientes se rechaza de
+inmediato (503 + Retry-After) en lugar de acumular peticiones.
+"""
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple, TypeVar
+
+from app.config import settings
+from app.services.security import hash_password, verify_password
+
+T = TypeVar("T")
+
+
+class PasswordHasherOverloadedError(RuntimeError):
+    """Demasiadas operaciones bcrypt pendientes; reintentar más tarde."""
+
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("Demasiados inicios de sesión simultáneos, reintenta en unos segundos")
+        self.retry_after_seconds = retry_after_seconds
+
+
+@dataclass(frozen=True)
+class PasswordHasherStats:
+    """Contadores del pool de bcrypt (para métricas y diagnóstico)."""
+
+    workers: int
+    capacity: int
+    in_flight: int
+    operations: int
+    rejected: int
+    work_seconds_total: float
+    queue_seconds_total: float
+    queue_seconds_max: float
+
+    @property
+    def queue_depth(self) -> int:
+        """Operaciones admitidas que esperan a un hilo libre."""
+        return max(self.in_flight - self.workers, 0)
+
+
+class PasswordHasher:
+    """
+    Pool acotado de hashing y verificación de contraseñas.
+
+    Admite `workers + max_queue` operaciones simultáneas entre en curso y en
+    espera; la siguiente recibe `PasswordHasherOverloadedError`.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        verify: Callable[[str, Optional[str]], bool] = verify_password,
+        hash: Callable[[str], str] = hash_password,
+    ) -> None:
+        self.workers = max(workers, 1)
+        self.max_queue = max_queue
+        self._verify = verify
+        self._hash = hash
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._operations = 0
+        self._rejected = 0
+        self._work_seconds_total = 0.0
+        self._queue_seconds_total = 0.0
+        self._queue_seconds_max = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Creación perezosa: importar la app (tests, CLI) no lanza hilos.
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="bcrypt"
+            )
+        return self._executor
+
+    def retry_after_seconds(self) -> int:
+        """Estimación de cuándo habrá hueco: operaciones pendientes × duración media."""
+        with self._lock:
+            average = self._work_seconds_total / self._operations if self._operations else 0.25
+            pending = self._in_flight
+        return max(1, math.ceil(average * pending / self.workers))
+
+    def _release(self, _future: object = None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _timed_call(self, submitted: float, function: Callable[..., T], *args: object) -> Tuple[T, float, float]:
+        started = time.perf_counter()
+        result = function(*args)
+        return result, started - submitted, time.perf_counter() - started
+
+    async def _run(self, function: Callable[..., T], *args: object) -> T:
+        with self._lock:
+            admitted = self._in_flight < self.capacity
+            if admitted:
+                self._in_flight += 1
+            else:
+                self._rejected += 1
+        if not admitted:
+            raise PasswordHasherOverloadedError(self.retry_after_seconds())
+
+        try:
+            future = self._get_executor().submit(self._timed_call, time.perf_counter(), function, *args)
+        except BaseException:
+            self._release()
+            raise
+        # El hueco se libera cuando bcrypt termina, no cuando el cliente se va.
+        future.add_done_callback(self._release)
+
+        result, queue_seconds, work_seconds = await asyncio.wrap_future(future)
+        with self._lock:
+            self._operations += 1
+            self._work_seconds_total += work_seconds
+            self._queue_seconds_total += queue_seconds
+            self._queue_seconds_max = max(self._queue_seconds_max, queue_seconds)
+        return result
+
+    async def verify(self, password: str, password_hash: Optional[str]) -> bool:
+        """
+        `verify_password` sin bloquear el event loop.
+
+        Raises:
+            PasswordHasherOverloadedError: si no caben más operaciones pendientes.
+        """
+        return await self._run(self._verify, password, password_hash)
+
+    async def hash(self, password: str) -> str:
+        """
+        `hash_password` sin bloquear el event loop.
+
+        Raises:
+            ValueError: si la contraseña no cumple los requisitos de bcrypt.
+            PasswordHasherOverloadedError: si no caben más operaciones pendientes.
+        """
+        return await self._run(self._hash, password)
+
+    def stats(self) -> PasswordHasherStats:
+        with self._lock:
+            return PasswordHasherStats(
+                workers=self.workers,
+                capacity=self.capacity,
+                in_flight=self._in_flight,
+                operations=self._operations,
+                rejected=self._rejected,
+                work_seconds_total=self._work_seconds_total,
+                queue_seconds_total=self._queue_seconds_total,
+                queue_seconds_max=self._queue_seconds_max,
+            )
+
+    def shutdown(self) -> None:
+        """Detiene los hilos (al apagar la aplicación)."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.BCRYPT_WORKERS,
+    max_queue=settings.BCRYPT_MAX_QUEUE,
+)
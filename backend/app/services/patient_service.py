@@ -4,125 +4,293 @@ ConsultaMed Backend - Patient Service
 Lógica de negocio para gestión de pacientes.
 Operaciones alineadas con FHIR R5 interactions.
 """
-from datetime import datetime
-from typing import Optional, List, Dict, Tuple, Any
-from sqlalchemy import select, or_, func
+from dataclasses import dataclass
+from typing import Optional, List, Set, Any
+from sqlalchemy import Row, Select, column, select, or_, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import selectinload
 
 from app.services.base import BaseService
 from app.models.patient import Patient
+from app.models.patient_summary import PatientSummaryRecord
 from app.models.allergy import AllergyIntolerance
 from app.models.encounter import Encounter
+from app.services.pagination import (
+    Page,
+    PaginationMode,
+    TotalMode,
+    decode_cursor,
+    encode_cursor,
+    fetch_page,
+    keyset_predicate,
+)
+from app.services.row_version import row_set_version, row_version
+from app.services.search_text import contains_pattern, normalize_search_text
 from app.validators.dni import validate_documento_identidad, format_dni
 from app.validators.clinical import validate_birth_date
 
+PATIENT_CURSOR_SCOPE = "patients"
+# Consultas que acompañan a la ficha del paciente; el resto se pagina aparte
+RECENT_ENCOUNTERS_LIMIT = 5
+
+
+@dataclass
+class PatientDetail:
+    """Ficha de paciente con sus últimas consultas (perfil de carga "detail")."""
+
+    patient: Patient
+    recent_encounters: List[Encounter]
+    has_more_encounters: bool
+
 
 class PatientService(BaseService[Patient]):
     """
     Service class for Patient resource operations (FHIR R5 Patient).
 
     Naming conventions:
-    - get_by_id(): FHIR Read (get single resource by ID)
+    - get_by_id(): FHIR Read (get single resource by ID, light profile)
+    - get_detail(): FHIR Read plus the latest encounters (bounded)
+    - get_detail_version(): row versions of get_detail() (ETag)
+    - exists(): existence check without loading the resource
     - search(): FHIR Search (query with parameters)
     - create(): FHIR Create
     - update(): FHIR Update (partial, uses PATCH semantics)
+    - search_summaries(): listing projection backed by `patient_summary`
+    - rebuild_summaries() / find_summary_mismatches(): admin (CLI only)
     """
 
     @staticmethod
-    def _build_search_conditions(query: str) -> List[Any]:
+    def _search_text_expr() -> Any:
+        """
+        Nombre completo normalizado (sin acentos, minúsculas).
+
+        Debe ser exactamente la expresión del índice GIN `idx_patients_search_text_trgm`
+        (ver migración 20261017090000_patient_trigram_search.sql).
+        """
+        return func.patient_search_text(Patient.name_given, Patient.name_family)
+
+    @classmethod
+    def _build_search_conditions(cls, query: str) -> List[Any]:
         """Construye condiciones SQL para listado/búsqueda de pacientes activos."""
         conditions: List[Any] = [Patient.active.is_(True)]
-        normalized_query = query.strip()
+        normalized_query = normalize_search_text(query)
         if normalized_query:
-            search_term = f"%{normalized_query}%"
+            # Patrón LIKE servido por índices de trigramas (pg_trgm), sin acentos.
+            search_pattern = contains_pattern(normalized_query)
             conditions.append(
                 or_(
-                    Patient.name_given.ilike(search_term),
-                    Patient.name_family.ilike(search_term),
-                    Patient.identifier_value.ilike(search_term),
+                    cls._search_text_expr().like(search_pattern),
+                    Patient.identifier_value.ilike(search_pattern),
                 )
             )
         return conditions
+
+    @classmethod
+    def _build_search_order(cls, query: str) -> List[Any]:
+        """Ordena por similitud con el término (si lo hay) y después alfabéticamente."""
+        order_by: List[Any] = []
+        normalized_query = normalize_search_text(query)
+        if normalized_query:
+            rank = func.greatest(
+                func.word_similarity(normalized_query, cls._search_text_expr()),
+                func.similarity(Patient.identifier_value, normalized_query),
+            )
+            order_by.append(rank.desc())
+        order_by.extend([Patient.name_family, Patient.name_given])
+        return order_by
     
     async def search(
         self,
         query: str,
         limit: int = 20,
-        offset: int = 0
-    ) -> tuple[List[Patient], int]:
+        offset: int = 0,
+        *,
+        mode: PaginationMode = "offset",
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = "window",
+    ) -> Page[Patient]:
         """
         Search patients by name or DNI.
         
+        Accent-insensitive substring match, ranked by trigram similarity.
+
         Args:
             query: Search term (name or DNI)
             limit: Maximum results to return
-            offset: Pagination offset
+            offset: Pagination offset (offset mode only)
+            mode: "offset" (default) or "cursor" (keyset over family/given name + id)
+            cursor: `next_cursor` from the previous page (cursor mode)
+            total_mode: "window" (exact, same query), "estimate" (planner) or "none"
             
         Returns:
-            Tuple of (patients list, total count)
+            Page with patients, total, has_more and next cursor (cursor mode)
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed
+        """
+        stmt = select(Patient).options(selectinload(Patient.allergies))
+        return await self._search_page(
+            stmt, query, limit, offset, mode=mode, cursor=cursor, total_mode=total_mode
+        )
+
+    async def search_summaries(
+        self,
+        query: str,
+        limit: int = 20,
+        offset: int = 0,
+        *,
+        mode: PaginationMode = "offset",
+        cursor: Optional[str] = None,
+        total_mode: TotalMode = "window",
+    ) -> Page[Row[Any]]:
         """
-        conditions = self._build_search_conditions(query)
+        Same search as `search`, projected onto the `PatientSummary` columns.
 
+        One query per page, returning plain rows (no ORM instances, no identity
+        map, no allergy rows loaded). The counts are read from `patient_summary`,
+        kept up to date by database triggers, so the cost does not depend on
+        how much clinical history each patient has. The summary is a LEFT JOIN
+        on its primary key: one lookup per row for the three columns, and the
+        1:1 join does not change the filtered rows or the window total.
+        """
         stmt = (
-            select(Patient)
-            .options(selectinload(Patient.allergies))
-            .where(*conditions)
-            .order_by(Patient.name_family, Patient.name_given)
-            .limit(limit)
-            .offset(offset)
+            select(
+                Patient.id,
+                Patient.identifier_value,
+                Patient.name_given,
+                Patient.name_family,
+                Patient.birth_date,
+                Patient.gender,
+                Patient.telecom_phone,
+                # Sin fila de resumen (p. ej. triggers desactivados durante una carga)
+                func.coalesce(PatientSummaryRecord.active_allergy_count, 0).label("allergy_count"),
+                func.coalesce(PatientSummaryRecord.encounter_count, 0).label("encounter_count"),
+                PatientSummaryRecord.last_encounter_at.label("last_encounter_at"),
+            )
+            .select_from(Patient)
+            .outerjoin(PatientSummaryRecord, PatientSummaryRecord.patient_id == Patient.id)
         )
+        return await self._search_page(
+            stmt, query, limit, offset, mode=mode, cursor=cursor, total_mode=total_mode
+        )
+
+    async def _search_page(
+        self,
+        stmt: Select[Any],
+        query: str,
+        limit: int,
+        offset: int,
+        *,
+        mode: PaginationMode,
+        cursor: Optional[str],
+        total_mode: TotalMode,
+    ) -> Page[Any]:
+        """Filtra, ordena y pagina `stmt` (entidades o proyección de Patient)."""
+        stmt = stmt.where(*self._build_search_conditions(query))
+
+        if mode == "cursor":
+            # Keyset: orden alfabético estable (sin ranking por similitud) para
+            # que la clave (apellidos, nombre, id) determine la página siguiente.
+            sort_key = (Patient.name_family, Patient.name_given, Patient.id)
+            if cursor:
+                after = decode_cursor(cursor, PATIENT_CURSOR_SCOPE, (str, str, str))
+                stmt = stmt.where(keyset_predicate(sort_key, after))
+            stmt = stmt.order_by(*sort_key)
+            offset = 0
+        else:
+            stmt = stmt.order_by(*self._build_search_order(query), Patient.id)
+
+        page = await fetch_page(
+            self.db,
+            stmt,
+            limit=limit,
+            offset=offset,
+            total_mode=total_mode,
+            seeking=mode == "cursor" and bool(cursor),
+        )
+
+        if mode == "cursor" and page.has_more:
+            last = page.items[-1]
+            page.next_cursor = encode_cursor(
+                PATIENT_CURSOR_SCOPE, (last.name_family, last.name_given, last.id)
+            )
         
-        result = await self.db.execute(stmt)
-        patients = result.scalars().all()
-        
-        count_stmt = select(func.count(Patient.id)).where(*conditions)
-        count_result = await self.db.execute(count_stmt)
-        total = int(count_result.scalar_one() or 0)
-        
-        return list(patients), total
+        return page
     
+    async def exists(self, patient_id: str) -> bool:
+        """Check that a patient exists without loading any of its data."""
+        result = await self.db.execute(select(Patient.id).where(Patient.id == patient_id))
+        return result.scalar_one_or_none() is not None
+
     async def get_by_id(self, patient_id: str) -> Optional[Patient]:
-        """Get patient by ID with allergies and recent encounters."""
+        """
+        Get patient by ID with its allergies (light profile).
+
+        Used for edit checks and for every response built from `PatientResponse`.
+        The clinical history is never loaded here: see `get_detail`.
+        """
         stmt = (
             select(Patient)
-            .options(
-                selectinload(Patient.allergies),
-                selectinload(Patient.encounters),
-            )
+            .options(selectinload(Patient.allergies))
             .where(Patient.id == patient_id)
         )
         
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def get_encounter_stats(
-        self,
-        patient_ids: List[str],
-    ) -> Dict[str, Tuple[int, Optional[datetime]]]:
-        """Obtiene total y última consulta por paciente en una sola consulta agregada."""
-        if not patient_ids:
-            return {}
+    async def get_detail(
+        self, patient_id: str, recent_limit: int = RECENT_ENCOUNTERS_LIMIT
+    ) -> Optional[PatientDetail]:
+        """
+        Get patient by ID with allergies and its latest encounters (detail profile).
+
+        At most `recent_limit` encounters are read, newest first, whatever the
+        length of the history; the full history is paginated by
+        `GET /encounters/patient/{patient_id}`.
+        """
+        patient = await self.get_by_id(patient_id)
+        if patient is None:
+            return None
 
         stmt = (
-            select(
-                Encounter.subject_id.label("patient_id"),
-                func.count(Encounter.id).label("encounter_count"),
-                func.max(Encounter.period_start).label("last_encounter_at"),
-            )
-            .where(Encounter.subject_id.in_(patient_ids))
-            .group_by(Encounter.subject_id)
+            select(Encounter)
+            .where(Encounter.subject_id == patient_id)
+            .order_by(Encounter.period_start.desc(), Encounter.id.desc())
+            .limit(recent_limit + 1)
         )
-        result = await self.db.execute(stmt)
+        encounters = list((await self.db.execute(stmt)).scalars().all())
+        return PatientDetail(
+            patient=patient,
+            recent_encounters=encounters[:recent_limit],
+            has_more_encounters=len(encounters) > recent_limit,
+        )
+    
+    async def get_detail_version(
+        self, patient_id: str, recent_limit: int = RECENT_ENCOUNTERS_LIMIT
+    ) -> Optional[Row[Any]]:
+        """
+        Row versions of everything `get_detail` returns, in one small query.
 
-        stats: Dict[str, Tuple[int, Optional[datetime]]] = {}
-        for row in result:
-            stats[row.patient_id] = (
-                int(row.encounter_count or 0),
-                row.last_encounter_at,
-            )
+        Covers the patient row, its allergies and the same bounded set of
+        recent encounters (one extra row, as `has_more_encounters` depends on
+        it). Used as the ETag of the patient record.
+
+        Returns:
+            The version row, or None if the patient does not exist
+        """
+        stmt = select(
+            row_version(Patient.__tablename__),
+            row_set_version(AllergyIntolerance, AllergyIntolerance.patient_id == patient_id),
+            row_set_version(
+                Encounter,
+                Encounter.subject_id == patient_id,
+                order_by=(Encounter.period_start.desc(), Encounter.id.desc()),
+                limit=recent_limit + 1,
+            ),
+        ).where(Patient.id == patient_id)
+        result = await self.db.execute(stmt)
+        return result.one_or_none()
 
-        return stats
-    
     async def get_by_dni(self, dni: str) -> Optional[Patient]:
         """Get patient by DNI/NIE."""
         formatted_dni = format_dni(dni)
@@ -131,6 +299,42 @@ class PatientService(BaseService[Patient]):
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
     
+    @staticmethod
+    def prepare_new_patient(data: dict) -> dict:
+        """
+        Validate and normalize new patient data without touching the database.
+
+        Shared by `create` and the bulk importer, so both apply the same rules.
+
+        Returns:
+            Column values ready for INSERT (DNI/NIE formatted)
+
+        Raises:
+            ValueError: If validation fails
+        """
+        # Validate DNI/NIE
+        is_valid, _ = validate_documento_identidad(data["identifier_value"])
+        if not is_valid:
+            raise ValueError("DNI/NIE inválido: la letra no corresponde")
+
+        # Validate birth date (lógica de negocio: rangos razonables)
+        if "birth_date" in data:
+            is_valid, error = validate_birth_date(data["birth_date"])
+            if not is_valid:
+                raise ValueError(error)
+
+        # Note: gender validation is handled by Pydantic schema (PatientCreate)
+
+        return {
+            "identifier_value": format_dni(data["identifier_value"]),
+            "name_given": data["name_given"],
+            "name_family": data["name_family"],
+            "birth_date": data["birth_date"],
+            "gender": data.get("gender"),
+            "telecom_phone": data.get("telecom_phone"),
+            "telecom_email": data.get("telecom_email"),
+        }
+
     async def create(self, data: dict) -> Patient:
         """
         Create new patient with validation.
@@ -144,34 +348,15 @@ class PatientService(BaseService[Patient]):
         Raises:
             ValueError: If validation fails
         """
-        # Validate DNI/NIE
-        is_valid, _ = validate_documento_identidad(data["identifier_value"])
-        if not is_valid:
-            raise ValueError("DNI/NIE inválido: la letra no corresponde")
+        values = self.prepare_new_patient(data)
         
         # Check for duplicates
-        existing = await self.get_by_dni(data["identifier_value"])
+        existing = await self.get_by_dni(values["identifier_value"])
         if existing:
             raise ValueError(f"Ya existe un paciente con DNI {data['identifier_value']}")
-        
-        # Validate birth date (lógica de negocio: rangos razonables)
-        if "birth_date" in data:
-            is_valid, error = validate_birth_date(data["birth_date"])
-            if not is_valid:
-                raise ValueError(error)
-
-        # Note: gender validation is handled by Pydantic schema (PatientCreate)
 
         # Create patient
-        patient = Patient(
-            identifier_value=format_dni(data["identifier_value"]),
-            name_given=data["name_given"],
-            name_family=data["name_family"],
-            birth_date=data["birth_date"],
-            gender=data.get("gender"),
-            telecom_phone=data.get("telecom_phone"),
-            telecom_email=data.get("telecom_email"),
-        )
+        patient = Patient(**values)
         
         self.db.add(patient)
         await self.commit_and_refresh(patient)
@@ -181,6 +366,74 @@ class PatientService(BaseService[Patient]):
         if reloaded_patient is None:
             raise ValueError("No se pudo recargar el paciente tras crearlo")
         return reloaded_patient
+
+    async def rebuild_summaries(self) -> int:
+        """
+        Recalcula `patient_summary` a partir del historial (solo CLI administrativo).
+
+        Returns:
+            Número de pacientes recalculados.
+        """
+        result = await self.db.execute(select(func.rebuild_patient_summary()))
+        rebuilt = int(result.scalar_one())
+        await self.db.commit()
+        return rebuilt
+
+    async def find_summary_mismatches(self, limit: int = 20) -> tuple[int, List[Row[Any]]]:
+        """
+        Pacientes cuyo resumen no coincide con el historial real.
+
+        Returns:
+            (total de pacientes con diferencias, las primeras `limit` filas)
+        """
+        mismatches = func.patient_summary_mismatches().table_valued(
+            *(
+                column(name)
+                for name in (
+                    "patient_id",
+                    "stored_active_allergy_count",
+                    "actual_active_allergy_count",
+                    "stored_encounter_count",
+                    "actual_encounter_count",
+                    "stored_last_encounter_at",
+                    "actual_last_encounter_at",
+                )
+            )
+        )
+        stmt = (
+            select(mismatches, func.count().over().label("mismatch_total"))
+            .order_by(mismatches.c.patient_id)
+            .limit(limit)
+        )
+        rows = list((await self.db.execute(stmt)).all())
+        return (int(rows[0].mismatch_total) if rows else 0), rows
+
+    async def list_identifiers(self) -> Set[str]:
+        """All stored DNI/NIE values (bulk import duplicate pre-check)."""
+        result = await self.db.execute(select(Patient.identifier_value))
+        return set(result.scalars().all())
+
+    async def bulk_insert(self, rows: List[dict]) -> Set[str]:
+        """
+        Insert prepared patients (`prepare_new_patient` output) in bulk.
+
+        Multi-row INSERT ... ON CONFLICT (identifier_value) DO NOTHING: a DNI
+        inserted concurrently is skipped instead of aborting the batch.
+        Does not commit; the caller decides the transaction size.
+
+        Returns:
+            DNI/NIE values actually inserted
+        """
+        if not rows:
+            return set()
+
+        stmt = (
+            pg_insert(Patient)
+            .on_conflict_do_nothing(index_elements=[Patient.identifier_value])
+            .returning(Patient.identifier_value)
+        )
+        result = await self.db.execute(stmt, rows)
+        return set(result.scalars().all())
     
     async def update(self, patient_id: str, data: dict) -> Optional[Patient]:
         """Update patient data."""
@@ -0,0 +1,272 @@
+"""
+ConsultaMed Backend - Prescription PDF Cache
+
+Caché direccionada por contenido para recetas ya renderizadas.
+
+La clave es el SHA-256 del payload normalizado de la receta (JSON canónico)
+más la huella de la plantilla y del código de render: si cambia cualquier dato
+impreso o el diseño, cambia la clave y no hace falta invalidar nada. Reabrir o
+reimprimir una consulta sin cambios se sirve desde memoria en milisegundos.
+
+Niveles:
+- Memoria: LRU acotado en bytes, por proceso.
+- Disco (opcional, `CONSULTAMED_PDF_CACHE_DIR`): compartido entre workers y
+  reinicios, con expulsión por tamaño total. Desactivado por defecto porque
+  los PDF contienen datos personales de salud: activarlo solo en un directorio
+  local con permisos restringidos.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.config import settings
+
+_APP_DIR = Path(__file__).resolve().parent.parent
+_RENDER_SOURCES = (_APP_DIR / "templates", Path(__file__).with_name("pdf_service.py"))
+
+
+@lru_cache(maxsize=1)
+def template_fingerprint() -> str:
+    """Huella de plantillas, recursos y código de render (cambia con cada despliegue que los toque)."""
+    digest = hashlib.sha256()
+    for source in _RENDER_SOURCES:
+        files = sorted(p for p in source.rglob("*") if p.is_file()) if source.is_dir() else [source]
+        for path in files:
+            if path.suffix == ".pyc":
+                continue
+            digest.update(str(path.relative_to(_APP_DIR)).encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def prescription_cache_key(payload: Dict[str, Any]) -> str:
+    """SHA-256 del payload de receta en JSON canónico + huella de plantilla."""
+    canonical = json.dumps(
+        payload,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    digest = hashlib.sha256()
+    digest.update(template_fingerprint().encode("ascii"))
+    digest.update(b"\0")
+    digest.update(canonical.encode("utf-8"))
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class PDFCacheStats:
+    """Contadores de la caché de PDF."""
+
+    memory_entries: int
+    memory_bytes: int
+    memory_hits: int
+    disk_hits: int
+    misses: int
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _MemoryLRU:
+    """LRU acotado por tamaño total en bytes."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size_bytes -= len(previous)
+        self._entries[key] = value
+        self.size_bytes += len(value)
+        while self.size_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= len(evicted)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
+
+
+class _DiskTier:
+    """
+    Ficheros `<dir>/<ab>/<clave>.pdf` con expulsión por tamaño.
+
+    Un acierto actualiza el mtime, así que la expulsión borra primero los
+    menos usados. Las escrituras son atómicas (fichero temporal + rename) para
+    que otro worker nunca lea un PDF a medias.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pdf"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def put(self, key: str, value: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(value)
+            os.replace(tmp_name, path)
+        except OSError:
+            Path(tmp_name).unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            files = []
+            total = 0
+            for path in self.directory.glob("*/*.pdf"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(files):
+                path.unlink(missing_ok=True)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+
+class PDFCache:
+    """
+    Caché de PDF en dos niveles con deduplicación de renders concurrentes.
+
+    Dos peticiones simultáneas de la misma receta (doble clic, varias
+    pestañas) esperan al mismo render en lugar de lanzar dos.
+    """
+
+    def __init__(
+        self,
+        memory_max_bytes: int,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+    ) -> None:
+        self._memory = _MemoryLRU(memory_max_bytes) if memory_max_bytes > 0 else None
+        self._disk = (
+            _DiskTier(Path(disk_dir), disk_max_bytes) if disk_dir and disk_max_bytes > 0 else None
+        )
+        self._pending: Dict[str, "asyncio.Task[bytes]"] = {}
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Busca en memoria y después en disco (promocionando a memoria)."""
+        if self._memory is not None:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory_hits += 1
+                return cached
+
+        if self._disk is not None:
+            cached = await asyncio.to_thread(self._disk.get, key)
+            if cached is not None:
+                self._disk_hits += 1
+                if self._memory is not None:
+                    self._memory.put(key, cached)
+                return cached
+
+        return None
+
+    async def put(self, key: str, value: bytes) -> None:
+        if self._memory is not None:
+            self._memory.put(key, value)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk.put, key, value)
+
+    async def get_or_render(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Devuelve el PDF cacheado o lo renderiza una sola vez y lo guarda."""
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._pending.get(key)
+        if task is None:
+            self._misses += 1
+            task = asyncio.ensure_future(self._render_and_store(key, render))
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._finish_pending(key, done))
+        # shield: si un cliente se desconecta, el render sigue para los demás.
+        return await asyncio.shield(task)
+
+    async def _render_and_store(self, key: str, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        pdf_bytes = await render()
+        await self.put(key, pdf_bytes)
+        return pdf_bytes
+
+    def _finish_pending(self, key: str, task: "asyncio.Task[bytes]") -> None:
+        self._pending.pop(key, None)
+        if not task.cancelled():
+            # Marca el error como consumido aunque todos los clientes se hayan ido.
+            task.exception()
+
+    def clear(self) -> None:
+        """Vacía el nivel de memoria y los contadores (el disco se conserva)."""
+        if self._memory is not None:
+            self._memory.clear()
+        self._memory_hits = self._disk_hits = self._misses = 0
+
+    def stats(self) -> PDFCacheStats:
+        return PDFCacheStats(
+            memory_entries=len(self._memory) if self._memory is not None else 0,
+            memory_bytes=self._memory.size_bytes if self._memory is not None else 0,
+            memory_hits=self._memory_hits,
+            disk_hits=self._disk_hits,
+            misses=self._misses,
+        )
+
+
+pdf_cache = PDFCache(
+    memory_max_bytes=settings.PDF_CACHE_MEMORY_MB * 1024 * 1024,
+    disk_dir=settings.PDF_CACHE_DIR,
+    disk_max_bytes=settings.PDF_CACHE_DISK_MAX_MB * 1024 * 1024,
+)
@@ -0,0 +1,253 @@
+"""
+ConsultaMed Backend - PDF Render Pool
+
+Ejecuta WeasyPrint fuera del event loop.
+
+Un render de receta tarda cientos de milisegundos de CPU; hecho dentro del
+handler async bloquea todas las demás peticiones del worker. Aquí los renders
+se envían a un pool de procesos acotado, con un límite de renders en espera:
+por encima de él se rechaza de inmediato (503 + Retry-After) en lugar de
+acumular peticiones que acabarían en timeout.
+"""
+import asyncio
+import functools
+import logging
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+RenderFunction = Callable[[Dict[str, Any]], Tuple[bytes, float]]
+
+# PDFService propio de cada proceso del pool (se crea en el primer render).
+_worker_service: Any = None
+
+
+def render_prescription(payload: Dict[str, Any]) -> Tuple[bytes, float]:
+    """
+    Renderiza una receta dentro del proceso worker.
+
+    Args:
+        payload: Salida de `_build_prescription_payload` (patient, practitioner,
+            encounter, medications, instructions).
+
+    Returns:
+        (PDF, segundos de render dentro del worker)
+    """
+    global _worker_service
+    if _worker_service is None:
+        # Import diferido: WeasyPrint solo se carga en los procesos que renderizan.
+        from app.services.pdf_service import PDFService
+
+        _worker_service = PDFService()
+
+    started = time.perf_counter()
+    pdf_bytes = _worker_service.generate_prescription_pdf(**payload)
+    return pdf_bytes, time.perf_counter() - started
+
+
+class PDFRenderOverloadedError(RuntimeError):
+    """El pool está lleno (renders en curso + en espera); reintentar más tarde."""
+
+    def __init__(self, retry_after_seconds: int) -> None:
+        super().__init__("Generación de PDF saturada, reintenta en unos segundos")
+        self.retry_after_seconds = retry_after_seconds
+
+
+@dataclass(frozen=True)
+class PDFRenderStats:
+    """Contadores del pool de render (para métricas y diagnóstico)."""
+
+    workers: int
+    capacity: int
+    in_flight: int
+    renders: int
+    failures: int
+    rejected: int
+    render_seconds_total: float
+    render_seconds_max: float
+    queue_seconds_total: float
+
+    @property
+    def render_seconds_avg(self) -> float:
+        return self.render_seconds_total / self.renders if self.renders else 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Renders admitidos que esperan a que quede libre un worker."""
+        return max(self.in_flight - max(self.workers, 1), 0)
+
+
+class PDFRenderPool:
+    """
+    Pool acotado de render de PDF.
+
+    - `workers > 0`: procesos dedicados (contexto spawn, sin heredar el event
+      loop ni las conexiones del proceso web).
+    - `workers == 0`: un único hilo en el propio proceso; libera el event loop
+      pero comparte el GIL (útil donde no se pueden lanzar procesos).
+
+    Admite `max(workers, 1) + max_queue` renders simultáneos entre en curso y
+    en espera; el siguiente recibe `PDFRenderOverloadedError`.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_queue: int,
+        render: RenderFunction = render_prescription,
+    ) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self._render = render
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._renders = 0
+        self._failures = 0
+        self._rejected = 0
+        self._render_seconds_total = 0.0
+        self._render_seconds_max = 0.0
+        self._queue_seconds_total = 0.0
+
+    @property
+    def concurrency(self) -> int:
+        return max(self.workers, 1)
+
+    @property
+    def capacity(self) -> int:
+        return self.concurrency + self.max_queue
+
+    def _get_executor(self) -> Executor:
+        # Creación perezosa: importar la app (tests, CLI) no lanza procesos.
+        if self._executor is None:
+            if self.workers > 0:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="pdf-render"
+                )
+        return self._executor
+
+    def retry_after_seconds(self) -> int:
+        """Estimación de cuándo habrá hueco: renders pendientes × duración media."""
+        with self._lock:
+            average = self._render_seconds_total / self._renders if self._renders else 1.0
+            pending = self._in_flight
+        return max(1, math.ceil(average * pending / self.concurrency))
+
+    def _release(self, _future: object = None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _discard_executor(self, executor: Executor) -> None:
+        """
+        Descarta un pool roto (un worker murió: OOM, señal) para recrearlo en la
+        próxima petición. Solo si sigue siendo el actual: otro render que falló
+        a la vez no debe tirar el pool ya recreado.
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _on_render_done(self, executor: Executor, future: Future[Any]) -> None:
+        # Corre aunque el cliente ya se haya ido: el pool roto se descarta igual
+        self._release()
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard_executor(executor)
+
+    async def render(self, payload: Dict[str, Any]) -> bytes:
+        """
+        Renderiza un PDF sin bloquear el event loop.
+
+        Raises:
+            PDFRenderOverloadedError: si no caben más renders en curso ni en espera.
+        """
+        with self._lock:
+            admitted = self._in_flight < self.capacity
+            if admitted:
+                self._in_flight += 1
+            else:
+                self._rejected += 1
+        if not admitted:
+            raise PDFRenderOverloadedError(self.retry_after_seconds())
+
+        started = time.perf_counter()
+        executor: Optional[Executor] = None
+        try:
+            executor = self._get_executor()
+            future = executor.submit(self._render, payload)
+        except BaseException as exc:
+            self._release()
+            if isinstance(exc, BrokenProcessPool) and executor is not None:
+                # El pool ya estaba roto al enviar: sin descartarlo fallarían todos los renders
+                with self._lock:
+                    self._failures += 1
+                self._discard_executor(executor)
+            raise
+        # El hueco se libera cuando termina el render, no cuando el cliente se va:
+        # una petición cancelada no debe permitir encolar más trabajo del que cabe.
+        future.add_done_callback(functools.partial(self._on_render_done, executor))
+
+        try:
+            pdf_bytes, render_seconds = await asyncio.wrap_future(future)
+        except Exception:
+            with self._lock:
+                self._failures += 1
+            raise
+
+        total_seconds = time.perf_counter() - started
+        queue_seconds = max(total_seconds - render_seconds, 0.0)
+        with self._lock:
+            self._renders += 1
+            self._render_seconds_total += render_seconds
+            self._render_seconds_max = max(self._render_seconds_max, render_seconds)
+            self._queue_seconds_total += queue_seconds
+
+        logger.info(
+            "PDF render: %.1f ms (espera %.1f ms, total %.1f ms, %d bytes)",
+            render_seconds * 1000,
+            queue_seconds * 1000,
+            total_seconds * 1000,
+            len(pdf_bytes),
+        )
+        return pdf_bytes
+
+    def stats(self) -> PDFRenderStats:
+        with self._lock:
+            return PDFRenderStats(
+                workers=self.workers,
+                capacity=self.capacity,
+                in_flight=self._in_flight,
+                renders=self._renders,
+                failures=self._failures,
+                rejected=self._rejected,
+                render_seconds_total=self._render_seconds_total,
+                render_seconds_max=self._render_seconds_max,
+                queue_seconds_total=self._queue_seconds_total,
+            )
+
+    def shutdown(self) -> None:
+        """Detiene los workers (al apagar la aplicación)."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+pdf_render_pool = PDFRenderPool(
+    workers=settings.PDF_RENDER_WORKERS,
+    max_queue=settings.PDF_RENDER_MAX_QUEUE,
+)
@@ -2,23 +2,52 @@
 ConsultaMed Backend - PDF Generation Service
 
 Genera recetas médicas en PDF usando WeasyPrint.
+
+Todo lo que no depende de la receta concreta se prepara una sola vez por
+instancia (una por proceso de render): plantilla Jinja compilada, hojas de
+estilo parseadas, configuración de fuentes y caché de imágenes. Cada documento
+solo paga el render del HTML y la maquetación.
 """
 import base64
 from pathlib import Path
 from typing import List, Dict, Any, cast, Optional
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from weasyprint import HTML, CSS
+from weasyprint.text.fonts import FontConfiguration
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
+
+# CSS for A4 page
+PAGE_CSS = """
+    @page {
+        size: A4;
+        margin: 7mm;
+    }
+"""
 
 
 class PDFService:
     """Service for generating PDF prescriptions."""
     
     def __init__(self) -> None:
-        """Initialize PDF service with templates directory."""
-        template_dir = Path(__file__).parent.parent / "templates"
-        self.env = Environment(loader=FileSystemLoader(str(template_dir)))
-        self.logo_path = template_dir / "assets" / "logo-guadalix.png"
+        """Initialize PDF service: template, stylesheets and fonts, built once."""
+        self.env = Environment(
+            loader=FileSystemLoader(str(TEMPLATE_DIR)),
+            # Las plantillas solo cambian con un despliegue: sin stat() por render,
+            # y bytecode en disco para que los procesos nuevos no recompilen.
+            auto_reload=False,
+            bytecode_cache=FileSystemBytecodeCache(),
+        )
+        self.template = self.env.get_template("prescription.html")
+        self.font_config = FontConfiguration()
+        self.stylesheets = [
+            CSS(string=PAGE_CSS, font_config=self.font_config),
+            CSS(filename=str(TEMPLATE_DIR / "prescription.css"), font_config=self.font_config),
+        ]
+        # Imágenes ya decodificadas (el logo), compartidas entre documentos.
+        self.image_cache: Dict[str, Any] = {}
+        self.logo_path = TEMPLATE_DIR / "assets" / "logo-guadalix.png"
         self.logo_data_uri = self._load_logo_data_uri()
     
     def generate_prescription_pdf(
@@ -42,12 +71,10 @@ class PDFService:
         Returns:
             PDF file as bytes
         """
-        # Load template
-        template = self.env.get_template("prescription.html")
         normalized_medications = self._normalize_medications(medications)
         
         # Render HTML
-        html_content = template.render(
+        html_content = self.template.render(
             patient=patient,
             practitioner=practitioner,
             encounter=encounter,
@@ -56,17 +83,13 @@ class PDFService:
             logo_data_uri=self.logo_data_uri,
         )
         
-        # CSS for A4 page
-        css = CSS(string='''
-            @page {
-                size: A4;
-                margin: 7mm;
-            }
-        ''')
-        
         # Generate PDF
         html = HTML(string=html_content)
-        pdf_bytes = html.write_pdf(stylesheets=[css])
+        pdf_bytes = html.write_pdf(
+            stylesheets=self.stylesheets,
+            font_config=self.font_config,
+            cache=self.image_cache,
+        )
         
         return cast(bytes, pdf_bytes)
 
@@ -124,8 +147,8 @@ class PDFService:
 
         return normalized
     
+    @staticmethod
     def generate_prescription_preview(
-        self,
         patient: Dict[str, Any],
         practitioner: Dict[str, Any],
         encounter: Dict[str, Any],
@@ -11,14 +11,17 @@ deliberada desde `backend/scripts/manage_practitioners.py`.
 """
 from typing import Any, Mapping, Optional
 
-from sqlalchemy import func, select, update
+from sqlalchemy import func, inspect, select, update
 
+from app.config import settings
 from app.models.encounter import Encounter
 from app.models.medication_request import MedicationRequest
 from app.models.practitioner import Practitioner
 from app.models.template import TreatmentTemplate
 from app.services.base import BaseService
-from app.services.security import hash_password
+from app.services.cache import TTLCache
+from app.services.password_hasher import password_hasher
+from app.services.template_cache import invalidate_templates
 
 # Registros que anclan responsabilidad clínica sobre un profesional. Mientras
 # existan, el perfil no puede borrarse: la firma de una consulta o de una receta
@@ -55,6 +58,24 @@ def describe_deletion_block(counts: Mapping[str, int]) -> Optional[str]:
     )
 
 
+# Instantáneas de columnas del profesional autenticado, por ID (`sub` del JWT).
+# Nunca guarda `password_hash`: la caché solo sirve a la autorización de peticiones.
+practitioner_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+_SNAPSHOT_EXCLUDED_COLUMNS = frozenset({"password_hash"})
+
+
+def _snapshot(practitioner: Practitioner) -> dict[str, Any]:
+    """Valores de columna de un profesional, sin credenciales."""
+    return {
+        attr.key: getattr(practitioner, attr.key)
+        for attr in inspect(Practitioner).column_attrs
+        if attr.key not in _SNAPSHOT_EXCLUDED_COLUMNS
+    }
+
+
 def normalize_email(email: str) -> str:
     """Los emails de acceso se guardan y comparan siempre en minúsculas."""
     return email.strip().lower()
@@ -67,6 +88,7 @@ class PractitionerService(BaseService[Practitioner]):
     - get_by_email() / get_by_id(): FHIR Read
     - list_active(): FHIR Search
     - create(): FHIR Create
+    - get_for_auth(): lectura cacheada para `get_current_practitioner`
     - set_active() / delete(): administración (solo CLI)
     """
 
@@ -76,6 +98,23 @@ class PractitionerService(BaseService[Practitioner]):
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_for_auth(self, practitioner_id: str) -> Optional[Practitioner]:
+        """
+        Profesional autenticado, servido desde `practitioner_cache` si está vigente.
+
+        Devuelve una instancia nueva, fuera de la sesión y sin `password_hash`:
+        apta para leer columnas (id, nombre, `active`...), no para modificarla
+        ni para navegar relaciones.
+        """
+        snapshot = practitioner_cache.get(practitioner_id)
+        if snapshot is None:
+            practitioner = await self.get_by_id(practitioner_id)
+            if practitioner is None:
+                return None
+            snapshot = _snapshot(practitioner)
+            practitioner_cache.set(practitioner_id, snapshot)
+        return Practitioner(**snapshot)
+
     async def get_by_email(self, email: str) -> Optional[Practitioner]:
         """Obtiene un profesional por email de acceso (sin distinguir mayúsculas)."""
         stmt = select(Practitioner).where(
@@ -133,7 +172,7 @@ class PractitionerService(BaseService[Practitioner]):
             name_family=data["name_family"],
             qualification_code=data.get("qualification_code"),
             telecom_email=email,
-            password_hash=hash_password(data["password"]),
+            password_hash=await password_hasher.hash(data["password"]),
             active=True,
         )
 
@@ -147,8 +186,9 @@ class PractitionerService(BaseService[Practitioner]):
         if not practitioner:
             return None
 
-        practitioner.password_hash = hash_password(password)
+        practitioner.password_hash = await password_hasher.hash(password)
         await self.commit_and_refresh(practitioner)
+        practitioner_cache.invalidate(practitioner_id)
         return practitioner
 
     async def set_active(self, practitioner_id: str, active: bool) -> Optional[Practitioner]:
@@ -164,6 +204,7 @@ class PractitionerService(BaseService[Practitioner]):
 
         practitioner.active = active
         await self.commit_and_refresh(practitioner)
+        practitioner_cache.invalidate(practitioner_id)
         return practitioner
 
     async def count_linked_records(self, practitioner_id: str) -> dict[str, int]:
@@ -213,4 +254,8 @@ class PractitionerService(BaseService[Practitioner]):
 
         await self.db.delete(practitioner)
         await self.db.commit()
+        practitioner_cache.invalidate(practitioner_id)
+        # Sus plantillas pasan a ser globales
+        invalidate_templates(practitioner_id)
+        invalidate_templates(None)
         return True
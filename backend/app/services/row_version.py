@@ -0,0 +1,57 @@
+"""
+ConsultaMed Backend - Row Versions
+
+Versión barata de lo que devuelve un endpoint, para ETags y GET condicionales.
+
+Se usa la columna de sistema `xmin` de PostgreSQL (id de la transacción que
+escribió la versión actual de la fila): cambia con cada UPDATE aunque la tabla
+no tenga `meta_updated_at` (encounters, conditions, medication_requests) y no
+depende de que la aplicación recuerde actualizar una marca de tiempo. Para un
+conjunto de filas se concatena `id:xmin` de cada una: una fila nueva, borrada o
+modificada cambia el resultado.
+
+Solo se leen claves e índices; nunca el contenido que se serializa después.
+"""
+from typing import Any, Optional
+
+from sqlalchemy import Text, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def row_version(table_name: str) -> ColumnElement[Any]:
+    """`xmin` de la fila actual de `table_name` como texto."""
+    return cast(literal_column(f"{table_name}.xmin"), Text)
+
+
+def row_set_version(
+    model: Any,
+    *criteria: Any,
+    order_by: Any = None,
+    limit: Optional[int] = None,
+) -> Any:
+    """
+    Versión de un conjunto de filas de `model` (subconsulta escalar).
+
+    Args:
+        model: Modelo ORM con columna `id`.
+        criteria: Filtro del conjunto (p. ej. `Allergy.patient_id == id`).
+        order_by / limit: Para conjuntos acotados (las N últimas consultas);
+            deben coincidir con los de la consulta que construye la respuesta.
+
+    Returns:
+        Texto `id:xmin,...` ordenado por id, o NULL si el conjunto está vacío.
+    """
+    table_name = model.__tablename__
+    rows = select(
+        (cast(model.id, Text) + ":" + row_version(table_name)).label("version")
+    ).where(*criteria)
+    if order_by is not None:
+        rows = rows.order_by(*order_by)
+    if limit is not None:
+        rows = rows.limit(limit)
+    versions = rows.subquery()
+    return (
+        select(func.string_agg(versions.c.version, aggregate_order_by(",", versions.c.version)))
+        .scalar_subquery()
+    )
@@ -0,0 +1,30 @@
+"""
+ConsultaMed Backend - Search Text Helpers
+
+Normalización de términos de búsqueda compartida por las búsquedas en base de
+datos (pg_trgm + unaccent) y en memoria. Debe producir el mismo texto que la
+función SQL `patient_search_text` para que los patrones coincidan con el índice.
+"""
+import unicodedata
+
+
+def normalize_search_text(value: str) -> str:
+    """
+    Quita acentos, pasa a minúsculas y colapsa espacios.
+
+    Equivalente en Python a `patient_search_text` (`lower(unaccent(...))` con
+    los espacios colapsados y recortados): "  Martínez  Peña" → "martinez pena".
+    """
+    decomposed = unicodedata.normalize("NFKD", value)
+    without_marks = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(without_marks.lower().split())
+
+
+def escape_like(value: str) -> str:
+    """Escapa los comodines de LIKE (`%`, `_`) y el carácter de escape por defecto."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def contains_pattern(value: str) -> str:
+    """Patrón LIKE `%valor%` con el término ya escapado."""
+    return f"%{escape_like(value)}%"
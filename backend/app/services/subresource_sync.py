@@ -0,0 +1,149 @@
+"""
+ConsultaMed Backend - Sub-resource Sync
+
+Sincroniza las filas hijas de un recurso (Conditions y MedicationRequests de un
+Encounter) con la lista recibida en un FHIR Update, tocando solo lo que cambia.
+
+Borrar y recrear todas las filas en cada guardado (autosave) regenera IDs,
+genera filas muertas en Postgres y multiplica las sentencias. Aquí se calcula
+un diff y se ejecuta en, como mucho, un DELETE, dos UPDATE (contenido y orden)
+y un INSERT masivos.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@dataclass
+class SyncPlan:
+    """Operaciones necesarias para que las filas existentes igualen a las entrantes."""
+
+    keep: List[str] = field(default_factory=list)
+    update: List[Dict[str, Any]] = field(default_factory=list)
+    insert: List[Dict[str, Any]] = field(default_factory=list)
+    delete: List[str] = field(default_factory=list)
+    # Filas conservadas que solo cambian de posición (`id` + columna de orden)
+    reorder: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def is_noop(self) -> bool:
+        return not (self.update or self.insert or self.delete or self.reorder)
+
+
+def plan_sync(
+    existing: Sequence[Any],
+    incoming: Sequence[Mapping[str, Any]],
+    fields: Sequence[str],
+    identity: Sequence[str] = (),
+    order_field: Optional[str] = None,
+) -> SyncPlan:
+    """
+    Calcula el diff entre filas existentes y entrantes (función pura).
+
+    1. Cada fila entrante idéntica (en `fields`) a una existente la conserva.
+    2. Las sobrantes se emparejan por posición, o solo si coinciden en
+       `identity` cuando se indica: UPDATE de la existente, que mantiene su ID.
+    3. Lo que quede: DELETE de existentes o INSERT de entrantes.
+
+    Args:
+        existing: Filas ORM actuales, en su orden (con `id` y los atributos de
+            `fields`).
+        incoming: Valores recibidos, en el orden enviado por el cliente.
+        fields: Columnas que definen el contenido de una fila.
+        identity: Columnas que identifican "la misma" fila aunque cambie el
+            resto (p. ej. el fármaco de una prescripción). Una fila que cambia
+            de identidad no se reescribe: se borra y se crea otra, con los
+            metadatos por defecto de una fila nueva.
+        order_field: Columna que guarda el índice de la fila en `incoming`.
+            Las filas modificadas o nuevas lo llevan; una conservada cuyo
+            índice cambia va a `reorder` (un cambio de orden no es una edición).
+
+    Returns:
+        SyncPlan; `update` lleva `id` + `fields` (+ orden) e `insert` solo
+        `fields` (+ orden).
+    """
+    unmatched_existing: Dict[Tuple[Any, ...], List[Any]] = defaultdict(list)
+    for row in existing:
+        unmatched_existing[tuple(getattr(row, name) for name in fields)].append(row)
+
+    plan = SyncPlan()
+    pending_incoming: List[Dict[str, Any]] = []
+    for position, values in enumerate(incoming):
+        key = tuple(values.get(name) for name in fields)
+        candidates = unmatched_existing.get(key)
+        if candidates:
+            row = candidates.pop(0)
+            plan.keep.append(row.id)
+            if order_field and getattr(row, order_field) != position:
+                plan.reorder.append({"id": row.id, order_field: position})
+        else:
+            pending = {name: values.get(name) for name in fields}
+            if order_field:
+                pending[order_field] = position
+            pending_incoming.append(pending)
+
+    # Conserva el orden original de las existentes para emparejar por posición
+    kept = set(plan.keep)
+    leftover_existing = [row for row in existing if row.id not in kept]
+
+    if not identity:
+        for row, values in zip(leftover_existing, pending_incoming):
+            plan.update.append({"id": row.id, **values})
+        plan.delete.extend(row.id for row in leftover_existing[len(pending_incoming):])
+        plan.insert.extend(pending_incoming[len(leftover_existing):])
+        return plan
+
+    by_identity: Dict[Tuple[Any, ...], List[Any]] = defaultdict(list)
+    for row in leftover_existing:
+        by_identity[tuple(getattr(row, name) for name in identity)].append(row)
+    for values in pending_incoming:
+        candidates = by_identity.get(tuple(values.get(name) for name in identity))
+        if candidates:
+            plan.update.append({"id": candidates.pop(0).id, **values})
+        else:
+            plan.insert.append(values)
+    plan.delete.extend(row.id for rows in by_identity.values() for row in rows)
+    return plan
+
+
+async def apply_sync(
+    db: AsyncSession,
+    model: Any,
+    plan: SyncPlan,
+    *,
+    insert_values: Mapping[str, Any],
+    update_values: Mapping[str, Any] | None = None,
+) -> None:
+    """
+    Ejecuta un SyncPlan con sentencias masivas (sin commit).
+
+    Args:
+        db: Sesión de base de datos.
+        model: Modelo ORM de las filas hijas.
+        plan: Resultado de `plan_sync`.
+        insert_values: Columnas comunes de las filas nuevas (FKs, autor...).
+        update_values: Columnas comunes que se fijan también en las modificadas.
+    """
+    if plan.delete:
+        await db.execute(
+            delete(model)
+            .where(model.id.in_(plan.delete))
+            .execution_options(synchronize_session=False)
+        )
+    if plan.update:
+        # UPDATE masivo por clave primaria (executemany)
+        await db.execute(
+            update(model),
+            [{**row, **(update_values or {})} for row in plan.update],
+        )
+    if plan.reorder:
+        # Solo la posición: no son ediciones, sin `update_values`
+        await db.execute(update(model), plan.reorder)
+    if plan.insert:
+        await db.execute(
+            insert(model),
+            [{**row, **insert_values} for row in plan.insert],
+        )
@@ -0,0 +1,245 @@
+"""
+ConsultaMed Backend - Treatment Template Cache
+
+Caché por worker de las plantillas de tratamiento. Las globales
+(`practitioner_id IS NULL`) se guardan una sola vez y las de cada profesional
+por su ID; el listado, la búsqueda, el orden por favoritos, la paginación, el
+emparejamiento por diagnóstico (índice de trigramas, ver `template_matching`)
+y la lectura por ID se resuelven en memoria.
+
+Las plantillas propias solo cambian a través de `/templates`, que invalida la
+entrada del profesional tras cada escritura. Los cambios hechos desde otro
+proceso (otro worker, el CLI administrativo, migraciones) tardan como mucho
+`TEMPLATE_CACHE_TTL_SECONDS` en verse, como en `practitioner_cache`.
+"""
+import hashlib
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.condition import Condition
+from app.models.encounter import Encounter
+from app.models.template import TreatmentTemplate
+from app.services.cache import TTLCache
+from app.services.search_text import normalize_search_text
+from app.services.template_matching import (
+    FAVORITE_BONUS,
+    NO_USAGE,
+    TemplateUsage,
+    TrigramIndex,
+    code_key,
+)
+
+# Clave de las plantillas globales (los IDs de profesional son UUID: no colisiona)
+GLOBAL_TEMPLATES_KEY = "global"
+
+
+@dataclass(frozen=True)
+class CachedTemplate:
+    """Instantánea de una plantilla, desligada de la sesión."""
+
+    id: str
+    name: str
+    diagnosis_text: str
+    diagnosis_code: Optional[str]
+    medications: tuple[dict[str, str], ...]
+    instructions: Optional[str]
+    is_favorite: bool
+    is_global: bool
+    diagnosis_code_key: str
+    # Texto sin acentos ni mayúsculas para buscar, y clave de orden del listado
+    name_search: str
+    diagnosis_search: str
+    sort_key: tuple[bool, str, str, str]
+
+    @classmethod
+    def from_model(cls, template: TreatmentTemplate) -> "CachedTemplate":
+        name_search = normalize_search_text(template.name)
+        return cls(
+            id=str(template.id),
+            name=template.name,
+            diagnosis_text=template.diagnosis_text,
+            diagnosis_code=template.diagnosis_code,
+            medications=tuple(template.medications or ()),
+            instructions=template.instructions,
+            is_favorite=bool(template.is_favorite),
+            is_global=template.practitioner_id is None,
+            diagnosis_code_key=code_key(template.diagnosis_code or ""),
+            name_search=name_search,
+            diagnosis_search=normalize_search_text(template.diagnosis_text or ""),
+            # Favoritos primero, luego por nombre; el ID desempata
+            sort_key=(not template.is_favorite, name_search, template.name, str(template.id)),
+        )
+
+
+@dataclass(frozen=True)
+class TemplateSet:
+    """Plantillas de un propietario, ya ordenadas, con su versión y su índice de trigramas."""
+
+    templates: tuple[CachedTemplate, ...]
+    version: str
+    index: TrigramIndex
+
+    @classmethod
+    def from_models(cls, templates: Sequence[TreatmentTemplate]) -> "TemplateSet":
+        # Una edición cambia `meta_updated_at`; un alta o un borrado, los IDs
+        digest = hashlib.sha256()
+        for template in sorted(templates, key=lambda t: str(t.id)):
+            digest.update(f"{template.id}:{template.meta_updated_at}|".encode("utf-8"))
+        ordered = tuple(
+            sorted((CachedTemplate.from_model(t) for t in templates), key=lambda t: t.sort_key)
+        )
+        return cls(
+            templates=ordered,
+            version=digest.hexdigest()[:16],
+            index=TrigramIndex.build(
+                [((t.name, t.diagnosis_text or ""), t.diagnosis_code) for t in ordered]
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class TemplateCatalog:
+    """Plantillas visibles para un profesional: las globales más las suyas."""
+
+    global_set: TemplateSet
+    own_set: TemplateSet
+
+    @property
+    def version(self) -> tuple[str, str]:
+        return self.global_set.version, self.own_set.version
+
+    def __iter__(self) -> Iterator[CachedTemplate]:
+        """Recorre las plantillas en el orden del listado (mezcla de dos listas ordenadas)."""
+        return iter(
+            heapq.merge(self.global_set.templates, self.own_set.templates, key=lambda t: t.sort_key)
+        )
+
+    def search(self, search: Optional[str] = None, favorites_only: bool = False) -> List[CachedTemplate]:
+        """Filtra por favoritos y por subcadena en nombre o diagnóstico (sin acentos ni mayúsculas)."""
+        term = normalize_search_text(search) if search else ""
+        return [
+            template
+            for template in self
+            if (template.is_favorite or not favorites_only)
+            and (not term or term in template.name_search or term in template.diagnosis_search)
+        ]
+
+    def rank(
+        self, diagnosis: str, usage: TemplateUsage = NO_USAGE, limit: int = 1
+    ) -> List[Tuple[CachedTemplate, float]]:
+        """
+        Mejores `limit` plantillas para un diagnóstico, con su puntuación.
+
+        Ver `app.services.template_matching`; a igual puntuación, orden del listado.
+        """
+        candidates: List[Tuple[float, Tuple[bool, str, str, str], CachedTemplate]] = []
+        for template_set in (self.global_set, self.own_set):
+            templates = template_set.templates
+            for position, similarity in template_set.index.similarities(diagnosis).items():
+                template = templates[position]
+                score = (
+                    similarity
+                    + (FAVORITE_BONUS if template.is_favorite else 0.0)
+                    + usage.boost(template.diagnosis_code_key, template.diagnosis_search)
+                )
+                # `sort_key` es único (lleva el ID): nunca se llega a comparar la plantilla
+                candidates.append((-score, template.sort_key, template))
+        return [(template, -negative) for negative, _, template in heapq.nsmallest(limit, candidates)]
+
+    def get(self, template_id: str) -> Optional[CachedTemplate]:
+        return next((t for t in self if t.id == template_id), None)
+
+
+# Conjuntos de plantillas por propietario (`GLOBAL_TEMPLATES_KEY` o ID de profesional)
+template_cache: TTLCache[str, TemplateSet] = TTLCache(
+    ttl_seconds=settings.TEMPLATE_CACHE_TTL_SECONDS,
+)
+
+# Usos de diagnósticos por profesional para el emparejamiento. Solo ordena
+# sugerencias: no se invalida al registrar consultas, el TTL basta.
+template_usage_cache: TTLCache[str, TemplateUsage] = TTLCache(
+    ttl_seconds=settings.TEMPLATE_CACHE_TTL_SECONDS,
+)
+
+# Ventana de consultas que cuenta como uso reciente de un diagnóstico
+USAGE_WINDOW_DAYS = 365
+
+# Generación por clave: una carga que se cruza con una escritura no guarda datos viejos
+_generations: dict[str, int] = {}
+
+
+def _cache_key(practitioner_id: Optional[str]) -> str:
+    return GLOBAL_TEMPLATES_KEY if practitioner_id is None else str(practitioner_id)
+
+
+def invalidate_templates(practitioner_id: Optional[str]) -> None:
+    """Descarta las plantillas de un profesional (o las globales con None)."""
+    key = _cache_key(practitioner_id)
+    _generations[key] = _generations.get(key, 0) + 1
+    template_cache.invalidate(key)
+
+
+async def get_template_catalog(db: AsyncSession, practitioner_id: str) -> TemplateCatalog:
+    """
+    Plantillas visibles para el profesional.
+
+    Sin consultas si la caché está vigente; si faltan las globales y las propias,
+    se cargan juntas en una sola consulta.
+    """
+    owners: dict[str, Optional[str]] = {
+        GLOBAL_TEMPLATES_KEY: None,
+        _cache_key(practitioner_id): practitioner_id,
+    }
+    sets: dict[str, TemplateSet] = {}
+    for key in owners:
+        cached = template_cache.get(key)
+        if cached is not None:
+            sets[key] = cached
+
+    missing = [key for key in owners if key not in sets]
+    if missing:
+        generations = {key: _generations.get(key, 0) for key in missing}
+        owner: Any = TreatmentTemplate.practitioner_id
+        conditions = [
+            owner.is_(None) if owners[key] is None else owner == owners[key] for key in missing
+        ]
+        result = await db.execute(select(TreatmentTemplate).where(or_(*conditions)))
+        rows = result.scalars().all()
+
+        for key in missing:
+            template_set = TemplateSet.from_models(
+                [row for row in rows if _cache_key(row.practitioner_id) == key]
+            )
+            sets[key] = template_set
+            # Si hubo una escritura durante la consulta, lo leído puede ser anterior a ella
+            if _generations.get(key, 0) == generations[key]:
+                template_cache.set(key, template_set)
+
+    return TemplateCatalog(
+        global_set=sets[GLOBAL_TEMPLATES_KEY],
+        own_set=sets[_cache_key(practitioner_id)],
+    )
+
+
+async def get_template_usage(db: AsyncSession, practitioner_id: str) -> TemplateUsage:
+    """Diagnósticos registrados por el profesional en sus consultas recientes (en caché)."""
+    usage = template_usage_cache.get(practitioner_id)
+    if usage is not None:
+        return usage
+
+    since = datetime.now(timezone.utc) - timedelta(days=USAGE_WINDOW_DAYS)
+    result = await db.execute(
+        select(Condition.code_coding_code, Condition.code_text, func.count())
+        .join(Encounter, Condition.encounter_id == Encounter.id)
+        .where(Encounter.participant_id == practitioner_id, Encounter.period_start >= since)
+        .group_by(Condition.code_coding_code, Condition.code_text)
+    )
+    usage = TemplateUsage.from_rows(tuple(row) for row in result.all())
+    template_usage_cache.set(practitioner_id, usage)
+    return usage
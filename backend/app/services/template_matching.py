@@ -0,0 +1,196 @@
+"""
+ConsultaMed Backend - Template Matching
+
+Emparejamiento de un diagnóstico escrito en consulta con las plantillas de
+tratamiento. Cada conjunto de plantillas en caché lleva un índice invertido de
+trigramas (como `pg_trgm`, sobre texto sin acentos ni mayúsculas) de su nombre
+y su diagnóstico, más su código CIE-10. Una búsqueda solo visita las
+plantillas que comparten algún trigrama con el término, así que tolera
+acentos, orden de palabras y erratas sin recorrer todo el catálogo.
+
+La puntuación combina:
+- similitud textual (0-1): cobertura de los trigramas del término, afinada con
+  Jaccard para preferir el texto más ajustado; un código CIE-10 que coincide
+  cuenta como 1 (o 0.9 si solo coincide el prefijo, p. ej. "J02" con "J02.9"),
+- un extra fijo para las favoritas,
+- un extra por uso: cuántas veces registró el profesional ese diagnóstico en
+  sus consultas recientes, relativo al más usado.
+
+La similitud domina: los extras ordenan candidatos parecidos, pero no hacen
+pasar por delante una plantilla que apenas se parece al término.
+"""
+import bisect
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from app.services.search_text import normalize_search_text
+
+# Similitud textual mínima para proponer una plantilla (la de `pg_trgm` por defecto)
+MIN_SIMILARITY = 0.3
+
+FAVORITE_BONUS = 0.1
+USAGE_WEIGHT = 0.15
+
+# Peso de la cobertura del término frente a Jaccard en la similitud textual
+COVERAGE_WEIGHT = 0.75
+
+CODE_EXACT_SCORE = 1.0
+CODE_PREFIX_SCORE = 0.9
+# Longitud mínima de un prefijo de código útil ("J02")
+CODE_PREFIX_MIN_LENGTH = 3
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Forma de código CIE-10 ya normalizado: letra y dos cifras ("j02", "j029")
+_CODE_SHAPE = re.compile(r"^[a-z][0-9]{2}")
+
+
+def trigrams(text: str) -> frozenset[str]:
+    """
+    Trigramas de `text` como los de `pg_trgm`: por palabra, con dos espacios
+    delante y uno detrás ("gripe" → "  g", " gr", "gri", "rip", "ipe", "pe ").
+    """
+    grams: set[str] = set()
+    for word in _WORD.findall(normalize_search_text(text)):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def code_key(code: str) -> str:
+    """Código CIE-10 comparable: sin puntos, espacios ni mayúsculas ("J02.9" → "j029")."""
+    return re.sub(r"[\s.]", "", code).lower()
+
+
+def code_similarity(query_code: str, template_code: str) -> float:
+    """Similitud entre un término con forma de código y el código de la plantilla."""
+    if not query_code or not template_code:
+        return 0.0
+    if query_code == template_code:
+        return CODE_EXACT_SCORE
+    if len(query_code) >= CODE_PREFIX_MIN_LENGTH and template_code.startswith(query_code):
+        return CODE_PREFIX_SCORE
+    return 0.0
+
+
+@dataclass(frozen=True)
+class TrigramIndex:
+    """
+    Índice invertido de un conjunto de plantillas, construido una vez al
+    cargarlo en caché y nunca modificado.
+
+    Cada campo de texto de cada plantilla es una "entrada" numerada
+    (`posición * field_count + campo`); `postings` lleva de cada trigrama a las
+    entradas que lo contienen. Los códigos van ordenados para buscar por prefijo.
+    """
+
+    field_count: int
+    postings: Mapping[str, Tuple[int, ...]]
+    entry_sizes: Tuple[int, ...]
+    codes: Tuple[Tuple[str, int], ...]
+
+    @classmethod
+    def build(cls, documents: Sequence[Tuple[Sequence[str], Optional[str]]]) -> "TrigramIndex":
+        """
+        Args:
+            documents: por plantilla, sus campos de texto (siempre los mismos) y
+                su código CIE-10 (o None).
+        """
+        field_count = max((len(fields) for fields, _ in documents), default=0)
+        postings: Dict[str, List[int]] = {}
+        entry_sizes: List[int] = [0] * (len(documents) * field_count)
+        codes: List[Tuple[str, int]] = []
+        for position, (fields, code) in enumerate(documents):
+            for field, text in enumerate(fields):
+                entry = position * field_count + field
+                grams = trigrams(text)
+                entry_sizes[entry] = len(grams)
+                for gram in grams:
+                    postings.setdefault(gram, []).append(entry)
+            if code:
+                codes.append((code_key(code), position))
+        return cls(
+            field_count=field_count,
+            postings={gram: tuple(entries) for gram, entries in postings.items()},
+            entry_sizes=tuple(entry_sizes),
+            codes=tuple(sorted(codes)),
+        )
+
+    def similarities(self, query: str) -> Dict[int, float]:
+        """Similitud (0-1) de cada plantilla con `query`, solo las que superan `MIN_SIMILARITY`."""
+        query_grams = trigrams(query)
+        query_size = len(query_grams)
+        scores: Dict[int, float] = {}
+
+        if query_size:
+            shared: Counter[int] = Counter()
+            for gram in query_grams:
+                shared.update(self.postings.get(gram, ()))
+            # La similitud nunca supera la cobertura: por debajo de este solape no llega al mínimo
+            min_overlap = MIN_SIMILARITY * query_size
+            for entry, overlap in shared.items():
+                if overlap < min_overlap:
+                    continue
+                jaccard = overlap / (query_size + self.entry_sizes[entry] - overlap)
+                score = COVERAGE_WEIGHT * overlap / query_size + (1 - COVERAGE_WEIGHT) * jaccard
+                position = entry // self.field_count
+                if score > scores.get(position, 0.0):
+                    scores[position] = score
+
+        query_code = code_key(query)
+        if _CODE_SHAPE.match(query_code):
+            # Códigos que empiezan por el término: rango contiguo en la lista ordenada
+            start = bisect.bisect_left(self.codes, (query_code, -1))
+            for template_code, position in self.codes[start:]:
+                score = code_similarity(query_code, template_code)
+                if not score:
+                    break
+                if score > scores.get(position, 0.0):
+                    scores[position] = score
+
+        return {position: score for position, score in scores.items() if score >= MIN_SIMILARITY}
+
+
+def usage_boost(uses: int, max_uses: int) -> float:
+    """Extra por uso, en escala logarítmica relativa al diagnóstico más registrado."""
+    if uses <= 0 or max_uses <= 0:
+        return 0.0
+    return USAGE_WEIGHT * math.log1p(uses) / math.log1p(max_uses)
+
+
+@dataclass(frozen=True)
+class TemplateUsage:
+    """
+    Extra por uso de cada diagnóstico registrado por un profesional, por código
+    CIE-10 y por texto (claves de `code_key` y `normalize_search_text`).
+    """
+
+    code_boosts: Mapping[str, float]
+    text_boosts: Mapping[str, float]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Optional[str], Optional[str], int]]) -> "TemplateUsage":
+        """Agrega filas (código, texto, recuento) y precalcula el extra de cada diagnóstico."""
+        by_code: Counter[str] = Counter()
+        by_text: Counter[str] = Counter()
+        for code, text, count in rows:
+            if code:
+                by_code[code_key(code)] += count
+            if text:
+                by_text[normalize_search_text(text)] += count
+        max_uses = max((*by_code.values(), *by_text.values()), default=0)
+        return cls(
+            code_boosts={key: usage_boost(uses, max_uses) for key, uses in by_code.items()},
+            text_boosts={key: usage_boost(uses, max_uses) for key, uses in by_text.items()},
+        )
+
+    def boost(self, diagnosis_code_key: str, diagnosis_text_key: str) -> float:
+        """Extra de una plantilla: por su código si lo tiene, si no por su diagnóstico."""
+        if diagnosis_code_key:
+            return self.code_boosts.get(diagnosis_code_key, 0.0)
+        return self.text_boosts.get(diagnosis_text_key, 0.0)
+
+
+NO_USAGE = TemplateUsage(code_boosts={}, text_boosts={})
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""
+Benchmark de serialización de listados: vía por defecto de FastAPI vs. directa.
+
+Con las mismas filas de ejemplo compara:
+- "fastapi": el endpoint devuelve el modelo y FastAPI lo vuelca a dict, lo
+  revalida contra `response_model`, aplica `jsonable_encoder` y codifica con
+  `json` (JSONResponse).
+- "directa": el endpoint construye el modelo y devuelve `json_response`
+  (pydantic-core, sin revalidar). En el listado de pacientes los elementos se
+  crean además con `model_construct`, como en `list_patients`.
+
+Mide el cuerpo de `PatientListResponse` y `EncounterListResponse`. No necesita
+base de datos. Uso (desde backend/):
+    .venv/bin/python scripts/benchmarks/bench_json_responses.py --items 100
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, List
+
+# Ensure app package is importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.api.responses import json_response  # noqa: E402
+from app.schemas.encounter import EncounterListResponse  # noqa: E402
+from app.schemas.patient import PatientListResponse, PatientSummary  # noqa: E402
+
+NOW = datetime(2026, 10, 17, 9, 30, tzinfo=timezone.utc)
+
+
+def patient_rows(count: int) -> List[SimpleNamespace]:
+    """Filas como las de `search_summaries` (proyección)."""
+    return [
+        SimpleNamespace(
+            id=f"00000000-0000-4000-8000-{i:012d}",
+            identifier_value="12345678Z",
+            name_given="Lucía",
+            name_family=f"Fernández Ortega {i}",
+            birth_date=date(1950 + i % 60, 1 + i % 12, 1 + i % 28),
+            gender="female",
+            telecom_phone="600000000",
+            allergy_count=i % 3,
+            encounter_count=i % 40,
+            last_encounter_at=NOW - timedelta(days=i),
+        )
+        for i in range(count)
+    ]
+
+
+def encounter_rows(count: int) -> List[SimpleNamespace]:
+    """Encounters con diagnósticos y prescripciones, como los carga el listado."""
+    soap = "Paciente refiere odinofagia de tres días de evolución. " * 4
+    return [
+        SimpleNamespace(
+            id=f"e-{i}",
+            subject_id="p-1",
+            status="finished",
+            period_start=NOW - timedelta(days=i),
+            reason_text="Dolor de garganta",
+            subjective_text=soap,
+            objective_text=soap,
+            assessment_text="Faringoamigdalitis aguda",
+            plan_text=soap,
+            recommendations_text="Abundantes líquidos",
+            note=None,
+            conditions=[
+                SimpleNamespace(
+                    id=f"c-{i}", code_text="Faringoamigdalitis aguda",
+                    code_coding_code="J03.9", clinical_status="active",
+                )
+            ],
+            medications=[
+                SimpleNamespace(
+                    id=f"m-{i}-{j}", medication_text="Amoxicilina 500 mg",
+                    dosage_text="1 cápsula cada 8 horas", duration_value=7,
+                    duration_unit="días", status="active",
+                )
+                for j in range(3)
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def patient_list(rows: List[SimpleNamespace], construct: bool) -> PatientListResponse:
+    """Construye la respuesta como `list_patients` (validando o no cada fila)."""
+    build = PatientSummary.model_construct if construct else PatientSummary
+    items = [
+        build(
+            id=row.id,
+            identifier_value=row.identifier_value,
+            name_given=row.name_given,
+            name_family=row.name_family,
+            birth_date=row.birth_date,
+            age=50,
+            gender=row.gender,
+            telecom_phone=row.telecom_phone,
+            has_allergies=row.allergy_count > 0,
+            allergy_count=row.allergy_count,
+            encounter_count=row.encounter_count,
+            last_encounter_at=row.last_encounter_at,
+        )
+        for row in rows
+    ]
+    return PatientListResponse(items=items, total=len(rows), limit=len(rows), offset=0)
+
+
+def encounter_list(rows: List[SimpleNamespace]) -> EncounterListResponse:
+    items: Any = rows
+    return EncounterListResponse(items=items, total=len(rows))
+
+
+def fastapi_path(
+    loop: asyncio.AbstractEventLoop, response_model: type, build: Callable[[], Any]
+) -> Callable[[], bytes]:
+    """Lo que hace FastAPI con el valor devuelto por el endpoint."""
+    field = create_response_field(name=f"Response_{response_model.__name__}", type_=response_model)
+
+    def run() -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(field=field, response_content=build())
+        )
+        return bytes(JSONResponse(content).body)
+
+    return run
+
+
+def measure(label: str, run: Callable[[], bytes], iterations: int, warmup: int) -> float:
+    """Ejecuta `run` y devuelve la media en milisegundos."""
+    for _ in range(warmup):
+        run()
+
+    timings: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    mean = statistics.mean(timings)
+    print(f"  {label:<10} media {mean:7.2f} ms | mediana {statistics.median(timings):7.2f} ms | p95 {p95:7.2f} ms")
+    return mean
+
+
+def compare(title: str, default: Callable[[], bytes], direct: Callable[[], bytes], args: argparse.Namespace) -> None:
+    body = direct()
+    # Mismo contrato JSON por las dos vías
+    if json.loads(body) != json.loads(default()):
+        raise SystemExit(f"{title}: las dos vías producen JSON distinto")
+    print(f"{title} ({len(body) / 1024:.1f} KiB)")
+    before = measure("fastapi", default, args.iterations, args.warmup)
+    after = measure("directa", direct, args.iterations, args.warmup)
+    print(f"  Ahorro: {before - after:.2f} ms por respuesta ({(before - after) / before:.0%})")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100, help="Elementos por listado")
+    parser.add_argument("--iterations", type=int, default=200, help="Respuestas medidas por variante")
+    parser.add_argument("--warmup", type=int, default=20, help="Respuestas de calentamiento descartadas")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    patients = patient_rows(args.items)
+    compare(
+        "PatientListResponse",
+        fastapi_path(loop, PatientListResponse, lambda: patient_list(patients, construct=False)),
+        lambda: bytes(json_response(patient_list(patients, construct=True)).body),
+        args,
+    )
+
+    encounters = encounter_rows(args.items)
+    compare(
+        "EncounterListResponse",
+        fastapi_path(loop, EncounterListResponse, lambda: encounter_list(encounters)),
+        lambda: bytes(json_response(encounter_list(encounters)).body),
+        args,
+    )
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Benchmark del render de recetas PDF: recursos reutilizados vs. por documento.
+
+Compara, con la misma receta de ejemplo:
+- "por documento": lo que hacía cada render antes de reutilizar recursos
+  (entorno Jinja y plantilla, hojas de estilo y fuentes nuevos cada vez).
+- "reutilizado": una instancia de PDFService, como en un proceso de render.
+
+No necesita base de datos. Uso (desde backend/):
+    .venv/bin/python scripts/benchmarks/bench_pdf_render.py --iterations 30
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+# Ensure app package is importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from jinja2 import Environment, FileSystemLoader  # noqa: E402
+from weasyprint import CSS, HTML  # noqa: E402
+
+from app.services.pdf_service import PAGE_CSS, TEMPLATE_DIR, PDFService  # noqa: E402
+
+SAMPLE_PAYLOAD: dict[str, Any] = {
+    "patient": {
+        "full_name": "Lucía Fernández Ortega",
+        "identifier_value": "12345678Z",
+        "age": 47,
+        "gender": "Femenino",
+    },
+    "practitioner": {
+        "full_name": "Sara Martín López",
+        "identifier_value": "282812345",
+        "qualification_code": "Medicina Familiar y Comunitaria",
+    },
+    "encounter": {"date": "17/10/2026", "diagnosis": "Faringoamigdalitis aguda"},
+    "medications": [
+        {"name": "Amoxicilina 500 mg", "dosage": "1 cápsula cada 8 horas", "duration": "7 días"},
+        {"name": "Paracetamol 1 g", "dosage": "1 comprimido cada 8 horas si fiebre", "duration": "5 días"},
+        {"name": "Ibuprofeno 600 mg", "dosage": "1 comprimido cada 12 horas", "duration": "3 días"},
+    ],
+    "instructions": "Abundantes líquidos. Acudir a urgencias si dificultad respiratoria.",
+}
+
+
+def render_per_document(service: PDFService) -> bytes:
+    """Render sin reutilizar nada entre documentos (comportamiento anterior)."""
+    env = Environment(loader=FileSystemLoader(str(TEMPLATE_DIR)))
+    template = env.get_template("prescription.html")
+    html_content = template.render(
+        patient=SAMPLE_PAYLOAD["patient"],
+        practitioner=SAMPLE_PAYLOAD["practitioner"],
+        encounter=SAMPLE_PAYLOAD["encounter"],
+        medications=service._normalize_medications(SAMPLE_PAYLOAD["medications"]),
+        instructions=SAMPLE_PAYLOAD["instructions"],
+        logo_data_uri=service.logo_data_uri,
+    )
+    stylesheets = [CSS(string=PAGE_CSS), CSS(filename=str(TEMPLATE_DIR / "prescription.css"))]
+    pdf_bytes: bytes = HTML(string=html_content).write_pdf(stylesheets=stylesheets)
+    return pdf_bytes
+
+
+def measure(label: str, render: Callable[[], bytes], iterations: int, warmup: int) -> list[float]:
+    """Ejecuta `render` y devuelve los tiempos en milisegundos."""
+    for _ in range(warmup):
+        render()
+
+    timings: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        render()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(
+        f"{label:<15} media {statistics.mean(timings):7.1f} ms | "
+        f"mediana {statistics.median(timings):7.1f} ms | p95 {p95:7.1f} ms"
+    )
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20, help="Renders medidos por variante")
+    parser.add_argument("--warmup", type=int, default=2, help="Renders de calentamiento descartados")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    service = PDFService()
+    print(f"PDFService() (una vez por proceso): {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    per_document = measure(
+        "por documento", lambda: render_per_document(service), args.iterations, args.warmup
+    )
+    reused = measure(
+        "reutilizado",
+        lambda: service.generate_prescription_pdf(**SAMPLE_PAYLOAD),
+        args.iterations,
+        args.warmup,
+    )
+
+    saving = statistics.mean(per_document) - statistics.mean(reused)
+    print(f"Ahorro por render: {saving:.1f} ms ({saving / statistics.mean(per_document):.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""
+Benchmark del emparejamiento de plantillas por diagnóstico.
+
+Construye un catálogo sintético (globales + propias; cada diagnóstico con
+varias pautas: adulto, pediátrica, embarazo...) como el que guarda
+`template_cache` y mide `TemplateCatalog.rank` con términos reales de consulta:
+diagnósticos completos, prefijos, erratas, orden de palabras cambiado y
+códigos CIE-10. Informa también del coste de construir el índice (una vez por
+carga de la caché). No necesita base de datos. Uso (desde backend/):
+    .venv/bin/python scripts/benchmarks/bench_template_matching.py --templates 500
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+# Ensure app package is importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.models.template import TreatmentTemplate  # noqa: E402
+from app.services.template_cache import TemplateCatalog, TemplateSet  # noqa: E402
+from app.services.template_matching import TemplateUsage  # noqa: E402
+
+UPDATED = datetime(2026, 10, 17, 9, 30, tzinfo=timezone.utc)
+
+DIAGNOSES = [
+    ("Faringoamigdalitis aguda", "J03.9"),
+    ("Otitis media aguda", "H66.9"),
+    ("Infección urinaria baja", "N30.0"),
+    ("Lumbalgia mecánica", "M54.5"),
+    ("Bronquitis aguda", "J20.9"),
+    ("Gastroenteritis aguda", "A09"),
+    ("Conjuntivitis bacteriana", "H10.0"),
+    ("Sinusitis aguda", "J01.9"),
+    ("Cefalea tensional", "G44.2"),
+    ("Hipertensión arterial esencial", "I10"),
+    ("Diabetes mellitus tipo 2", "E11.9"),
+    ("Dermatitis atópica", "L20.9"),
+    ("Rinitis alérgica", "J30.4"),
+    ("Asma bronquial", "J45.9"),
+    ("Neumonía adquirida en la comunidad", "J18.9"),
+    ("Gripe", "J11.1"),
+    ("Herpes zóster", "B02.9"),
+    ("Impétigo", "L01.0"),
+    ("Celulitis", "L03.9"),
+    ("Esguince de tobillo", "S93.4"),
+    ("Cervicalgia", "M54.2"),
+    ("Migraña sin aura", "G43.0"),
+    ("Ansiedad generalizada", "F41.1"),
+    ("Insomnio", "G47.0"),
+    ("Reflujo gastroesofágico", "K21.9"),
+    ("Estreñimiento", "K59.0"),
+    ("Hemorroides", "K64.9"),
+    ("Candidiasis vaginal", "B37.3"),
+    ("Hipotiroidismo", "E03.9"),
+    ("Dislipemia", "E78.5"),
+    ("Anemia ferropénica", "D50.9"),
+    ("Gota", "M10.9"),
+]
+
+VARIANTS = ["adulto", "pediátrica", "alérgicos a penicilina", "embarazo", "anciano", "leve", "moderada"]
+
+QUERIES = [
+    "faringoamigdalitis aguda",
+    "otitis",
+    "infeccion urinaria",
+    "lumbalga",
+    "aguda bronquitis",
+    "J03.9",
+    "e11",
+    "hipertension",
+    "dermatitis atopica",
+    "fractura de tibia",
+]
+
+
+def build_catalog(count: int, seed: int) -> TemplateCatalog:
+    rng = random.Random(seed)
+    templates: List[TreatmentTemplate] = []
+    for i in range(count):
+        diagnosis, code = DIAGNOSES[i % len(DIAGNOSES)]
+        variant = VARIANTS[(i // len(DIAGNOSES)) % len(VARIANTS)]
+        templates.append(
+            TreatmentTemplate(
+                id=f"00000000-0000-4000-8000-{i:012d}",
+                name=f"{diagnosis} ({variant} {i // (len(DIAGNOSES) * len(VARIANTS)) + 1})",
+                diagnosis_text=diagnosis,
+                diagnosis_code=code,
+                medications=[],
+                is_favorite=rng.random() < 0.1,
+                practitioner_id=None if i % 2 else "pr1",
+                meta_updated_at=UPDATED,
+            )
+        )
+    return TemplateCatalog(
+        global_set=TemplateSet.from_models([t for t in templates if t.practitioner_id is None]),
+        own_set=TemplateSet.from_models([t for t in templates if t.practitioner_id is not None]),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--templates", type=int, default=500, help="Plantillas en el catálogo")
+    parser.add_argument("--iterations", type=int, default=2000, help="Búsquedas medidas")
+    parser.add_argument("--limit", type=int, default=5, help="Resultados por búsqueda (top-k)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    catalog = build_catalog(args.templates, args.seed)
+    build_ms = (time.perf_counter() - started) * 1000
+    usage = TemplateUsage.from_rows([(code, text, i + 1) for i, (text, code) in enumerate(DIAGNOSES)])
+
+    timings: list[float] = []
+    for i in range(args.iterations):
+        query = QUERIES[i % len(QUERIES)]
+        started = time.perf_counter()
+        catalog.rank(query, usage, limit=args.limit)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"Catálogo: {args.templates} plantillas (índice construido en {build_ms:.1f} ms)")
+    print(
+        f"rank top-{args.limit}: media {statistics.mean(timings):7.1f} µs | "
+        f"mediana {statistics.median(timings):7.1f} µs | p95 {p95:7.1f} µs"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+"""
+Generador de dataset clínico sintético para pruebas de escala.
+
+Crea profesionales, pacientes (con DNI/NIE válidos según
+`app/validators/dni.py`), consultas SOAP, diagnósticos, prescripciones,
+alergias y plantillas por profesional, y los carga con COPY (asyncpg
+`copy_records_to_table`), que es órdenes de magnitud más rápido que INSERT
+para millones de filas.
+
+Es determinista: con la misma semilla y los mismos parámetros genera
+exactamente los mismos datos (IDs incluidos), así que los benchmarks y
+las revisiones de planes de consulta son reproducibles.
+
+Forma del dataset (`--shape`):
+- general:  atención primaria típica; pocas consultas por paciente.
+- cronicos: un tercio de pacientes crónicos con historiales largos
+            (decenas de consultas con el mismo diagnóstico de fondo).
+
+Uso (desde backend/, contra una base de datos de PRUEBAS):
+    .venv/bin/python scripts/benchmarks/generate_dataset.py --patients 100000
+    .venv/bin/python scripts/benchmarks/generate_dataset.py --patients 20000 \\
+        --shape cronicos --seed 7 --truncate
+
+Se niega a cargar si alguna de las tablas que rellena tiene filas. `--truncate`
+las vacía todas, `practitioners` incluida (cuentas reales de acceso también).
+
+Los profesionales generados inician sesión con `medico<N>@dataset.local` y
+la contraseña de `--password`.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Ensure app package is importable
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.config import settings  # noqa: E402
+from app.services.security import hash_password  # noqa: E402
+from app.validators.dni import get_letra_dni, validate_documento_identidad  # noqa: E402
+
+Row = Tuple[Any, ...]
+
+# Fecha de referencia fija (no "hoy") para que el dataset sea reproducible
+DEFAULT_UNTIL = date(2026, 10, 1)
+
+GIVEN_NAMES = {
+    "female": ["María", "Carmen", "Ana", "Lucía", "Laura", "Marta", "Elena", "Isabel", "Paula", "Sara",
+               "Cristina", "Pilar", "Rosa", "Teresa", "Nuria", "Alba", "Julia", "Irene", "Silvia", "Raquel"],
+    "male": ["Antonio", "José", "Manuel", "Francisco", "David", "Juan", "Javier", "Daniel", "Carlos", "Jesús",
+             "Alejandro", "Miguel", "Rafael", "Pablo", "Sergio", "Luis", "Jorge", "Alberto", "Álvaro", "Diego"],
+}
+FAMILY_NAMES = [
+    "García", "Rodríguez", "González", "Fernández", "López", "Martínez", "Sánchez", "Pérez", "Gómez",
+    "Martín", "Jiménez", "Ruiz", "Hernández", "Díaz", "Moreno", "Muñoz", "Álvarez", "Romero", "Alonso",
+    "Gutiérrez", "Navarro", "Torres", "Domínguez", "Vázquez", "Ramos", "Gil", "Ramírez", "Serrano",
+    "Blanco", "Molina", "Morales", "Suárez", "Ortega", "Delgado", "Castro", "Ortiz", "Rubio", "Marín",
+    "Sanz", "Núñez", "Iglesias", "Medina", "Garrido", "Cortés", "Castillo", "Santos", "Lozano", "Guerrero",
+]
+
+# (texto, CIE-10, es crónico)
+DIAGNOSES: List[Tuple[str, str, bool]] = [
+    ("Catarro común", "J00", False),
+    ("Faringitis aguda", "J02.9", False),
+    ("Amigdalitis aguda", "J03.9", False),
+    ("Bronquitis aguda", "J20.9", False),
+    ("Gastroenteritis aguda", "A09", False),
+    ("Lumbalgia", "M54.5", False),
+    ("Cefalea tensional", "G44.2", False),
+    ("Infección urinaria", "N39.0", False),
+    ("Conjuntivitis aguda", "H10.3", False),
+    ("Esguince de tobillo", "S93.4", False),
+    ("Hipertensión arterial", "I10", True),
+    ("Diabetes mellitus tipo 2", "E11.9", True),
+    ("Dislipemia", "E78.5", True),
+    ("EPOC", "J44.9", True),
+    ("Hipotiroidismo", "E03.9", True),
+    ("Artrosis de rodilla", "M17.9", True),
+    ("Asma", "J45.9", True),
+    ("Depresión", "F32.9", True),
+]
+ACUTE = [d for d in DIAGNOSES if not d[2]]
+CHRONIC = [d for d in DIAGNOSES if d[2]]
+
+MEDICATIONS = [
+    ("Paracetamol 1 g", "1 comprimido cada 8 horas"),
+    ("Ibuprofeno 600 mg", "1 comprimido cada 8 horas con comida"),
+    ("Amoxicilina 500 mg", "1 cápsula cada 8 horas"),
+    ("Omeprazol 20 mg", "1 cápsula en ayunas"),
+    ("Enalapril 10 mg", "1 comprimido cada 12 horas"),
+    ("Metformina 850 mg", "1 comprimido cada 12 horas"),
+    ("Atorvastatina 20 mg", "1 comprimido por la noche"),
+    ("Levotiroxina 50 mcg", "1 comprimido en ayunas"),
+    ("Salbutamol 100 mcg", "2 inhalaciones cada 6 horas si precisa"),
+    ("Fosfomicina 3 g", "1 sobre dosis única"),
+]
+ALLERGENS = [
+    ("Penicilina", "medication"), ("AINEs", "medication"), ("Sulfamidas", "medication"),
+    ("Látex", "environment"), ("Polen de gramíneas", "environment"), ("Ácaros", "environment"),
+    ("Frutos secos", "food"), ("Marisco", "food"), ("Lactosa", "food"),
+]
+
+
+@dataclass(frozen=True)
+class Shape:
+    """Distribución del historial clínico."""
+
+    chronic_ratio: float
+    encounters_mean: float
+    chronic_encounters_mean: float
+    allergy_ratio: float
+
+
+SHAPES: Dict[str, Shape] = {
+    "general": Shape(chronic_ratio=0.1, encounters_mean=4, chronic_encounters_mean=15, allergy_ratio=0.15),
+    "cronicos": Shape(chronic_ratio=0.33, encounters_mean=6, chronic_encounters_mean=45, allergy_ratio=0.2),
+}
+
+# Columnas en el orden de las tuplas generadas (orden de carga = orden de FKs)
+COLUMNS: Dict[str, List[str]] = {
+    "practitioners": [
+        "id", "identifier_value", "name_given", "name_family", "qualification_code",
+        "telecom_email", "password_hash", "active",
+    ],
+    "patients": [
+        "id", "identifier_value", "name_given", "name_family", "birth_date", "gender",
+        "telecom_phone", "active",
+    ],
+    "allergy_intolerances": [
+        "id", "patient_id", "clinical_status", "type", "category", "criticality", "code_text",
+        "recorded_date",
+    ],
+    "encounters": [
+        "id", "status", "subject_id", "participant_id", "period_start", "reason_text",
+        "subjective_text", "objective_text", "assessment_text", "plan_text", "note",
+    ],
+    "conditions": [
+        "id", "subject_id", "encounter_id", "code_text", "code_coding_code", "clinical_status",
+        "recorded_date", "sort_order",
+    ],
+    "medication_requests": [
+        "id", "status", "subject_id", "encounter_id", "requester_id", "medication_text",
+        "dosage_text", "duration_value", "duration_unit", "authored_on", "sort_order",
+    ],
+    "treatment_templates": [
+        "id", "name", "diagnosis_text", "diagnosis_code", "medications", "instructions",
+        "is_favorite", "sort_order", "practitioner_id",
+    ],
+}
+LOAD_ORDER = list(COLUMNS)
+
+
+@dataclass
+class Chunk:
+    """Filas por tabla de un bloque de pacientes."""
+
+    rows: Dict[str, List[Row]] = field(default_factory=lambda: {table: [] for table in COLUMNS})
+
+    def count(self) -> Dict[str, int]:
+        return {table: len(rows) for table, rows in self.rows.items()}
+
+
+def make_identifiers(rng: random.Random, count: int, nie_ratio: float = 0.09) -> List[str]:
+    """DNI/NIE únicos y válidos (letra de control MOD 23)."""
+    nie_count = round(count * nie_ratio)
+    dni_numbers = rng.sample(range(10_000_000, 100_000_000), count - nie_count)
+    nie_numbers = rng.sample(range(0, 30_000_000), nie_count)
+
+    identifiers = [f"{n:08d}{get_letra_dni(f'{n:08d}')}" for n in dni_numbers]
+    for n in nie_numbers:
+        # El NIE sustituye X/Y/Z por 0/1/2 y aplica el mismo algoritmo que el DNI
+        digits = f"{n:08d}"
+        identifiers.append("XYZ"[int(digits[0])] + digits[1:] + get_letra_dni(digits))
+    rng.shuffle(identifiers)
+
+    for identifier in identifiers:
+        if not validate_documento_identidad(identifier)[0]:
+            raise AssertionError(f"Identificador generado inválido: {identifier}")
+    return identifiers
+
+
+class DatasetGenerator:
+    """Genera filas deterministas a partir de una semilla."""
+
+    def __init__(
+        self,
+        *,
+        seed: int,
+        shape: Shape,
+        practitioners: int,
+        templates_per_practitioner: int,
+        until: date,
+        years: int,
+    ) -> None:
+        self.rng = random.Random(seed)
+        self.shape = shape
+        self.practitioner_count = practitioners
+        self.templates_per_practitioner = templates_per_practitioner
+        self.until = datetime.combine(until, dt_time(20, 0), tzinfo=timezone.utc)
+        self.history_days = years * 365
+        self.practitioner_ids: List[uuid.UUID] = []
+
+    def _uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _visit_time(self) -> datetime:
+        """Fecha de consulta en horario de 8:00 a 20:00 dentro del historial."""
+        day = self.until - timedelta(days=self.rng.randrange(self.history_days))
+        return day.replace(hour=8, minute=0) + timedelta(minutes=self.rng.randrange(12 * 60))
+
+    def _history_length(self, mean: float) -> int:
+        # Geométrica: muchos pacientes con pocas visitas y una cola larga
+        return min(int(self.rng.expovariate(1 / mean)), int(mean * 6))
+
+    def practitioners(self, password_hash: str) -> Chunk:
+        chunk = Chunk()
+        identifiers = self.rng.sample(range(1_000_000, 10_000_000), self.practitioner_count)
+        for index, number in enumerate(identifiers, start=1):
+            practitioner_id = self._uuid()
+            self.practitioner_ids.append(practitioner_id)
+            gender = self.rng.choice(("female", "male"))
+            chunk.rows["practitioners"].append((
+                practitioner_id,
+                f"28{number}",
+                self.rng.choice(GIVEN_NAMES[gender]),
+                f"{self.rng.choice(FAMILY_NAMES)} {self.rng.choice(FAMILY_NAMES)}",
+                "Medicina Familiar y Comunitaria",
+                f"medico{index}@dataset.local",
+                password_hash,
+                True,
+            ))
+            for sort_order in range(self.templates_per_practitioner):
+                text, code, _ = self.rng.choice(DIAGNOSES)
+                medications = [
+                    {"medication": name, "dosage": dosage, "duration": f"{self.rng.randint(3, 30)} días"}
+                    for name, dosage in self.rng.sample(MEDICATIONS, self.rng.randint(1, 3))
+                ]
+                chunk.rows["treatment_templates"].append((
+                    self._uuid(),
+                    f"{text} ({sort_order + 1})",
+                    text,
+                    code,
+                    json.dumps(medications, ensure_ascii=False),
+                    "Revisión si no mejora en 7 días.",
+                    self.rng.random() < 0.2,
+                    sort_order,
+                    practitioner_id,
+                ))
+        return chunk
+
+    def patients(self, identifiers: List[str]) -> Chunk:
+        """Pacientes con su historial completo (consultas, diagnósticos, recetas, alergias)."""
+        chunk = Chunk()
+        rows = chunk.rows
+        for identifier in identifiers:
+            patient_id = self._uuid()
+            gender = self.rng.choice(("female", "male"))
+            chronic = self.rng.random() < self.shape.chronic_ratio
+            # Los crónicos tienden a ser mayores
+            age = self.rng.randint(45, 95) if chronic else self.rng.randint(1, 90)
+            birth_date = self.until.date() - timedelta(days=age * 365 + self.rng.randrange(365))
+            rows["patients"].append((
+                patient_id,
+                identifier,
+                self.rng.choice(GIVEN_NAMES[gender]),
+                f"{self.rng.choice(FAMILY_NAMES)} {self.rng.choice(FAMILY_NAMES)}",
+                birth_date,
+                gender,
+                f"6{self.rng.randrange(10**8):08d}",
+                True,
+            ))
+
+            if self.rng.random() < self.shape.allergy_ratio:
+                for allergen, category in self.rng.sample(ALLERGENS, self.rng.randint(1, 3)):
+                    rows["allergy_intolerances"].append((
+                        self._uuid(), patient_id, "active",
+                        "intolerance" if category == "food" else "allergy",
+                        category, self.rng.choice(("low", "high")), allergen, self._visit_time(),
+                    ))
+
+            background = self.rng.choice(CHRONIC) if chronic else None
+            mean = self.shape.chronic_encounters_mean if chronic else self.shape.encounters_mean
+            for _ in range(self._history_length(mean)):
+                self._encounter(rows, patient_id, background)
+        return chunk
+
+    def _encounter(
+        self,
+        rows: Dict[str, List[Row]],
+        patient_id: uuid.UUID,
+        background: Optional[Tuple[str, str, bool]],
+    ) -> None:
+        encounter_id = self._uuid()
+        practitioner_id = self.rng.choice(self.practitioner_ids)
+        started = self._visit_time()
+        diagnoses = [self.rng.choice(ACUTE)]
+        if background is not None and self.rng.random() < 0.7:
+            # Revisión del problema crónico, a veces con un cuadro agudo añadido
+            diagnoses = [background] + (diagnoses if self.rng.random() < 0.3 else [])
+        main = diagnoses[0][0]
+        subjective = f"Acude por {main.lower()}. Evolución de {self.rng.randint(1, 15)} días."
+        objective = f"TA {self.rng.randint(105, 160)}/{self.rng.randint(60, 100)}. Afebril."
+        plan = "Tratamiento pautado. Revisión en consulta si empeora."
+        rows["encounters"].append((
+            encounter_id, "finished", patient_id, practitioner_id, started, main,
+            subjective, objective, main, plan,
+            f"Subjetivo: {subjective}\nObjetivo: {objective}\nAnálisis: {main}\nPlan: {plan}",
+        ))
+        for position, (text, code, _) in enumerate(diagnoses):
+            rows["conditions"].append((
+                self._uuid(), patient_id, encounter_id, text, code, "active", started, position,
+            ))
+        for position, (name, dosage) in enumerate(self.rng.sample(MEDICATIONS, self.rng.randint(0, 3))):
+            rows["medication_requests"].append((
+                self._uuid(), "active", patient_id, encounter_id, practitioner_id, name, dosage,
+                self.rng.randint(3, 30), "d", started, position,
+            ))
+
+
+def _asyncpg_dsn(url: str) -> str:
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+async def copy_chunk(connection: Any, chunk: Chunk) -> None:
+    """Carga un bloque con COPY, tabla a tabla en orden de FKs, en una transacción."""
+    async with connection.transaction():
+        for table in LOAD_ORDER:
+            records = chunk.rows[table]
+            if records:
+                await connection.copy_records_to_table(table, records=records, columns=COLUMNS[table])
+
+
+async def run(args: argparse.Namespace) -> None:
+    import asyncpg
+
+    generator = DatasetGenerator(
+        seed=args.seed,
+        shape=SHAPES[args.shape],
+        practitioners=args.practitioners,
+        templates_per_practitioner=args.templates_per_practitioner,
+        until=args.until,
+        years=args.years,
+    )
+    identifiers = make_identifiers(generator.rng, args.patients)
+
+    connection = await asyncpg.connect(_asyncpg_dsn(settings.DATABASE_URL))
+    try:
+        # Todas las tablas, no solo patients: p. ej. profesionales ya creados
+        # chocarían a mitad de carga con los emails generados
+        occupied = [
+            table
+            for table in LOAD_ORDER
+            if await connection.fetchval(f"SELECT EXISTS (SELECT 1 FROM {table})")
+        ]
+        if occupied and not args.truncate:
+            raise SystemExit(
+                f"Ya hay filas en: {', '.join(occupied)}. Usa una base de datos vacía o --truncate."
+            )
+        if args.truncate:
+            await connection.execute(
+                "TRUNCATE " + ", ".join(reversed(LOAD_ORDER)) + " CASCADE"
+            )
+
+        started = time.perf_counter()
+        totals: Dict[str, int] = {table: 0 for table in COLUMNS}
+
+        def account(chunk: Chunk) -> None:
+            for table, count in chunk.count().items():
+                totals[table] += count
+
+        chunk = generator.practitioners(hash_password(args.password))
+        await copy_chunk(connection, chunk)
+        account(chunk)
+
+        for offset in range(0, len(identifiers), args.batch_size):
+            chunk = generator.patients(identifiers[offset:offset + args.batch_size])
+            await copy_chunk(connection, chunk)
+            account(chunk)
+            loaded = min(offset + args.batch_size, len(identifiers))
+            print(f"  {loaded}/{len(identifiers)} pacientes ({time.perf_counter() - started:.0f} s)")
+
+        # Estadísticas del planificador acordes al nuevo volumen
+        for table in LOAD_ORDER:
+            await connection.execute(f"ANALYZE {table}")
+    finally:
+        await connection.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"\nDataset '{args.shape}' (semilla {args.seed}) cargado en {elapsed:.1f} s:")
+    for table, count in totals.items():
+        print(f"  {table:<22} {count:>12,}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=100_000, help="Número de pacientes")
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="general", help="Forma del historial clínico")
+    parser.add_argument("--practitioners", type=int, default=10, help="Número de profesionales")
+    parser.add_argument("--templates-per-practitioner", type=int, default=20, help="Plantillas por profesional")
+    parser.add_argument("--years", type=int, default=10, help="Años de historial")
+    parser.add_argument(
+        "--until", type=date.fromisoformat, default=DEFAULT_UNTIL, help="Fecha de la última consulta (AAAA-MM-DD)"
+    )
+    parser.add_argument("--seed", type=int, default=1, help="Semilla (mismos datos con la misma semilla)")
+    parser.add_argument("--batch-size", type=int, default=5_000, help="Pacientes por transacción de COPY")
+    parser.add_argument("--password", default="dataset-password", help="Contraseña de los profesionales generados")
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help=(
+            "Vaciar antes de cargar (TRUNCATE ... CASCADE) las tablas "
+            + ", ".join(LOAD_ORDER)
+            + " y las que las referencian. Incluye practitioners: borra también"
+            " las cuentas reales de acceso."
+        ),
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
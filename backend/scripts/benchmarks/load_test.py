@@ -0,0 +1,438 @@
+#!/usr/bin/env python
+"""
+Prueba de carga HTTP de la API `/api/v1` con mezclas de tráfico realistas.
+
+Lanza N usuarios virtuales concurrentes contra un backend en marcha (local,
+con el Postgres de docker-compose), autenticados con `/auth/login`. Cada
+usuario elige operaciones según los pesos de la mezcla:
+
+- search_patients   GET  /patients/?search=...
+- list_encounters   GET  /encounters/patient/{patient_id}
+- create_encounter  POST /encounters/patient/{patient_id}
+- update_encounter  PUT  /encounters/{encounter_id}   (autosave SOAP)
+- match_template    GET  /templates/match?diagnosis=...
+- download_pdf      GET  /prescriptions/{encounter_id}/pdf
+
+Informa por ruta p50/p95/p99, máximo, errores y peticiones/segundo, y puede
+guardar el resultado en JSON para comparar entre versiones (`--compare`).
+
+Las mezclas con escrituras crean consultas reales: usar solo contra una base
+de datos de pruebas (idealmente poblada con un dataset de volumen realista).
+
+Uso (desde backend/, con el backend levantado):
+    .venv/bin/python scripts/benchmarks/load_test.py \\
+        --email medico@example.com --password '***' \\
+        --mix consulta --users 20 --duration 60 --output results/v1.json
+    .venv/bin/python scripts/benchmarks/load_test.py ... --compare results/v1.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+API_PREFIX = "/api/v1"
+
+# Pesos relativos de cada operación por mezcla
+MIXES: Dict[str, Dict[str, int]] = {
+    # Jornada de consulta: buscar paciente, ver historial, guardar y autosave
+    "consulta": {
+        "search_patients": 30,
+        "list_encounters": 25,
+        "match_template": 15,
+        "update_encounter": 15,
+        "create_encounter": 8,
+        "download_pdf": 7,
+    },
+    "lectura": {
+        "search_patients": 45,
+        "list_encounters": 40,
+        "match_template": 15,
+    },
+    "escritura": {
+        "create_encounter": 40,
+        "update_encounter": 50,
+        "download_pdf": 10,
+    },
+}
+
+# Estados HTTP que no cuentan como error (p. ej. match sin plantilla → 404)
+EXPECTED_STATUS: Dict[str, tuple[int, ...]] = {
+    "match_template": (200, 404),
+    "create_encounter": (201,),
+}
+
+SEARCH_TERMS = ["gar", "mar", "lop", "san", "fer", "rod", "gon", "per", "mart", "jim"]
+DIAGNOSES = ["faringitis", "catarro", "lumbalgia", "hipertensión", "diabetes", "gastroenteritis"]
+
+
+@dataclass
+class Sample:
+    """Una petición medida."""
+
+    route: str
+    seconds: float
+    ok: bool
+    status: int
+
+
+@dataclass
+class Fixtures:
+    """IDs reales descubiertos antes de la carga (y los creados durante ella)."""
+
+    patient_ids: List[str] = field(default_factory=list)
+    search_terms: List[str] = field(default_factory=list)
+    diagnoses: List[str] = field(default_factory=list)
+    encounter_ids: List[str] = field(default_factory=list)
+    prescription_ids: List[str] = field(default_factory=list)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por rango más cercano sobre valores ya ordenados."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: List[Sample], elapsed_seconds: float) -> Dict[str, Any]:
+    """Agrega muestras por ruta (y en total) con latencias en milisegundos."""
+    groups: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        groups.setdefault(sample.route, []).append(sample)
+
+    def stats(group: List[Sample]) -> Dict[str, Any]:
+        timings = sorted(s.seconds * 1000 for s in group)
+        status_counts: Dict[str, int] = {}
+        for s in group:
+            status_counts[str(s.status)] = status_counts.get(str(s.status), 0) + 1
+        return {
+            "requests": len(group),
+            "errors": sum(1 for s in group if not s.ok),
+            "rps": round(len(group) / elapsed_seconds, 2) if elapsed_seconds else 0.0,
+            "mean_ms": round(statistics.fmean(timings), 2) if timings else 0.0,
+            "p50_ms": round(percentile(timings, 50), 2),
+            "p95_ms": round(percentile(timings, 95), 2),
+            "p99_ms": round(percentile(timings, 99), 2),
+            "max_ms": round(timings[-1], 2) if timings else 0.0,
+            "status": dict(sorted(status_counts.items())),
+        }
+
+    return {
+        "routes": {route: stats(group) for route, group in sorted(groups.items())},
+        "total": stats(samples),
+    }
+
+
+class LoadTest:
+    """Usuarios virtuales que comparten cliente HTTP, token y fixtures."""
+
+    def __init__(self, client: httpx.AsyncClient, fixtures: Fixtures, mix: Dict[str, int]) -> None:
+        self.client = client
+        self.fixtures = fixtures
+        self.mix = mix
+        self.samples: List[Sample] = []
+        self.recording = False
+        self.operations: Dict[str, Callable[[random.Random], Awaitable[Optional[Sample]]]] = {
+            "search_patients": self.search_patients,
+            "list_encounters": self.list_encounters,
+            "create_encounter": self.create_encounter,
+            "update_encounter": self.update_encounter,
+            "match_template": self.match_template,
+            "download_pdf": self.download_pdf,
+        }
+
+    async def _request(
+        self, operation: str, route: str, method: str, url: str, **kwargs: Any
+    ) -> tuple[Sample, Optional[httpx.Response]]:
+        started = time.perf_counter()
+        response: Optional[httpx.Response] = None
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        sample = Sample(
+            route=route,
+            seconds=time.perf_counter() - started,
+            ok=status in EXPECTED_STATUS.get(operation, (200,)),
+            status=status,
+        )
+        return sample, response
+
+    async def search_patients(self, rng: random.Random) -> Optional[Sample]:
+        term = rng.choice(self.fixtures.search_terms or SEARCH_TERMS)
+        sample, _ = await self._request(
+            "search_patients", "GET /patients/", "GET", f"{API_PREFIX}/patients/",
+            params={"search": term, "limit": 20},
+        )
+        return sample
+
+    async def list_encounters(self, rng: random.Random) -> Optional[Sample]:
+        if not self.fixtures.patient_ids:
+            return None
+        patient_id = rng.choice(self.fixtures.patient_ids)
+        sample, _ = await self._request(
+            "list_encounters", "GET /encounters/patient/{patient_id}", "GET",
+            f"{API_PREFIX}/encounters/patient/{patient_id}", params={"limit": 20},
+        )
+        return sample
+
+    async def create_encounter(self, rng: random.Random) -> Optional[Sample]:
+        if not self.fixtures.patient_ids:
+            return None
+        patient_id = rng.choice(self.fixtures.patient_ids)
+        diagnosis = rng.choice(self.fixtures.diagnoses or DIAGNOSES)
+        sample, response = await self._request(
+            "create_encounter", "POST /encounters/patient/{patient_id}", "POST",
+            f"{API_PREFIX}/encounters/patient/{patient_id}",
+            json=_encounter_payload(rng, diagnosis),
+        )
+        if sample.ok and response is not None:
+            encounter_id = response.json()["id"]
+            self.fixtures.encounter_ids.append(encounter_id)
+            self.fixtures.prescription_ids.append(encounter_id)
+        return sample
+
+    async def update_encounter(self, rng: random.Random) -> Optional[Sample]:
+        if not self.fixtures.encounter_ids:
+            return None
+        encounter_id = rng.choice(self.fixtures.encounter_ids)
+        diagnosis = rng.choice(self.fixtures.diagnoses or DIAGNOSES)
+        sample, _ = await self._request(
+            "update_encounter", "PUT /encounters/{encounter_id}", "PUT",
+            f"{API_PREFIX}/encounters/{encounter_id}",
+            json=_encounter_payload(rng, diagnosis),
+        )
+        return sample
+
+    async def match_template(self, rng: random.Random) -> Optional[Sample]:
+        diagnosis = rng.choice(self.fixtures.diagnoses or DIAGNOSES)
+        sample, _ = await self._request(
+            "match_template", "GET /templates/match", "GET", f"{API_PREFIX}/templates/match",
+            params={"diagnosis": diagnosis[:12]},
+        )
+        return sample
+
+    async def download_pdf(self, rng: random.Random) -> Optional[Sample]:
+        if not self.fixtures.prescription_ids:
+            return None
+        encounter_id = rng.choice(self.fixtures.prescription_ids)
+        sample, _ = await self._request(
+            "download_pdf", "GET /prescriptions/{encounter_id}/pdf", "GET",
+            f"{API_PREFIX}/prescriptions/{encounter_id}/pdf",
+        )
+        return sample
+
+    async def virtual_user(self, rng: random.Random, deadline: float, think_seconds: float) -> None:
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        while time.perf_counter() < deadline:
+            operation = rng.choices(names, weights)[0]
+            sample = await self.operations[operation](rng)
+            if sample is None:
+                # Sin fixtures (aún: create_encounter las va llenando) no hubo petición;
+                # sin ceder, con --think-ms 0 este usuario acapararía el event loop
+                await asyncio.sleep(0)
+                continue
+            if self.recording:
+                self.samples.append(sample)
+            if think_seconds:
+                await asyncio.sleep(rng.uniform(0, 2 * think_seconds))
+
+
+def _encounter_payload(rng: random.Random, diagnosis: str) -> Dict[str, Any]:
+    """Consulta SOAP con 1-2 diagnósticos y 0-3 prescripciones."""
+    return {
+        "reason_text": f"Consulta por {diagnosis}",
+        "subjective_text": f"Refiere síntomas desde hace {rng.randint(1, 10)} días",
+        "objective_text": f"TA {rng.randint(110, 150)}/{rng.randint(60, 95)}",
+        "assessment_text": diagnosis.capitalize(),
+        "plan_text": "Tratamiento sintomático y revisión si empeora",
+        "conditions": [
+            {"code_text": diagnosis.capitalize(), "code_coding_code": None}
+            for _ in range(rng.randint(1, 2))
+        ],
+        "medications": [
+            {
+                "medication_text": rng.choice(["Paracetamol 1 g", "Ibuprofeno 600 mg", "Omeprazol 20 mg"]),
+                "dosage_text": "1 comprimido cada 8 horas",
+                "duration_value": rng.randint(3, 10),
+                "duration_unit": "d",
+            }
+            for _ in range(rng.randint(0, 3))
+        ],
+    }
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> None:
+    """Obtiene el token JWT y lo fija como cabecera por defecto del cliente."""
+    response = await client.post(
+        f"{API_PREFIX}/auth/login", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+
+async def discover_fixtures(client: httpx.AsyncClient, sample_size: int) -> Fixtures:
+    """Toma IDs reales de pacientes, consultas con receta y diagnósticos de plantillas."""
+    fixtures = Fixtures()
+
+    response = await client.get(
+        f"{API_PREFIX}/patients/", params={"limit": 100, "total_mode": "none"}
+    )
+    response.raise_for_status()
+    patients = response.json()["items"]
+    fixtures.patient_ids = [p["id"] for p in patients]
+    fixtures.search_terms = sorted({p["name_family"][:3].lower() for p in patients}) or SEARCH_TERMS
+
+    for patient_id in fixtures.patient_ids[:sample_size]:
+        response = await client.get(
+            f"{API_PREFIX}/encounters/patient/{patient_id}",
+            params={"limit": 5, "total_mode": "none"},
+        )
+        response.raise_for_status()
+        for encounter in response.json()["items"]:
+            fixtures.encounter_ids.append(encounter["id"])
+            if encounter["medications"]:
+                fixtures.prescription_ids.append(encounter["id"])
+
+    response = await client.get(
+        f"{API_PREFIX}/templates/", params={"limit": 100, "total_mode": "none"}
+    )
+    response.raise_for_status()
+    fixtures.diagnoses = sorted({t["diagnosis_text"].lower() for t in response.json()["items"]})
+    return fixtures
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    header = f"{'ruta':<42} {'req':>7} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = list(result["routes"].items()) + [("TOTAL", result["total"])]
+    for route, s in rows:
+        print(
+            f"{route:<42} {s['requests']:>7} {s['errors']:>5} {s['rps']:>8.1f} "
+            f"{s['p50_ms']:>8.1f} {s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['max_ms']:>8.1f}"
+        )
+
+
+def print_comparison(result: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    """Diferencia de p95, p99 y req/s por ruta frente a un resultado anterior."""
+    print(f"\nComparación con {baseline['meta'].get('git_revision') or 'baseline'}:")
+    current_routes = {**result["routes"], "TOTAL": result["total"]}
+    baseline_routes = {**baseline["routes"], "TOTAL": baseline["total"]}
+    for route, current in current_routes.items():
+        previous = baseline_routes.get(route)
+        if previous is None:
+            print(f"{route:<42} (nueva)")
+            continue
+        deltas = []
+        for key in ("p95_ms", "p99_ms", "rps"):
+            before, after = previous[key], current[key]
+            change = f"{(after - before) / before:+.0%}" if before else "n/a"
+            deltas.append(f"{key} {before:.1f}→{after:.1f} ({change})")
+        print(f"{route:<42} " + " | ".join(deltas))
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mix = MIXES[args.mix]
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        await login(client, args.email, args.password)
+        fixtures = await discover_fixtures(client, args.sample_patients)
+        if not fixtures.patient_ids:
+            raise SystemExit("No hay pacientes en la base de datos: carga un dataset antes de medir.")
+        print(
+            f"{len(fixtures.patient_ids)} pacientes, {len(fixtures.encounter_ids)} consultas, "
+            f"{len(fixtures.diagnoses)} diagnósticos de plantilla descubiertos"
+        )
+
+        test = LoadTest(client, fixtures, mix)
+        started = time.perf_counter()
+        deadline = started + args.warmup + args.duration
+        users = [
+            asyncio.create_task(
+                test.virtual_user(random.Random(args.seed + index), deadline, args.think_ms / 1000)
+            )
+            for index in range(args.users)
+        ]
+        await asyncio.sleep(args.warmup)
+        test.recording = True
+        measured_from = time.perf_counter()
+        await asyncio.gather(*users)
+        elapsed = time.perf_counter() - measured_from
+
+    result = summarize(test.samples, elapsed)
+    result["meta"] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "base_url": args.base_url,
+        "mix": args.mix,
+        "weights": mix,
+        "users": args.users,
+        "duration_seconds": round(elapsed, 2),
+        "warmup_seconds": args.warmup,
+        "think_ms": args.think_ms,
+        "seed": args.seed,
+    }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=os.getenv("CONSULTAMED_LOADTEST_URL", "http://localhost:8000"))
+    parser.add_argument("--email", default=os.getenv("CONSULTAMED_LOADTEST_EMAIL"), help="Email de login")
+    parser.add_argument("--password", default=os.getenv("CONSULTAMED_LOADTEST_PASSWORD"), help="Contraseña")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="consulta", help="Mezcla de tráfico")
+    parser.add_argument("--users", type=int, default=10, help="Usuarios virtuales concurrentes")
+    parser.add_argument("--duration", type=float, default=30, help="Segundos medidos")
+    parser.add_argument("--warmup", type=float, default=5, help="Segundos iniciales descartados")
+    parser.add_argument("--think-ms", type=float, default=0, help="Pausa media entre peticiones de un usuario")
+    parser.add_argument("--timeout", type=float, default=30, help="Timeout por petición (s)")
+    parser.add_argument("--seed", type=int, default=1, help="Semilla de la secuencia de operaciones")
+    parser.add_argument("--sample-patients", type=int, default=20, help="Pacientes a explorar para IDs de consultas")
+    parser.add_argument("--output", type=Path, help="Guardar el resultado en JSON")
+    parser.add_argument("--compare", type=Path, help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+
+    if not args.email or not args.password:
+        parser.error("--email y --password (o CONSULTAMED_LOADTEST_EMAIL/PASSWORD) son obligatorios")
+
+    result = asyncio.run(run(args))
+    print_report(result)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\nResultado guardado en {args.output}")
+    if args.compare:
+        print_comparison(result, json.loads(args.compare.read_text(encoding="utf-8")))
+
+    if result["total"]["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Mantenimiento de `patient_summary` (solo línea de comandos).
+
+El listado de pacientes lee el nº de consultas, la última consulta y el nº de
+alergias activas de `patient_summary`, que mantienen triggers de base de datos.
+Este comando comprueba que el resumen coincide con el historial real y lo
+reconstruye cuando no (p. ej. tras una carga con los triggers desactivados o
+una restauración parcial).
+
+Uso (Windows):
+    backend\\.venv\\Scripts\\python.exe scripts/manage_patient_summary.py verify
+    backend\\.venv\\Scripts\\python.exe scripts/manage_patient_summary.py rebuild
+
+Uso (macOS/Linux):
+    backend/.venv/bin/python scripts/manage_patient_summary.py verify --limit 50
+
+`verify` termina con código 1 si encuentra diferencias, para poder usarlo en
+tareas programadas. `rebuild` bloquea brevemente las escrituras sobre el
+resumen mientras recalcula.
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Ensure app package is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import async_session_maker  # noqa: E402
+from app.services.patient_service import PatientService  # noqa: E402
+
+
+class CommandError(Exception):
+    """Error de uso o de negocio con mensaje listo para el operador."""
+
+
+async def cmd_verify(service: PatientService, args: argparse.Namespace) -> None:
+    """Compara el resumen guardado con el historial real."""
+    total, mismatches = await service.find_summary_mismatches(limit=args.limit)
+    if not total:
+        print("patient_summary coincide con el historial.")
+        return
+
+    print(f"{total} paciente(s) con el resumen desactualizado:")
+    for row in mismatches:
+        print(
+            f"  {row.patient_id}  "
+            f"consultas {row.stored_encounter_count}→{row.actual_encounter_count}  "
+            f"alergias activas {row.stored_active_allergy_count}→{row.actual_active_allergy_count}  "
+            f"última {row.stored_last_encounter_at}→{row.actual_last_encounter_at}"
+        )
+    if total > len(mismatches):
+        print(f"  ... y {total - len(mismatches)} más")
+    raise CommandError("Ejecuta `rebuild` para corregirlo.")
+
+
+async def cmd_rebuild(service: PatientService, args: argparse.Namespace) -> None:
+    """Recalcula el resumen de todos los pacientes."""
+    rebuilt = await service.rebuild_summaries()
+    print(f"patient_summary reconstruido: {rebuilt} paciente(s).")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Define los subcomandos disponibles."""
+    parser = argparse.ArgumentParser(
+        description="Mantenimiento del resumen de pacientes de ConsultaMed.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    verify = subparsers.add_parser("verify", help="Comprueba el resumen contra el historial")
+    verify.add_argument("--limit", type=int, default=20, help="Diferencias a mostrar")
+    verify.set_defaults(handler=cmd_verify)
+
+    subparsers.add_parser("rebuild", help="Recalcula el resumen").set_defaults(handler=cmd_rebuild)
+
+    return parser
+
+
+async def run(args: argparse.Namespace) -> None:
+    """Abre una sesión de base de datos y ejecuta el subcomando."""
+    async with async_session_maker() as session:
+        await args.handler(PatientService(session), args)
+
+
+def main() -> None:
+    """Punto de entrada de la CLI."""
+    args = build_parser().parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except CommandError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        raise SystemExit(1) from exc
+
+
+if __name__ == "__main__":
+    main()
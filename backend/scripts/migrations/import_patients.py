@@ -8,6 +8,7 @@ Uso:
     cd backend
     source .venv/bin/activate
     python scripts/migrations/import_patients.py
+    python scripts/migrations/import_patients.py --bulk --batch-size 1000
 
 Características:
 - Validación completa de DNI/NIE con algoritmo MOD 23
@@ -16,14 +17,22 @@ Características:
 - Transacciones por paciente (rollback individual en error)
 - Resumen estadístico final
 
+Modo --bulk (volúmenes grandes, p. ej. 50k pacientes):
+- Carga los DNI existentes en memoria con una sola consulta
+- Valida cada fila en memoria con las mismas reglas que PatientService.create
+- Inserta por lotes (INSERT multi-fila ... ON CONFLICT DO NOTHING), un commit
+  por lote: un error de base de datos solo revierte su lote
+- Mantiene el informe por fila (creado / duplicado / error) y el resumen
+
 Autor: Jaime PM / Claude
 Fecha: 2026-02-14
 """
 
+import argparse
 import asyncio
 from datetime import date
 from pathlib import Path
-from typing import cast
+from typing import Any, List, Tuple, cast
 
 import pandas as pd
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -151,11 +160,90 @@ async def import_patient_row(
         stats.errors += 1
 
 
-async def import_patients() -> None:
+def build_patient_data(row: pd.Series) -> dict[str, Any]:
+    """Mapea una fila del Excel a los campos de Patient."""
+    return {
+        "identifier_value": str(row["DNI_NIE"]).strip(),
+        "name_given": str(row["Nombre"]).strip(),
+        "name_family": str(row["Apellidos"]).strip(),
+        "birth_date": parse_birth_date(row["Fecha_Nacimiento"]),
+    }
+
+
+async def import_patients_bulk(df: pd.DataFrame, stats: ImportStats, batch_size: int) -> None:
+    """
+    Importación masiva: validación en memoria e inserción por lotes.
+
+    Pocas idas y vueltas a la base de datos en total (una consulta de DNI
+    existentes y un INSERT por lote) en lugar de 4+ por paciente.
+    """
+    total = stats.total
+
+    async with async_session_maker() as session:
+        service = PatientService(session)
+        known = await service.list_identifiers()
+        print(f"DNI ya registrados: {len(known)}\n")
+
+        # (posición de la fila, valores) pendientes de insertar en el lote actual
+        batch: List[Tuple[int, dict[str, Any]]] = []
+
+        async def flush() -> None:
+            if not batch:
+                return
+            try:
+                created = await service.bulk_insert([values for _, values in batch])
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                error_msg = str(e)[:80]
+                for idx, values in batch:
+                    print(f"❌ [{idx+1:3d}/{total}] Error en lote: {error_msg}")
+                    known.discard(values["identifier_value"])
+                stats.errors += len(batch)
+            else:
+                for idx, values in batch:
+                    dni = values["identifier_value"]
+                    if dni in created:
+                        print(f"✅ [{idx+1:3d}/{total}] Creado: {mask_dni(dni)}")
+                        stats.created += 1
+                    else:
+                        # Insertado por otro proceso entre la precarga y el lote
+                        print(f"⏭️  [{idx+1:3d}/{total}] Ya existe: {mask_dni(dni)}")
+                        stats.skipped += 1
+            batch.clear()
+
+        for position, (_, row) in enumerate(df.iterrows()):
+            try:
+                values = PatientService.prepare_new_patient(build_patient_data(row))
+            except Exception as e:
+                print(f"❌ [{position+1:3d}/{total}] Error: {str(e)[:80]}")
+                stats.errors += 1
+                continue
+
+            dni = values["identifier_value"]
+            if dni in known:
+                print(f"⏭️  [{position+1:3d}/{total}] Ya existe: {mask_dni(dni)}")
+                stats.skipped += 1
+                continue
+
+            # También cubre DNI repetidos dentro del propio fichero
+            known.add(dni)
+            batch.append((position, values))
+            if len(batch) >= batch_size:
+                await flush()
+
+        await flush()
+
+
+async def import_patients(bulk: bool = False, batch_size: int = 1000) -> None:
     """
     Proceso principal de importación.
 
     Lee el Excel procesado y crea registros Patient en la base de datos.
+
+    Args:
+        bulk: Usar el modo masivo (validación en memoria + inserción por lotes)
+        batch_size: Filas por INSERT/commit en modo masivo
     """
     # 1. Leer Excel
     script_dir = Path(__file__).parent
@@ -181,12 +269,16 @@ async def import_patients() -> None:
     stats = ImportStats(total)
 
     print(f"Total pacientes a importar: {total}")
+    print(f"Modo: {'masivo (lotes de ' + str(batch_size) + ')' if bulk else 'paciente a paciente'}")
     print(f"{'='*60}\n")
 
-    # 2. Importar paciente por paciente (cada uno en su transacción)
-    for idx, row in df.iterrows():
-        async with async_session_maker() as session:
-            await import_patient_row(session, row, idx, total, stats)
+    if bulk:
+        await import_patients_bulk(df, stats, batch_size)
+    else:
+        # 2. Importar paciente por paciente (cada uno en su transacción)
+        for idx, row in df.iterrows():
+            async with async_session_maker() as session:
+                await import_patient_row(session, row, idx, total, stats)
 
     # 3. Resumen final
     stats.print_summary()
@@ -194,8 +286,22 @@ async def import_patients() -> None:
 
 def main() -> None:
     """Entry point."""
+    parser = argparse.ArgumentParser(description="Importa pacientes del CRM antiguo")
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Validación en memoria e inserción por lotes (volúmenes grandes)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Filas por lote en modo --bulk (por defecto 1000)",
+    )
+    args = parser.parse_args()
+
     try:
-        asyncio.run(import_patients())
+        asyncio.run(import_patients(bulk=args.bulk, batch_size=max(args.batch_size, 1)))
     except KeyboardInterrupt:
         print("\n\n⚠️  Importación interrumpida por el usuario")
     except Exception as e:
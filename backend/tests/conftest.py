@@ -3,6 +3,8 @@
 from pathlib import Path
 import sys
 
+import pytest
+
 
 BACKEND_ROOT = Path(__file__).resolve().parents[1]
 if str(BACKEND_ROOT) not in sys.path:
@@ -23,3 +25,12 @@ try:
     _ps_sources.DotEnvSettingsSource._read_env_files = _safe_read_env  # type: ignore[assignment]
 except ImportError:
     pass
+
+
+
+@pytest.fixture(autouse=True)
+def _clear_practitioner_cache() -> None:
+    """La caché de autenticación es global al proceso: cada test parte vacía."""
+    from app.services.practitioner_service import practitioner_cache
+
+    practitioner_cache.clear()
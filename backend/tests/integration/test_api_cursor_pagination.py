@@ -0,0 +1,90 @@
+"""Integration tests for cursor pagination against Postgres (typed keyset binds)."""
+
+import os
+from collections.abc import AsyncGenerator
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import engine
+from app.main import app
+
+pytestmark = pytest.mark.integration
+
+INTEGRATION_FLAG = "RUN_INTEGRATION"
+
+
+@pytest.fixture(scope="module", autouse=True)
+async def _require_runtime_database() -> None:
+    """Skip when integration mode is off or runtime DB is unavailable."""
+    if os.getenv(INTEGRATION_FLAG, "0") != "1":
+        pytest.skip("Integration tests disabled. Set RUN_INTEGRATION=1 to run them.")
+
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as exc:
+        pytest.skip(f"Runtime database unavailable for integration tests: {exc}")
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+async def _recycle_engine_pool() -> AsyncGenerator[None, None]:
+    """Cada test corre en su propio event loop: no reutilizar conexiones de otro."""
+    yield
+    await engine.dispose()
+
+
+@pytest.fixture()
+async def api_client() -> AsyncGenerator[AsyncClient, None]:
+    """Cliente HTTP autenticado con el profesional semilla."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        login = await client.post(
+            "/api/v1/auth/login",
+            data={
+                "username": os.getenv("TEST_EMAIL", "sara@consultamed.es"),
+                "password": os.getenv("PILOT_PASSWORD", "piloto2026"),
+            },
+        )
+        assert login.status_code == 200, login.text
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        yield client
+
+
+async def test_patient_cursor_reaches_second_page(api_client: AsyncClient) -> None:
+    first = await api_client.get("/api/v1/patients/", params={"pagination": "cursor", "limit": 1})
+    assert first.status_code == 200, first.text
+    if not first.json()["next_cursor"]:
+        pytest.skip("Hacen falta al menos dos pacientes en la base de datos de integración")
+
+    second = await api_client.get(
+        "/api/v1/patients/", params={"cursor": first.json()["next_cursor"], "limit": 1}
+    )
+
+    assert second.status_code == 200, second.text
+    assert len(second.json()["items"]) == 1
+    assert second.json()["items"][0]["id"] != first.json()["items"][0]["id"]
+
+
+async def test_encounter_cursor_reaches_second_page(api_client: AsyncClient) -> None:
+    patients = await api_client.get("/api/v1/patients/", params={"limit": 100})
+    candidates = [p for p in patients.json()["items"] if p["encounter_count"] >= 2]
+    if not candidates:
+        pytest.skip("Hace falta un paciente con al menos dos consultas en la base de datos de integración")
+    url = f"/api/v1/encounters/patient/{candidates[0]['id']}"
+
+    first = await api_client.get(url, params={"pagination": "cursor", "limit": 1})
+    assert first.status_code == 200, first.text
+    assert first.json()["next_cursor"]
+
+    second = await api_client.get(url, params={"cursor": first.json()["next_cursor"], "limit": 1})
+
+    assert second.status_code == 200, second.text
+    assert len(second.json()["items"]) == 1
+    newer, older = first.json()["items"][0], second.json()["items"][0]
+    assert older["id"] != newer["id"]
+    assert older["period_start"] <= newer["period_start"]
@@ -0,0 +1,117 @@
+"""Integration tests: encounter updates keep the client's order of diagnoses and prescriptions."""
+
+import os
+from collections.abc import AsyncGenerator
+from typing import Any
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import engine
+from app.main import app
+
+pytestmark = pytest.mark.integration
+
+INTEGRATION_FLAG = "RUN_INTEGRATION"
+
+
+@pytest.fixture(scope="module", autouse=True)
+async def _require_runtime_database() -> None:
+    """Skip when integration mode is off or runtime DB is unavailable."""
+    if os.getenv(INTEGRATION_FLAG, "0") != "1":
+        pytest.skip("Integration tests disabled. Set RUN_INTEGRATION=1 to run them.")
+
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as exc:
+        pytest.skip(f"Runtime database unavailable for integration tests: {exc}")
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+async def _recycle_engine_pool() -> AsyncGenerator[None, None]:
+    """Cada test corre en su propio event loop: no reutilizar conexiones de otro."""
+    yield
+    await engine.dispose()
+
+
+@pytest.fixture()
+async def api_client() -> AsyncGenerator[AsyncClient, None]:
+    """Cliente HTTP autenticado con el profesional semilla."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        login = await client.post(
+            "/api/v1/auth/login",
+            data={
+                "username": os.getenv("TEST_EMAIL", "sara@consultamed.es"),
+                "password": os.getenv("PILOT_PASSWORD", "piloto2026"),
+            },
+        )
+        assert login.status_code == 200, login.text
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        yield client
+
+
+def _condition(text_value: str) -> dict[str, str | None]:
+    return {"code_text": text_value, "code_coding_code": None}
+
+
+def _payload(*diagnoses: str) -> dict[str, Any]:
+    return {
+        "reason_text": "Revisión de orden de diagnósticos",
+        "conditions": [_condition(d) for d in diagnoses],
+        "medications": [
+            {"medication_text": "Paracetamol 1g", "dosage_text": "1/8h", "duration_value": 3, "duration_unit": "d"},
+            {"medication_text": "Ibuprofeno 600 mg", "dosage_text": "1/8h", "duration_value": 3, "duration_unit": "d"},
+        ],
+    }
+
+
+def _diagnoses(body: dict[str, Any]) -> list[str]:
+    return [c["code_text"] for c in body["conditions"]]
+
+
+async def test_reorder_and_edit_keep_the_client_order(api_client: AsyncClient) -> None:
+    patients = await api_client.get("/api/v1/patients/", params={"limit": 1})
+    if not patients.json()["items"]:
+        pytest.skip("No hay pacientes en la base de datos de integración")
+    patient_id = patients.json()["items"][0]["id"]
+
+    created = await api_client.post(
+        f"/api/v1/encounters/patient/{patient_id}", json=_payload("Faringitis", "Fiebre")
+    )
+    assert created.status_code == 201, created.text
+    encounter_id = created.json()["id"]
+    url = f"/api/v1/encounters/{encounter_id}"
+    try:
+        before = await api_client.get(url)
+        etag = before.headers["ETag"]
+
+        # Solo cambia el orden: es un cambio (se guarda y cambia el ETag)
+        reordered = await api_client.put(url, json=_payload("Fiebre", "Faringitis"))
+        assert reordered.status_code == 200, reordered.text
+        assert _diagnoses(reordered.json()) == ["Fiebre", "Faringitis"]
+        revalidated = await api_client.get(url, headers={"If-None-Match": etag})
+        assert revalidated.status_code == 200
+        assert _diagnoses(revalidated.json()) == ["Fiebre", "Faringitis"]
+
+        # Editar el diagnóstico principal no lo manda al final
+        edited = await api_client.put(url, json=_payload("Fiebre alta", "Faringitis"))
+        assert _diagnoses(edited.json()) == ["Fiebre alta", "Faringitis"]
+        fetched = await api_client.get(url)
+        assert _diagnoses(fetched.json()) == ["Fiebre alta", "Faringitis"]
+
+        payload = _payload("Fiebre alta", "Faringitis")
+        payload["medications"] = list(reversed(payload["medications"]))
+        swapped = await api_client.put(url, json=payload)
+        assert [m["medication_text"] for m in swapped.json()["medications"]] == [
+            "Ibuprofeno 600 mg",
+            "Paracetamol 1g",
+        ]
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(text("DELETE FROM encounters WHERE id = :id"), {"id": encounter_id})
@@ -0,0 +1,113 @@
+"""Integration tests that cap the SQL statements issued by hot list endpoints (N+1 guard)."""
+
+import os
+from collections.abc import AsyncGenerator
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import engine
+from app.main import app
+from app.observability.sql import assert_max_queries
+
+pytestmark = pytest.mark.integration
+
+INTEGRATION_FLAG = "RUN_INTEGRATION"
+
+# Presupuesto de sentencias por endpoint (auth sin caché incluida). Subirlo
+# exige justificar la consulta nueva; una por fila nunca es aceptable.
+PATIENT_LIST_BUDGET = 2  # auth + página (proyección con alergias y consultas)
+ENCOUNTER_LIST_BUDGET = 5  # auth + paciente + página + conditions + medications
+TEMPLATE_LIST_BUDGET = 2  # auth + plantillas globales y propias (0 con la caché vigente)
+PATIENT_DETAIL_BUDGET = 5  # auth + versión + paciente + alergias + últimas consultas
+REVALIDATION_BUDGET = 2  # auth + versión (304, sin cargar la ficha)
+
+
+@pytest.fixture(scope="module", autouse=True)
+async def _require_runtime_database() -> None:
+    """Skip when integration mode is off or runtime DB is unavailable."""
+    if os.getenv(INTEGRATION_FLAG, "0") != "1":
+        pytest.skip("Integration tests disabled. Set RUN_INTEGRATION=1 to run them.")
+
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as exc:
+        pytest.skip(f"Runtime database unavailable for integration tests: {exc}")
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+async def _recycle_engine_pool() -> AsyncGenerator[None, None]:
+    """Cada test corre en su propio event loop: no reutilizar conexiones de otro."""
+    yield
+    await engine.dispose()
+
+
+@pytest.fixture()
+async def api_client() -> AsyncGenerator[AsyncClient, None]:
+    """Cliente HTTP autenticado con el profesional semilla."""
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://testserver") as client:
+        login = await client.post(
+            "/api/v1/auth/login",
+            data={
+                "username": os.getenv("TEST_EMAIL", "sara@consultamed.es"),
+                "password": os.getenv("PILOT_PASSWORD", "piloto2026"),
+            },
+        )
+        assert login.status_code == 200, login.text
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+        yield client
+
+
+async def test_patient_list_stays_within_query_budget(api_client: AsyncClient) -> None:
+    with assert_max_queries(PATIENT_LIST_BUDGET):
+        response = await api_client.get("/api/v1/patients/", params={"limit": 50})
+
+    assert response.status_code == 200, response.text
+
+
+async def test_encounter_list_stays_within_query_budget(api_client: AsyncClient) -> None:
+    patients = await api_client.get("/api/v1/patients/", params={"limit": 1})
+    if not patients.json()["items"]:
+        pytest.skip("No hay pacientes en la base de datos de integración")
+    patient_id = patients.json()["items"][0]["id"]
+
+    with assert_max_queries(ENCOUNTER_LIST_BUDGET):
+        response = await api_client.get(
+            f"/api/v1/encounters/patient/{patient_id}", params={"limit": 50}
+        )
+
+    assert response.status_code == 200, response.text
+
+
+async def test_patient_detail_stays_within_query_budget(api_client: AsyncClient) -> None:
+    patients = await api_client.get("/api/v1/patients/", params={"limit": 1})
+    if not patients.json()["items"]:
+        pytest.skip("No hay pacientes en la base de datos de integración")
+    patient_id = patients.json()["items"][0]["id"]
+
+    with assert_max_queries(PATIENT_DETAIL_BUDGET):
+        response = await api_client.get(f"/api/v1/patients/{patient_id}")
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()["recent_encounters"]) <= 5
+
+    with assert_max_queries(REVALIDATION_BUDGET):
+        revalidated = await api_client.get(
+            f"/api/v1/patients/{patient_id}",
+            headers={"If-None-Match": response.headers["ETag"]},
+        )
+
+    assert revalidated.status_code == 304
+
+
+async def test_template_list_stays_within_query_budget(api_client: AsyncClient) -> None:
+    with assert_max_queries(TEMPLATE_LIST_BUDGET):
+        response = await api_client.get("/api/v1/templates/", params={"limit": 100})
+
+    assert response.status_code == 200, response.text
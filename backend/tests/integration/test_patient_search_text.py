@@ -0,0 +1,66 @@
+"""Integration tests: the SQL search expression normalizes like the Python search term."""
+
+import os
+from collections.abc import AsyncGenerator
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.database import engine
+from app.services.search_text import contains_pattern, normalize_search_text
+
+pytestmark = pytest.mark.integration
+
+INTEGRATION_FLAG = "RUN_INTEGRATION"
+
+
+@pytest.fixture(scope="module", autouse=True)
+async def _require_runtime_database() -> None:
+    """Skip when integration mode is off or runtime DB is unavailable."""
+    if os.getenv(INTEGRATION_FLAG, "0") != "1":
+        pytest.skip("Integration tests disabled. Set RUN_INTEGRATION=1 to run them.")
+
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as exc:
+        pytest.skip(f"Runtime database unavailable for integration tests: {exc}")
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture()
+async def connection() -> AsyncGenerator[AsyncConnection, None]:
+    async with engine.connect() as conn:
+        yield conn
+    await engine.dispose()
+
+
+@pytest.mark.parametrize(
+    ("name_given", "name_family"),
+    [
+        ("Ana  María", "Pérez"),  # doble espacio
+        ("Ana María ", " Pérez\t"),  # espacios en los extremos y tabulador
+        ("", "Ibáñez"),
+    ],
+)
+async def test_search_text_matches_python_normalization(
+    connection: AsyncConnection, name_given: str, name_family: str
+) -> None:
+    indexed = await connection.scalar(
+        text("SELECT patient_search_text(:given, :family)"),
+        {"given": name_given, "family": name_family},
+    )
+
+    assert indexed == normalize_search_text(f"{name_given} {name_family}")
+
+
+async def test_term_with_single_spaces_finds_a_double_spaced_name(connection: AsyncConnection) -> None:
+    found = await connection.scalar(
+        text("SELECT patient_search_text(:given, :family) LIKE :pattern"),
+        {"given": "Ana  María", "family": "Pérez ", "pattern": contains_pattern(normalize_search_text("ana maria perez"))},
+    )
+
+    assert found is True
@@ -0,0 +1,143 @@
+"""Integration tests for the trigger-maintained patient_summary table."""
+
+import os
+import random
+import uuid
+from collections.abc import AsyncGenerator
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.database import engine
+from app.validators.dni import get_letra_dni
+
+pytestmark = pytest.mark.integration
+
+INTEGRATION_FLAG = "RUN_INTEGRATION"
+
+FIRST_VISIT = datetime(2026, 3, 1, 9, 0, tzinfo=timezone.utc)
+LAST_VISIT = datetime(2026, 9, 15, 11, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module", autouse=True)
+async def _require_runtime_database() -> None:
+    """Skip when integration mode is off or runtime DB is unavailable."""
+    if os.getenv(INTEGRATION_FLAG, "0") != "1":
+        pytest.skip("Integration tests disabled. Set RUN_INTEGRATION=1 to run them.")
+
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as exc:
+        pytest.skip(f"Runtime database unavailable for integration tests: {exc}")
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture()
+async def connection() -> AsyncGenerator[AsyncConnection, None]:
+    """Conexión en una transacción que se deshace al terminar: no deja datos."""
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            yield conn
+        finally:
+            await transaction.rollback()
+    await engine.dispose()
+
+
+async def _create_patient(conn: AsyncConnection) -> str:
+    patient_id = str(uuid.uuid4())
+    digits = f"{random.randrange(10**7, 10**8):08d}"
+    await conn.execute(
+        text(
+            "INSERT INTO patients (id, identifier_value, name_given, name_family, birth_date) "
+            "VALUES (:id, :dni, 'Prueba', 'Resumen', DATE '1980-01-01')"
+        ),
+        {"id": patient_id, "dni": digits + get_letra_dni(digits)},
+    )
+    return patient_id
+
+
+async def _summary(conn: AsyncConnection, patient_id: str) -> tuple[int, int, datetime | None]:
+    row = (
+        await conn.execute(
+            text(
+                "SELECT encounter_count, active_allergy_count, last_encounter_at "
+                "FROM patient_summary WHERE patient_id = :id"
+            ),
+            {"id": patient_id},
+        )
+    ).one()
+    return row.encounter_count, row.active_allergy_count, row.last_encounter_at
+
+
+async def _any_practitioner(conn: AsyncConnection) -> str:
+    practitioner_id = (await conn.execute(text("SELECT id FROM practitioners LIMIT 1"))).scalar()
+    if practitioner_id is None:
+        pytest.skip("No hay profesionales en la base de datos de integración")
+    return str(practitioner_id)
+
+
+async def test_new_patient_starts_with_empty_summary(connection: AsyncConnection) -> None:
+    patient_id = await _create_patient(connection)
+
+    assert await _summary(connection, patient_id) == (0, 0, None)
+
+
+async def test_triggers_follow_encounter_and_allergy_changes(connection: AsyncConnection) -> None:
+    patient_id = await _create_patient(connection)
+    practitioner_id = await _any_practitioner(connection)
+
+    # Varias filas en una sentencia: el trigger por sentencia recalcula una vez
+    await connection.execute(
+        text(
+            "INSERT INTO encounters (subject_id, participant_id, period_start) "
+            "VALUES (:p, :pr, :first), (:p, :pr, :last)"
+        ),
+        {"p": patient_id, "pr": practitioner_id, "first": FIRST_VISIT, "last": LAST_VISIT},
+    )
+    await connection.execute(
+        text(
+            "INSERT INTO allergy_intolerances (patient_id, clinical_status, code_text) "
+            "VALUES (:p, 'active', 'Penicilina'), (:p, 'resolved', 'Látex')"
+        ),
+        {"p": patient_id},
+    )
+    assert await _summary(connection, patient_id) == (2, 1, LAST_VISIT)
+
+    await connection.execute(
+        text("UPDATE allergy_intolerances SET clinical_status = 'active' WHERE patient_id = :p"),
+        {"p": patient_id},
+    )
+    await connection.execute(
+        text("DELETE FROM encounters WHERE subject_id = :p AND period_start = :last"),
+        {"p": patient_id, "last": LAST_VISIT},
+    )
+    assert await _summary(connection, patient_id) == (1, 2, FIRST_VISIT)
+
+    mismatches = await connection.execute(
+        text("SELECT * FROM patient_summary_mismatches() WHERE patient_id = :p"),
+        {"p": patient_id},
+    )
+    assert mismatches.all() == []
+
+
+async def test_rebuild_repairs_a_drifted_summary(connection: AsyncConnection) -> None:
+    patient_id = await _create_patient(connection)
+    await connection.execute(
+        text("UPDATE patient_summary SET encounter_count = 99 WHERE patient_id = :p"),
+        {"p": patient_id},
+    )
+
+    drifted = await connection.execute(
+        text("SELECT patient_id FROM patient_summary_mismatches() WHERE patient_id = :p"),
+        {"p": patient_id},
+    )
+    assert drifted.scalar() is not None
+
+    await connection.execute(text("SELECT rebuild_patient_summary()"))
+    assert await _summary(connection, patient_id) == (0, 0, None)
@@ -0,0 +1,145 @@
+"""Unit tests for negotiated brotli/gzip response compression."""
+import gzip
+from collections.abc import Iterator
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.compression import CompressionMiddleware, is_compressible, negotiate_encoding
+from app.observability.middleware import ServerTimingMiddleware
+from app.observability.timing import RouteLatencyRegistry
+
+pytestmark = pytest.mark.unit
+
+SOAP = "Paciente refiere odinofagia de tres días de evolución sin fiebre. " * 60
+
+
+def _build_app(minimum_size: int = 500) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/soap")
+    async def soap() -> dict[str, str]:
+        return {"subjective_text": SOAP}
+
+    @app.get("/small")
+    async def small() -> dict[str, str]:
+        return {"status": "ok"}
+
+    @app.get("/pdf")
+    async def pdf() -> Response:
+        return Response(b"%PDF-1.7" + b"0" * 4096, media_type="application/pdf")
+
+    @app.get("/encoded")
+    async def encoded() -> Response:
+        body = gzip.compress(SOAP.encode("utf-8"))
+        return Response(body, media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+    @app.get("/not-modified")
+    async def not_modified() -> Response:
+        return Response(status_code=304, headers={"ETag": 'W/"v1"', "Content-Type": "application/json"})
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        def chunks() -> Iterator[str]:
+            for _ in range(3):
+                yield SOAP
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=minimum_size)
+    return app
+
+
+def _raw(client: TestClient, path: str, accept_encoding: str) -> tuple[dict[str, str], bytes]:
+    """Cabeceras y cuerpo tal como salen del servidor (sin descomprimir)."""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return dict(response.headers), b"".join(response.iter_raw())
+
+
+def test_negotiation_honours_q_values_and_prefers_brotli() -> None:
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("gzip") == "gzip"
+    assert negotiate_encoding("br;q=0.5, gzip;q=0.8") == "gzip"
+    assert negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("*;q=0.1, br;q=0") == "gzip"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+
+def test_compressible_types() -> None:
+    assert is_compressible("application/json")
+    assert is_compressible("text/html; charset=utf-8")
+    assert is_compressible("application/fhir+json")
+    assert not is_compressible("application/pdf")
+    assert not is_compressible("image/png")
+
+
+def test_large_json_is_brotli_compressed() -> None:
+    headers, body = _raw(TestClient(_build_app()), "/soap", "gzip, br")
+
+    assert headers["content-encoding"] == "br"
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(body)
+    plain = brotli.decompress(body)
+    assert plain.decode("utf-8") == f'{{"subjective_text":"{SOAP}"}}'
+    assert len(body) < len(plain) / 10
+
+
+def test_gzip_when_brotli_is_not_accepted() -> None:
+    headers, body = _raw(TestClient(_build_app()), "/soap", "gzip")
+
+    assert headers["content-encoding"] == "gzip"
+    assert gzip.decompress(body).startswith(b'{"subjective_text":')
+
+
+def test_small_bodies_are_sent_as_is_but_still_vary() -> None:
+    headers, body = _raw(TestClient(_build_app()), "/small", "br")
+
+    assert "content-encoding" not in headers
+    assert headers["vary"] == "Accept-Encoding"
+    assert body == b'{"status":"ok"}'
+
+
+@pytest.mark.parametrize("path", ["/pdf", "/encoded", "/not-modified"])
+def test_pdf_already_encoded_and_bodyless_responses_pass_through(path: str) -> None:
+    client = TestClient(_build_app())
+
+    plain_headers, plain_body = _raw(client, path, "identity")
+    headers, body = _raw(client, path, "br, gzip")
+
+    assert headers.get("content-encoding") == plain_headers.get("content-encoding")
+    assert body == plain_body
+
+
+def test_without_accept_encoding_nothing_is_compressed() -> None:
+    headers, body = _raw(TestClient(_build_app()), "/soap", "identity")
+
+    assert "content-encoding" not in headers
+    assert len(body) == int(headers["content-length"])
+
+
+def test_streaming_responses_are_compressed_incrementally() -> None:
+    headers, body = _raw(TestClient(_build_app(minimum_size=10**6)), "/stream", "gzip")
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert gzip.decompress(body).decode("utf-8") == SOAP * 3
+
+
+def test_client_decodes_transparently() -> None:
+    client = TestClient(_build_app())
+
+    assert client.get("/soap", headers={"Accept-Encoding": "br"}).json() == {"subjective_text": SOAP}
+
+
+def test_compression_time_is_reported_in_server_timing() -> None:
+    app = _build_app()
+    app.add_middleware(ServerTimingMiddleware, registry=RouteLatencyRegistry())
+
+    headers, _ = _raw(TestClient(app), "/soap", "br")
+
+    assert "compress;dur=" in headers["server-timing"]
@@ -0,0 +1,168 @@
+"""Unit tests for weak ETags and conditional GET on record endpoints."""
+import json
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+import app.api.patients as patients_api
+import app.api.templates as templates_api
+from app.api.conditional import CACHE_CONTROL, etag_matches, weak_etag
+from app.models.allergy import AllergyIntolerance
+from app.models.template import TreatmentTemplate
+from app.services.row_version import row_set_version
+from app.services.template_cache import invalidate_templates, template_cache
+
+pytestmark = pytest.mark.unit
+
+UPDATED = datetime(2026, 10, 1, 9, 30, tzinfo=timezone.utc)
+
+
+def test_weak_etag_is_stable_and_version_sensitive() -> None:
+    etag = weak_etag("patient", "901", "a1:902", None)
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == weak_etag("patient", "901", "a1:902", None)
+    assert etag != weak_etag("patient", "903", "a1:902", None)
+
+
+def test_etag_matches_uses_weak_comparison_and_lists() -> None:
+    etag = weak_etag("x")
+    strong = etag.removeprefix("W/")
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(strong, etag)
+    assert etag_matches(f'W/"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('W/"other"', etag)
+
+
+def test_row_set_version_reads_only_ids_and_xmin() -> None:
+    stmt = select(row_set_version(AllergyIntolerance, AllergyIntolerance.patient_id == "p1"))
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "allergy_intolerances.xmin" in sql
+    assert "string_agg" in sql and "ORDER BY" in sql
+    assert "code_text" not in sql
+
+
+class _PatientServiceDouble:
+    def __init__(self, version: Any) -> None:
+        self.version = version
+        self.detail_loads = 0
+
+    async def get_detail_version(self, patient_id: str) -> Any:
+        return self.version
+
+    async def get_detail(self, patient_id: str) -> Any:
+        self.detail_loads += 1
+        return None
+
+
+@pytest.mark.asyncio
+async def test_patient_record_returns_304_without_loading_it(monkeypatch: pytest.MonkeyPatch) -> None:
+    service = _PatientServiceDouble(("901", "a1:902", None))
+    monkeypatch.setattr(patients_api, "PatientService", lambda db: service)
+    etag = weak_etag("patient", "901", "a1:902", None, date.today().isoformat())
+
+    result = await patients_api.get_patient(
+        "p1",
+        if_none_match=etag,
+        db=object(),  # type: ignore[arg-type]
+        current_user=object(),  # type: ignore[arg-type]
+    )
+
+    assert isinstance(result, Response) and result.status_code == 304
+    assert result.headers["ETag"] == etag
+    assert result.headers["Cache-Control"] == CACHE_CONTROL
+    assert service.detail_loads == 0
+
+
+@pytest.mark.asyncio
+async def test_patient_etag_expires_when_the_day_changes(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Tomorrow(date):
+        @classmethod
+        def today(cls) -> "_Tomorrow":
+            return cls(2026, 10, 18)
+
+    service = _PatientServiceDouble(("901", "a1:902", None))
+    monkeypatch.setattr(patients_api, "PatientService", lambda db: service)
+    monkeypatch.setattr(patients_api, "date", _Tomorrow)
+    # Mismas filas, pero la edad calculada puede haber cambiado (cumpleaños)
+    yesterday = weak_etag("patient", "901", "a1:902", None, "2026-10-17")
+
+    # No es un 304: se carga el detalle (el doble no tiene, de ahí el 404)
+    with pytest.raises(HTTPException):
+        await patients_api.get_patient(
+            "p1",
+            if_none_match=yesterday,
+            db=object(),  # type: ignore[arg-type]
+            current_user=object(),  # type: ignore[arg-type]
+        )
+
+    assert service.detail_loads == 1
+
+
+class _Result:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def scalars(self) -> "_Result":
+        return self
+
+    def all(self) -> list[Any]:
+        return self._rows
+
+
+class _RecordingSession:
+    def __init__(self, templates: list[TreatmentTemplate]) -> None:
+        self.templates = templates
+        self.statements: list[str] = []
+
+    async def execute(self, statement: Any) -> _Result:
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return _Result(self.templates)
+
+
+async def _list_templates(session: _RecordingSession, if_none_match: Any) -> Any:
+    return await templates_api.list_templates(
+        search=None,
+        favorites_only=False,
+        limit=50,
+        offset=0,
+        total_mode="window",
+        if_none_match=if_none_match,
+        db=session,  # type: ignore[arg-type]
+        current_practitioner=SimpleNamespace(id="pr1"),  # type: ignore[arg-type]
+    )
+
+
+@pytest.mark.asyncio
+async def test_template_list_revalidates_against_the_cached_versions() -> None:
+    template_cache.clear()
+    template = TreatmentTemplate(
+        id="t1", name="Faringitis", diagnosis_text="Faringitis aguda", medications=[],
+        is_favorite=False, practitioner_id="pr1", meta_updated_at=UPDATED,
+    )
+    session = _RecordingSession([template])
+
+    response = await _list_templates(session, None)
+
+    etag = response.headers["ETag"]
+    assert [item["id"] for item in json.loads(response.body)["items"]] == ["t1"]
+    assert len(session.statements) == 1
+
+    result = await _list_templates(session, etag)
+    assert isinstance(result, Response) and result.status_code == 304
+    assert len(session.statements) == 1
+
+    template.meta_updated_at = datetime(2026, 10, 2, tzinfo=timezone.utc)
+    invalidate_templates("pr1")
+    fresh = await _list_templates(session, etag)
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != etag
+    template_cache.clear()
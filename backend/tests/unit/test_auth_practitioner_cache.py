@@ -0,0 +1,125 @@
+"""Unit tests for the TTL cache behind get_current_practitioner."""
+from typing import Any
+
+import pytest
+
+from app.models.practitioner import Practitioner
+from app.services.cache import TTLCache
+from app.services.practitioner_service import PractitionerService, practitioner_cache
+
+pytestmark = pytest.mark.unit
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _ScalarResult:
+    def __init__(self, value: Practitioner | None) -> None:
+        self._value = value
+
+    def scalar_one_or_none(self) -> Practitioner | None:
+        return self._value
+
+
+class _CountingSession:
+    """Session double that serves one practitioner and counts round trips."""
+
+    def __init__(self, practitioner: Practitioner | None) -> None:
+        self.practitioner = practitioner
+        self.queries = 0
+
+    async def execute(self, statement: Any) -> _ScalarResult:
+        self.queries += 1
+        return _ScalarResult(self.practitioner)
+
+    async def commit(self) -> None:
+        return None
+
+    async def refresh(self, instance: Any) -> None:
+        return None
+
+
+def _practitioner() -> Practitioner:
+    return Practitioner(
+        id="practitioner-1",
+        identifier_value="COL-1",
+        name_given="Sara",
+        name_family="Martin",
+        telecom_email="sara@consultamed.es",
+        password_hash="$2b$12$hash",
+        active=True,
+    )
+
+
+def test_ttl_cache_expires_entries() -> None:
+    """Entries stop being served once their TTL has elapsed."""
+    clock = _FakeClock()
+    cache: TTLCache[str, int] = TTLCache(ttl_seconds=30, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 29
+    assert cache.get("a") == 1
+    clock.now = 30
+    assert cache.get("a") is None
+    assert cache.stats().hits == 1 and cache.stats().misses == 1
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    """The cache is bounded: the least recently read entry goes first."""
+    cache: TTLCache[str, int] = TTLCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats().evictions == 1
+
+
+def test_zero_ttl_disables_cache() -> None:
+    cache: TTLCache[str, int] = TTLCache(ttl_seconds=0)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+
+
+async def test_auth_lookup_hits_database_once_per_ttl() -> None:
+    """Repeated authenticated requests reuse the cached snapshot."""
+    session = _CountingSession(_practitioner())
+    service = PractitionerService(session)  # type: ignore[arg-type]
+
+    first = await service.get_for_auth("practitioner-1")
+    second = await service.get_for_auth("practitioner-1")
+
+    assert session.queries == 1
+    assert first is not None and second is not None
+    assert first is not second
+    assert second.name_family == "Martin"
+
+
+async def test_cached_snapshot_never_holds_password_hash() -> None:
+    session = _CountingSession(_practitioner())
+
+    cached = await PractitionerService(session).get_for_auth("practitioner-1")  # type: ignore[arg-type]
+
+    assert cached is not None and cached.password_hash is None
+    assert "password_hash" not in (practitioner_cache.get("practitioner-1") or {})
+
+
+async def test_deactivation_invalidates_cached_practitioner() -> None:
+    """set_active must drop the snapshot so the next request sees active=False."""
+    practitioner = _practitioner()
+    session = _CountingSession(practitioner)
+    service = PractitionerService(session)  # type: ignore[arg-type]
+    await service.get_for_auth("practitioner-1")
+
+    await service.set_active("practitioner-1", False)
+    refreshed = await service.get_for_auth("practitioner-1")
+
+    assert refreshed is not None and refreshed.active is False
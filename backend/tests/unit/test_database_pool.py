@@ -0,0 +1,116 @@
+"""Unit tests for connection pool configuration and runtime pool counters."""
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.util import await_only, greenlet_spawn
+
+from app.config import Settings
+from app.database import InstrumentedQueuePool, build_engine_options, get_pool_stats
+
+pytestmark = pytest.mark.unit
+
+
+def test_engine_options_follow_pool_settings() -> None:
+    """Pool sizing, recycling and statement cache must come from Settings."""
+    settings = Settings(
+        _env_file=None,
+        DB_POOL_SIZE=15,
+        DB_MAX_OVERFLOW=5,
+        DB_POOL_TIMEOUT_SECONDS=3,
+        DB_POOL_RECYCLE_SECONDS=600,
+        DB_POOL_PRE_PING=False,
+        DB_STATEMENT_CACHE_SIZE=0,
+    )
+
+    options = build_engine_options(settings)
+
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 15
+    assert options["max_overflow"] == 5
+    assert options["pool_timeout"] == 3
+    assert options["pool_recycle"] == 600
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {
+        "prepared_statement_cache_size": 0,
+        "statement_cache_size": 0,
+    }
+
+
+def test_pool_settings_read_namespaced_envs(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Pool knobs use the CONSULTAMED_* prefix like the rest of runtime settings."""
+    monkeypatch.setenv("CONSULTAMED_DB_POOL_SIZE", "25")
+    monkeypatch.setenv("CONSULTAMED_DB_POOL_PRE_PING", "false")
+
+    settings = Settings(_env_file=None)
+
+    assert settings.DB_POOL_SIZE == 25
+    assert settings.DB_POOL_PRE_PING is False
+
+
+def test_pool_size_must_be_positive() -> None:
+    """A zero-sized pool would serialize every request; reject it at startup."""
+    with pytest.raises(ValidationError):
+        Settings(_env_file=None, DB_POOL_SIZE=0)
+
+
+def test_pool_stats_track_checkout_and_checkin() -> None:
+    """Runtime counters must reflect checked-out connections and acquisitions."""
+    pool = InstrumentedQueuePool(creator=MagicMock, pool_size=2, max_overflow=1, timeout=0.1)
+
+    connection = pool.connect()
+    busy = get_pool_stats(pool)
+    connection.close()
+    idle = get_pool_stats(pool)
+
+    assert busy.checked_out == 1
+    assert busy.acquire_count == 1
+    assert busy.max_overflow == 1
+    assert idle.checked_out == 0
+    assert idle.checked_in == 1
+    assert idle.wait_seconds_total >= 0
+    assert idle.wait_seconds_avg == idle.wait_seconds_total
+
+
+async def _hold_connections(pool: InstrumentedQueuePool, checkouts: int, hold_seconds: float) -> int:
+    """Checkouts concurrentes (cada uno en su greenlet, como en el engine async); devuelve los fallidos."""
+
+    def use() -> None:
+        connection = pool.connect()
+        await_only(asyncio.sleep(hold_seconds))
+        connection.close()
+
+    results = await asyncio.gather(
+        *(greenlet_spawn(use) for _ in range(checkouts)), return_exceptions=True
+    )
+    return sum(isinstance(result, PoolTimeoutError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_checkouts_are_all_measured() -> None:
+    """A checkout waiting on the queue must not hide the other concurrent ones."""
+    pool = InstrumentedQueuePool(creator=MagicMock, pool_size=1, max_overflow=0, timeout=5)
+
+    failed = await _hold_connections(pool, checkouts=6, hold_seconds=0.01)
+    stats = get_pool_stats(pool)
+
+    assert failed == 0
+    assert stats.acquire_count == 6
+    assert stats.timeout_count == 0
+    # El último en la cola espera a los cinco anteriores
+    assert stats.wait_seconds_max >= 0.04
+    assert stats.wait_seconds_total > stats.wait_seconds_max
+
+
+@pytest.mark.asyncio
+async def test_concurrent_timeouts_are_counted() -> None:
+    pool = InstrumentedQueuePool(creator=MagicMock, pool_size=1, max_overflow=0, timeout=0.02)
+
+    failed = await _hold_connections(pool, checkouts=4, hold_seconds=0.2)
+    stats = get_pool_stats(pool)
+
+    assert failed == 3
+    assert stats.timeout_count == 3
+    assert stats.acquire_count == 4
@@ -0,0 +1,131 @@
+"""Unit tests for the create_encounter write path (client IDs, bulk inserts, no re-read)."""
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+
+from app.api.encounters import create_encounter
+from app.schemas.encounter import EncounterCreate
+
+pytestmark = pytest.mark.unit
+
+
+class _RecordingSession:
+    """Session double: records statements and optionally fails on commit."""
+
+    def __init__(self, commit_error: Exception | None = None) -> None:
+        self.added: list[Any] = []
+        self.statements: list[tuple[str, Any]] = []
+        self.commits = 0
+        self.rollbacks = 0
+        self._commit_error = commit_error
+
+    def add(self, instance: Any) -> None:
+        self.added.append(instance)
+
+    async def execute(self, statement: Any, params: Any = None) -> None:
+        self.statements.append((str(statement.compile(dialect=postgresql.dialect())), params))
+
+    async def commit(self) -> None:
+        if self._commit_error is not None:
+            raise self._commit_error
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        self.rollbacks += 1
+
+
+def _integrity_error(sqlstate: str) -> IntegrityError:
+    return IntegrityError("INSERT INTO encounters ...", {}, SimpleNamespace(sqlstate=sqlstate))
+
+
+PRACTITIONER = SimpleNamespace(id="pract-1")
+
+PAYLOAD = EncounterCreate(
+    reason_text="Dolor de garganta",
+    subjective_text="Odinofagia de 2 días",
+    conditions=[
+        {"code_text": "Faringitis aguda", "code_coding_code": "J02.9"},
+        {"code_text": "Fiebre", "code_coding_code": "R50.9"},
+    ],
+    medications=[
+        {"medication_text": "Paracetamol 1g", "dosage_text": "1 cada 8h", "duration_value": 5, "duration_unit": "d"},
+    ],
+)
+
+
+async def test_create_inserts_children_in_bulk_and_commits_once() -> None:
+    """One INSERT per child table (executemany), no SELECT before or after."""
+    session = _RecordingSession()
+
+    response = await create_encounter(
+        "patient-1", PAYLOAD, db=session, current_user=PRACTITIONER  # type: ignore[arg-type]
+    )
+
+    assert session.commits == 1
+    assert len(session.added) == 1 and session.added[0].id == response.id
+    assert [sql.split(" (")[0] for sql, _ in session.statements] == [
+        "INSERT INTO conditions",
+        "INSERT INTO medication_requests",
+    ]
+    assert not any(sql.startswith("SELECT") for sql, _ in session.statements)
+    conditions_params = session.statements[0][1]
+    assert len(conditions_params) == 2
+    assert {row["encounter_id"] for row in conditions_params} == {response.id}
+
+
+async def test_create_builds_response_from_written_data() -> None:
+    session = _RecordingSession()
+
+    response = await create_encounter(
+        "patient-1", PAYLOAD, db=session, current_user=PRACTITIONER  # type: ignore[arg-type]
+    )
+
+    written_ids = [row["id"] for row in session.statements[0][1]]
+    assert [c.id for c in response.conditions] == written_ids
+    assert [c.code_coding_code for c in response.conditions] == ["J02.9", "R50.9"]
+    assert response.medications[0].status == "active"
+    assert response.status == "finished"
+    assert response.period_start.tzinfo is not None
+    assert response.note == "Subjetivo: Odinofagia de 2 días"
+
+
+async def test_create_without_children_issues_no_child_inserts() -> None:
+    session = _RecordingSession()
+
+    response = await create_encounter(
+        "patient-1", EncounterCreate(reason_text="Revisión"),
+        db=session, current_user=PRACTITIONER,  # type: ignore[arg-type]
+    )
+
+    assert session.statements == []
+    assert session.commits == 1
+    assert response.conditions == [] and response.medications == []
+
+
+async def test_missing_patient_foreign_key_maps_to_404() -> None:
+    """The FK violation replaces the former existence pre-check."""
+    session = _RecordingSession(commit_error=_integrity_error("23503"))
+
+    with pytest.raises(HTTPException) as exc_info:
+        await create_encounter(
+            "missing", PAYLOAD, db=session, current_user=PRACTITIONER  # type: ignore[arg-type]
+        )
+
+    assert exc_info.value.status_code == 404
+    assert exc_info.value.detail == "Paciente no encontrado"
+    assert session.rollbacks == 1
+
+
+async def test_other_integrity_errors_are_not_masked() -> None:
+    session = _RecordingSession(commit_error=_integrity_error("23505"))
+
+    with pytest.raises(IntegrityError):
+        await create_encounter(
+            "patient-1", PAYLOAD, db=session, current_user=PRACTITIONER  # type: ignore[arg-type]
+        )
+
+    assert session.rollbacks == 1
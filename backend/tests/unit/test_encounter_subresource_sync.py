@@ -0,0 +1,191 @@
+"""Unit tests for diff-based Condition/MedicationRequest sync on encounter update."""
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.api.encounters import (
+    CONDITION_SYNC_FIELDS,
+    MEDICATION_SYNC_FIELDS,
+    MEDICATION_SYNC_IDENTITY,
+    SUBRESOURCE_ORDER_FIELD,
+)
+from app.models.condition import Condition
+from app.services.subresource_sync import SyncPlan, apply_sync, plan_sync
+
+pytestmark = pytest.mark.unit
+
+
+def _condition(row_id: str, text: str, code: str | None = None) -> SimpleNamespace:
+    return SimpleNamespace(id=row_id, code_text=text, code_coding_code=code)
+
+
+def _incoming(text: str, code: str | None = None) -> dict[str, Any]:
+    return {"code_text": text, "code_coding_code": code}
+
+
+EXISTING = [_condition("c1", "Faringitis", "J02"), _condition("c2", "Fiebre", "R50")]
+
+
+class _RecordingSession:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, Any]] = []
+
+    async def execute(self, statement: Any, params: Any = None) -> None:
+        self.calls.append((str(statement.compile(dialect=postgresql.dialect())), params))
+
+
+def test_unchanged_subresources_produce_no_writes() -> None:
+    """An autosave that only edits SOAP text must not touch child rows."""
+    plan = plan_sync(
+        EXISTING,
+        [_incoming("Fiebre", "R50"), _incoming("Faringitis", "J02")],
+        CONDITION_SYNC_FIELDS,
+    )
+
+    assert plan.is_noop
+    assert sorted(plan.keep) == ["c1", "c2"]
+
+
+def test_edited_row_is_updated_in_place_keeping_its_id() -> None:
+    plan = plan_sync(
+        EXISTING,
+        [_incoming("Faringitis", "J02"), _incoming("Fiebre alta", "R50")],
+        CONDITION_SYNC_FIELDS,
+    )
+
+    assert plan.keep == ["c1"]
+    assert plan.update == [{"id": "c2", "code_text": "Fiebre alta", "code_coding_code": "R50"}]
+    assert plan.insert == [] and plan.delete == []
+
+
+def test_removed_and_added_rows_become_delete_and_insert() -> None:
+    removed = plan_sync(EXISTING, [_incoming("Faringitis", "J02")], CONDITION_SYNC_FIELDS)
+    added = plan_sync(
+        EXISTING,
+        [_incoming("Faringitis", "J02"), _incoming("Fiebre", "R50"), _incoming("Tos")],
+        CONDITION_SYNC_FIELDS,
+    )
+
+    assert removed.delete == ["c2"] and removed.update == []
+    assert added.insert == [_incoming("Tos")] and added.delete == []
+
+
+def test_duplicate_rows_are_matched_one_to_one() -> None:
+    existing = [_condition("c1", "Tos"), _condition("c2", "Tos")]
+
+    plan = plan_sync(existing, [_incoming("Tos")], CONDITION_SYNC_FIELDS)
+
+    assert plan.keep == ["c1"]
+    assert plan.delete == ["c2"]
+
+
+def _medication(row_id: str, drug: str, dosage: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=row_id, medication_text=drug, dosage_text=dosage, duration_value=7, duration_unit="d"
+    )
+
+
+def _prescribed(drug: str, dosage: str) -> dict[str, Any]:
+    return {"medication_text": drug, "dosage_text": dosage, "duration_value": 7, "duration_unit": "d"}
+
+
+def test_changing_the_drug_replaces_the_prescription() -> None:
+    """A different drug is a new prescription: the old row's metadata must not carry over."""
+    existing = [_medication("m1", "Amoxicilina 500 mg", "1/8h"), _medication("m2", "Ibuprofeno 600 mg", "1/8h")]
+
+    plan = plan_sync(
+        existing,
+        [_prescribed("Azitromicina 500 mg", "1/24h"), _prescribed("Ibuprofeno 600 mg", "1/12h")],
+        MEDICATION_SYNC_FIELDS,
+        MEDICATION_SYNC_IDENTITY,
+    )
+
+    # Mismo fármaco con otra pauta: UPDATE que conserva el ID
+    assert plan.update == [{"id": "m2", **_prescribed("Ibuprofeno 600 mg", "1/12h")}]
+    assert plan.delete == ["m1"]
+    assert plan.insert == [_prescribed("Azitromicina 500 mg", "1/24h")]
+
+
+def _ordered(*conditions: tuple[str, str, str]) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(id=row_id, code_text=text, code_coding_code=code, sort_order=position)
+        for position, (row_id, text, code) in enumerate(conditions)
+    ]
+
+
+def test_reordering_is_a_change_that_only_moves_rows() -> None:
+    """[A, B] -> [B, A] keeps both rows and rewrites only their position."""
+    existing = _ordered(("c1", "Faringitis", "J02"), ("c2", "Fiebre", "R50"))
+
+    plan = plan_sync(
+        existing,
+        [_incoming("Fiebre", "R50"), _incoming("Faringitis", "J02")],
+        CONDITION_SYNC_FIELDS,
+        order_field=SUBRESOURCE_ORDER_FIELD,
+    )
+
+    assert not plan.is_noop
+    assert plan.reorder == [{"id": "c2", "sort_order": 0}, {"id": "c1", "sort_order": 1}]
+    assert plan.update == [] and plan.insert == [] and plan.delete == []
+
+
+def test_edited_and_new_rows_carry_their_position() -> None:
+    existing = _ordered(("c1", "Faringitis", "J02"), ("c2", "Fiebre", "R50"))
+
+    plan = plan_sync(
+        existing,
+        [_incoming("Faringoamigdalitis", "J03"), _incoming("Fiebre", "R50"), _incoming("Tos")],
+        CONDITION_SYNC_FIELDS,
+        order_field=SUBRESOURCE_ORDER_FIELD,
+    )
+
+    # El diagnóstico principal editado sigue siendo el primero
+    assert plan.update == [{"id": "c1", **_incoming("Faringoamigdalitis", "J03"), "sort_order": 0}]
+    assert plan.insert == [{**_incoming("Tos"), "sort_order": 2}]
+    assert plan.reorder == []
+
+
+async def test_reorder_is_written_without_edit_metadata() -> None:
+    """Moving a prescription must not re-sign it like an edit would."""
+    session = _RecordingSession()
+
+    await apply_sync(  # type: ignore[arg-type]
+        session, Condition, SyncPlan(reorder=[{"id": "c1", "sort_order": 1}]),
+        insert_values={}, update_values={"requester_id": "pr2"},
+    )
+
+    assert [sql.split()[0] for sql, _ in session.calls] == ["UPDATE"]
+    assert session.calls[0][1] == [{"id": "c1", "sort_order": 1}]
+
+
+async def test_apply_sync_uses_one_bulk_statement_per_operation() -> None:
+    """Deletes, updates and inserts are batched, never one statement per row."""
+    plan = SyncPlan(
+        keep=[],
+        update=[{"id": "c1", "code_text": "A", "code_coding_code": None}],
+        insert=[_incoming("B"), _incoming("C")],
+        delete=["c2", "c3"],
+    )
+    session = _RecordingSession()
+
+    await apply_sync(  # type: ignore[arg-type]
+        session, Condition, plan, insert_values={"subject_id": "p1", "encounter_id": "e1"}
+    )
+
+    statements = [sql.split()[0] for sql, _ in session.calls]
+    assert statements == ["DELETE", "UPDATE", "INSERT"]
+    assert "conditions.id IN" in session.calls[0][0]
+    assert session.calls[2][1] == [
+        {"code_text": "B", "code_coding_code": None, "subject_id": "p1", "encounter_id": "e1"},
+        {"code_text": "C", "code_coding_code": None, "subject_id": "p1", "encounter_id": "e1"},
+    ]
+
+
+async def test_noop_plan_issues_no_statements() -> None:
+    session = _RecordingSession()
+
+    await apply_sync(session, Condition, SyncPlan(), insert_values={})  # type: ignore[arg-type]
+
+    assert session.calls == []
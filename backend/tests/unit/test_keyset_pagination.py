@@ -0,0 +1,124 @@
+"""Unit tests for opaque keyset cursors and cursor-mode patient search."""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql.asyncpg import PGDialect_asyncpg
+
+from app.models.encounter import Encounter
+from app.models.patient import Patient
+from app.services.pagination import InvalidCursorError, decode_cursor, encode_cursor, keyset_predicate
+from app.services.patient_service import PATIENT_CURSOR_SCOPE, PatientService
+
+pytestmark = pytest.mark.unit
+
+
+class _Result:
+    def __init__(self, rows: list[tuple[Any, ...]]) -> None:
+        self._rows = rows
+
+    def all(self) -> list[tuple[Any, ...]]:
+        return self._rows
+
+
+class _RecordingSession:
+    """Session double that records SQL and replays scripted results."""
+
+    def __init__(self, results: list[_Result]) -> None:
+        self._results = results
+        self.statements: list[str] = []
+
+    async def execute(self, statement: Any) -> _Result:
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return self._results.pop(0)
+
+
+def _patient(family: str, given: str, patient_id: str) -> SimpleNamespace:
+    return SimpleNamespace(name_family=family, name_given=given, id=patient_id)
+
+
+def test_cursor_roundtrip_preserves_string_and_datetime_keys() -> None:
+    """Decoding must return the exact sort key that was encoded."""
+    started = datetime(2026, 3, 1, 9, 30, 15, 123456, tzinfo=timezone.utc)
+
+    token = encode_cursor("encounters", (started, "enc-1"))
+
+    assert decode_cursor(token, "encounters", (datetime, str)) == [started, "enc-1"]
+
+
+def test_cursor_is_opaque_url_safe_token() -> None:
+    """Cursors travel in query strings: no padding or reserved characters."""
+    token = encode_cursor("patients", ("Muñoz", "Sara", "id-1"))
+
+    assert "=" not in token
+    assert "+" not in token and "/" not in token
+
+
+@pytest.mark.parametrize("token", ["not-a-cursor", "", "e30"])
+def test_decode_rejects_malformed_cursor(token: str) -> None:
+    """Garbage cursors must fail with a controlled error (mapped to HTTP 400)."""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, "patients", (str, str, str))
+
+
+def test_decode_rejects_cursor_from_another_listing() -> None:
+    """A patient cursor must not be usable to page encounters."""
+    token = encode_cursor("patients", ("Muñoz", "Sara", "id-1"))
+
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token, "encounters", (datetime, str))
+
+
+@pytest.mark.asyncio
+async def test_cursor_search_fetches_one_extra_row_and_emits_next_cursor() -> None:
+    """Cursor mode reads limit+1 rows to know whether another page exists."""
+    patients = [_patient("Abad", "Ana", "p1"), _patient("Bravo", "Luis", "p2"), _patient("Cano", "Eva", "p3")]
+    session = _RecordingSession([_Result([(p, 3) for p in patients])])
+
+    page = await PatientService(session).search("", limit=2, mode="cursor")  # type: ignore[arg-type]
+
+    assert [p.id for p in page.items] == ["p1", "p2"]
+    assert decode_cursor(page.next_cursor or "", PATIENT_CURSOR_SCOPE, (str, str, str)) == [
+        "Bravo",
+        "Luis",
+        "p2",
+    ]
+    assert "LIMIT %(param_1)s" in session.statements[0]
+    assert "OFFSET" not in session.statements[0]
+
+
+@pytest.mark.asyncio
+async def test_cursor_search_seeks_past_previous_key() -> None:
+    """The next page starts strictly after the (family, given, id) key."""
+    token = encode_cursor(PATIENT_CURSOR_SCOPE, ("Bravo", "Luis", "p2"))
+    session = _RecordingSession([_Result([(_patient("Cano", "Eva", "p3"),)])])
+
+    page = await PatientService(session).search(  # type: ignore[arg-type]
+        "", limit=2, mode="cursor", cursor=token
+    )
+
+    assert [p.id for p in page.items] == ["p3"]
+    assert page.next_cursor is None
+    assert page.total is None
+    assert "(patients.name_family, patients.name_given, patients.id) > (" in session.statements[0]
+
+
+def test_keyset_predicate_binds_cursor_values_with_column_types() -> None:
+    """asyncpg needs uuid/timestamptz binds: Postgres has no `uuid > varchar`."""
+    patients = select(Patient.id).where(
+        keyset_predicate((Patient.name_family, Patient.name_given, Patient.id), ("Bravo", "Luis", "p2"))
+    )
+    encounters = select(Encounter.id).where(
+        keyset_predicate(
+            (Encounter.period_start, Encounter.id),
+            (datetime(2026, 2, 7, 10, 30, tzinfo=timezone.utc), "e1"),
+            descending=True,
+        )
+    )
+
+    dialect = PGDialect_asyncpg()
+    assert "> ($1::VARCHAR, $2::VARCHAR, $3::UUID)" in str(patients.compile(dialect=dialect))
+    assert "< ($1::TIMESTAMP WITH TIME ZONE, $2::UUID)" in str(encounters.compile(dialect=dialect))
@@ -0,0 +1,138 @@
+"""Unit tests for the Prometheus text exposition served at /metrics."""
+import re
+
+import pytest
+
+from app.database import PoolStats
+from app.observability.metrics import AuthMetrics, format_metrics
+from app.observability.timing import RouteLatencyRegistry
+from app.services.cache import CacheStats
+from app.services.password_hasher import PasswordHasherStats
+from app.services.pdf_cache import PDFCacheStats
+from app.services.pdf_renderer import PDFRenderStats
+
+pytestmark = pytest.mark.unit
+
+SAMPLE_LINE = re.compile(r'^[a-z_]+(\{([a-z_]+="[^"]*",?)+\})? [-+0-9.eInf]+$')
+
+POOL = PoolStats(
+    size=10,
+    checked_in=7,
+    checked_out=3,
+    overflow=0,
+    max_overflow=5,
+    acquire_count=120,
+    wait_seconds_total=0.5,
+    wait_seconds_max=0.1,
+    timeout_count=0,
+)
+PDF_RENDER = PDFRenderStats(
+    workers=2,
+    capacity=10,
+    in_flight=5,
+    renders=40,
+    failures=1,
+    rejected=2,
+    render_seconds_total=12.0,
+    render_seconds_max=0.9,
+    queue_seconds_total=3.0,
+)
+PDF_CACHE = PDFCacheStats(memory_entries=4, memory_bytes=2048, memory_hits=6, disk_hits=2, misses=2)
+PASSWORD_HASHER = PasswordHasherStats(
+    workers=2,
+    capacity=34,
+    in_flight=6,
+    operations=50,
+    rejected=0,
+    work_seconds_total=12.5,
+    queue_seconds_total=4.0,
+    queue_seconds_max=0.8,
+)
+PRACTITIONER_CACHE = CacheStats(size=2, max_entries=1024, hits=9, misses=1, evictions=0)
+
+
+def _render(registry: RouteLatencyRegistry, auth: AuthMetrics) -> str:
+    return format_metrics(
+        routes=registry.snapshot(),
+        pool=POOL,
+        pdf_render=PDF_RENDER,
+        pdf_cache=PDF_CACHE,
+        caches={"practitioner": PRACTITIONER_CACHE},
+        auth=auth.snapshot(),
+        password_hasher=PASSWORD_HASHER,
+    )
+
+
+def _samples(body: str) -> dict[str, float]:
+    samples = {}
+    for line in body.splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_every_line_is_valid_exposition_format() -> None:
+    registry = RouteLatencyRegistry()
+    registry.observe("GET /api/v1/patients/{patient_id}", 200, 0.03)
+
+    body = _render(registry, AuthMetrics())
+
+    assert body.endswith("\n")
+    for line in body.splitlines():
+        assert line.startswith(("# HELP consultamed_", "# TYPE consultamed_")) or SAMPLE_LINE.match(line), line
+
+
+def test_route_histogram_buckets_are_cumulative_and_end_in_inf() -> None:
+    registry = RouteLatencyRegistry()
+    for seconds in (0.003, 0.04, 0.04, 20.0):
+        registry.observe("GET /api/v1/patients/", 200, seconds)
+
+    samples = _samples(_render(registry, AuthMetrics()))
+
+    labels = 'route="GET /api/v1/patients/",status="200"'
+    assert samples[f'consultamed_http_request_duration_seconds_bucket{{{labels},le="0.005"}}'] == 1
+    assert samples[f'consultamed_http_request_duration_seconds_bucket{{{labels},le="0.05"}}'] == 3
+    assert samples[f'consultamed_http_request_duration_seconds_bucket{{{labels},le="10.0"}}'] == 3
+    assert samples[f'consultamed_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == 4
+    assert samples[f"consultamed_http_request_duration_seconds_count{{{labels}}}"] == 4
+
+
+def test_pool_pdf_and_cache_gauges() -> None:
+    samples = _samples(_render(RouteLatencyRegistry(), AuthMetrics()))
+
+    assert samples["consultamed_db_pool_checked_out"] == 3
+    assert samples["consultamed_pdf_render_queue_depth"] == 3
+    assert samples["consultamed_pdf_render_duration_seconds_sum"] == 12.0
+    assert samples['consultamed_cache_hit_ratio{cache="practitioner"}'] == 0.9
+    assert samples['consultamed_cache_hit_ratio{cache="pdf"}'] == 0.8
+    assert samples['consultamed_cache_hits_total{cache="pdf",tier="disk"}'] == 2
+
+
+def test_login_outcomes_and_password_checks_are_counted() -> None:
+    auth = AuthMetrics()
+    with auth.password_check():
+        pass
+    auth.record_login("success")
+    auth.record_login("invalid_credentials")
+    auth.record_login("invalid_credentials")
+
+    samples = _samples(_render(RouteLatencyRegistry(), auth))
+
+    assert samples["consultamed_password_verify_duration_seconds_count"] == 1
+    assert samples['consultamed_password_verify_duration_seconds_bucket{le="+Inf"}'] == 1
+    assert samples['consultamed_login_attempts_total{outcome="success"}'] == 1
+    assert samples['consultamed_login_attempts_total{outcome="invalid_credentials"}'] == 2
+    # Las series existen desde el arranque aunque todavía no haya ocurrido ninguno
+    assert samples['consultamed_login_attempts_total{outcome="inactive"}'] == 0
+    assert samples["consultamed_bcrypt_queue_depth"] == 4
+    assert samples["consultamed_bcrypt_queue_seconds_sum"] == 4.0
+
+
+def test_label_values_are_escaped() -> None:
+    registry = RouteLatencyRegistry()
+    registry.observe('GET /a"b\\c', 200, 0.01)
+
+    body = _render(registry, AuthMetrics())
+
+    assert 'route="GET /a\\"b\\\\c"' in body
@@ -0,0 +1,125 @@
+"""Unit tests for per-request phase timing, Server-Timing headers and route histograms."""
+import asyncio
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import create_engine, text
+
+from app.observability.middleware import UNMATCHED_ROUTE, ServerTimingMiddleware
+from app.observability.sql import instrument_engine
+from app.observability.timing import (
+    LatencyHistogram,
+    RequestTimings,
+    RouteLatencyRegistry,
+    TimedRoute,
+    format_server_timing,
+    timed,
+)
+
+pytestmark = pytest.mark.unit
+
+
+class _Item(BaseModel):
+    id: str
+    name: str
+
+
+def _build_app(registry: RouteLatencyRegistry, **options: object) -> FastAPI:
+    router = APIRouter(route_class=TimedRoute)
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    @router.get("/items/{item_id}", response_model=_Item)
+    async def get_item(item_id: str) -> _Item:
+        with timed("auth"):
+            await asyncio.sleep(0)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return _Item(id=item_id, name="Paracetamol")
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api/v1")
+    app.add_middleware(ServerTimingMiddleware, registry=registry, **options)
+    return app
+
+
+def _phases(header: str) -> dict[str, float]:
+    entries = (entry.split(";")[:2] for entry in header.split(", "))
+    return {name: float(duration.removeprefix("dur=")) for name, duration in entries}
+
+
+def test_response_carries_server_timing_with_measured_phases() -> None:
+    registry = RouteLatencyRegistry()
+    client = TestClient(_build_app(registry))
+
+    response = client.get("/api/v1/items/abc")
+
+    assert response.status_code == 200
+    assert response.json() == {"id": "abc", "name": "Paracetamol"}
+    phases = _phases(response.headers["server-timing"])
+    assert set(phases) == {"db", "auth", "serialize", "total"}
+    assert phases["total"] >= phases["db"]
+
+
+def test_histogram_is_keyed_by_route_template_and_status() -> None:
+    """Path parameters must not create one series per id."""
+    registry = RouteLatencyRegistry()
+    client = TestClient(_build_app(registry))
+
+    client.get("/api/v1/items/a")
+    client.get("/api/v1/items/b")
+    client.get("/api/v1/nope")
+
+    series = {(s.route, s.status): s.count for s in registry.snapshot()}
+    assert series == {
+        ("GET /api/v1/items/{item_id}", 200): 2,
+        (UNMATCHED_ROUTE, 404): 1,
+    }
+
+
+def test_header_can_be_disabled_and_timing_allow_origin_is_scoped() -> None:
+    registry = RouteLatencyRegistry()
+    disabled = TestClient(_build_app(registry, enabled=False))
+    enabled = TestClient(_build_app(registry, timing_allow_origins=["http://localhost:3000"]))
+
+    assert "server-timing" not in disabled.get("/api/v1/items/a").headers
+    allowed = enabled.get("/api/v1/items/a", headers={"Origin": "http://localhost:3000"})
+    other = enabled.get("/api/v1/items/a", headers={"Origin": "http://evil.example"})
+    assert allowed.headers["timing-allow-origin"] == "http://localhost:3000"
+    assert "timing-allow-origin" not in other.headers
+
+
+def test_slow_requests_are_logged_with_their_breakdown(caplog: pytest.LogCaptureFixture) -> None:
+    client = TestClient(_build_app(RouteLatencyRegistry(), slow_request_ms=0.001))
+
+    with caplog.at_level("WARNING", logger="app.observability.middleware"):
+        client.get("/api/v1/items/a")
+
+    assert "GET /api/v1/items/{item_id}" in caplog.text
+    assert "serialize;dur=" in caplog.text
+
+
+def test_timed_outside_a_request_is_a_no_op() -> None:
+    with timed("render"):
+        pass
+
+
+def test_format_server_timing_orders_known_phases() -> None:
+    timings = RequestTimings(phases={"serialize": 0.002, "db": 0.0125}, queries=3)
+
+    assert format_server_timing(timings, 0.05) == (
+        'db;dur=12.5;desc="3 queries", serialize;dur=2.0, total;dur=50.0'
+    )
+
+
+def test_latency_histogram_buckets_and_percentiles() -> None:
+    histogram = LatencyHistogram(buckets=(0.1, 1.0), window=100)
+    for seconds in [0.05] * 90 + [0.5] * 9 + [2.0]:
+        histogram.observe(seconds)
+
+    assert histogram.bucket_counts == [90, 9, 1]
+    assert histogram.percentile(50) == 0.05
+    assert histogram.percentile(95) == 0.5
+    assert histogram.percentile(100) == 2.0
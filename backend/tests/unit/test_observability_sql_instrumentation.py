@@ -0,0 +1,105 @@
+"""Unit tests for per-request SQL counting, slow-query logging and the query budget helper."""
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, create_engine, text
+
+from app.observability.middleware import ServerTimingMiddleware
+from app.observability.sql import assert_max_queries, instrument_engine, redact_parameters
+from app.observability.timing import RouteLatencyRegistry, TimedRoute
+
+pytestmark = pytest.mark.unit
+
+PATIENT_DNI = "12345678Z"
+
+
+def _build_app(engine: Engine, *, lookups: int, **options: object) -> FastAPI:
+    """App whose endpoint runs one SELECT per item (an N+1 on purpose)."""
+    router = APIRouter(route_class=TimedRoute)
+
+    @router.get("/patients")
+    async def list_patients() -> dict[str, int]:
+        with engine.connect() as conn:
+            for _ in range(lookups):
+                conn.execute(text("SELECT :dni AS dni"), {"dni": PATIENT_DNI})
+        return {"items": lookups}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ServerTimingMiddleware, registry=RouteLatencyRegistry(), **options)
+    return app
+
+
+@pytest.fixture()
+def engine() -> Engine:
+    engine = create_engine("sqlite://")
+    instrument_engine(engine, slow_query_ms=0.0001)
+    return engine
+
+
+def test_server_timing_reports_query_count(engine: Engine) -> None:
+    response = TestClient(_build_app(engine, lookups=3)).get("/patients")
+
+    assert 'db;dur=' in response.headers["server-timing"]
+    assert 'desc="3 queries"' in response.headers["server-timing"]
+
+
+def test_slow_query_log_hides_parameter_values(
+    engine: Engine, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Slow statements are logged with their route but never with patient data."""
+    with caplog.at_level("WARNING", logger="app.observability.sql"):
+        TestClient(_build_app(engine, lookups=1)).get("/patients")
+
+    assert "Consulta lenta" in caplog.text
+    assert "GET /patients" in caplog.text
+    assert "parámetros: ('<str>',)" in caplog.text
+    assert PATIENT_DNI not in caplog.text
+
+
+def test_repeated_statement_is_reported_as_possible_n_plus_one(
+    engine: Engine, caplog: pytest.LogCaptureFixture
+) -> None:
+    client = TestClient(_build_app(engine, lookups=6, n_plus_one_threshold=5))
+
+    with caplog.at_level("WARNING", logger="app.observability.middleware"):
+        client.get("/patients")
+
+    assert "Posible N+1 en GET /patients: sentencia ejecutada 6 veces" in caplog.text
+
+
+def test_statements_below_threshold_are_not_reported(
+    engine: Engine, caplog: pytest.LogCaptureFixture
+) -> None:
+    client = TestClient(_build_app(engine, lookups=4, n_plus_one_threshold=5))
+
+    with caplog.at_level("WARNING", logger="app.observability.middleware"):
+        client.get("/patients")
+
+    assert "N+1" not in caplog.text
+
+
+def test_assert_max_queries_passes_within_budget(engine: Engine) -> None:
+    client = TestClient(_build_app(engine, lookups=2))
+
+    with assert_max_queries(2, engine) as counter:
+        client.get("/patients")
+
+    assert counter.count == 2
+
+
+def test_assert_max_queries_fails_and_lists_statements_over_budget(engine: Engine) -> None:
+    """An N+1 regression must fail the test that guards the endpoint."""
+    client = TestClient(_build_app(engine, lookups=3))
+
+    with pytest.raises(AssertionError, match="como máximo 2 consultas SQL y se ejecutaron 3") as exc_info:
+        with assert_max_queries(2, engine):
+            client.get("/patients")
+
+    assert "3. SELECT ? AS dni" in str(exc_info.value)
+
+
+def test_redact_parameters_keeps_only_types() -> None:
+    assert redact_parameters({"dni": PATIENT_DNI, "limit": 20}) == {"dni": "<str>", "limit": "<int>"}
+    assert redact_parameters((PATIENT_DNI, None)) == ("<str>", "<NoneType>")
+    assert redact_parameters([{"a": 1}, {"a": 2}], executemany=True) == "<2 filas>"
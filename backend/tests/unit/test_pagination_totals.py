@@ -0,0 +1,117 @@
+"""Unit tests for single-round-trip page totals (window / estimate / none)."""
+from typing import Any
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.template import TreatmentTemplate
+from app.services.pagination import fetch_page
+
+pytestmark = pytest.mark.unit
+
+
+class _Result:
+    def __init__(self, rows: list[tuple[Any, ...]] | None = None, value: Any = None) -> None:
+        self._rows = rows or []
+        self._value = value
+
+    def all(self) -> list[tuple[Any, ...]]:
+        return self._rows
+
+    def scalar_one(self) -> Any:
+        return self._value
+
+
+class _RecordingSession:
+    """Session double that records SQL and replays scripted results."""
+
+    def __init__(self, results: list[_Result]) -> None:
+        self._results = results
+        self.statements: list[str] = []
+
+    async def execute(self, statement: Any) -> _Result:
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return self._results.pop(0)
+
+
+def _stmt() -> Any:
+    return select(TreatmentTemplate).order_by(TreatmentTemplate.name, TreatmentTemplate.id)
+
+
+@pytest.mark.asyncio
+async def test_window_total_comes_from_the_page_query() -> None:
+    """The default mode reads the total with count(*) OVER () in the same statement."""
+    session = _RecordingSession([_Result([("t1", 7), ("t2", 7), ("t3", 7)])])
+
+    page = await fetch_page(session, _stmt(), limit=2)  # type: ignore[arg-type]
+
+    assert len(session.statements) == 1
+    assert "count(*) OVER ()" in session.statements[0]
+    assert page.items == ["t1", "t2"]
+    assert page.total == 7
+    assert page.has_more is True
+
+
+@pytest.mark.asyncio
+async def test_window_total_falls_back_to_count_past_the_last_page() -> None:
+    """An offset beyond the end returns no rows, so the window cannot report a total."""
+    session = _RecordingSession([_Result([]), _Result(value=4)])
+
+    page = await fetch_page(session, _stmt(), limit=2, offset=10)  # type: ignore[arg-type]
+
+    assert page.items == []
+    assert page.total == 4
+    assert session.statements[1].startswith("SELECT count(*)")
+
+
+@pytest.mark.asyncio
+async def test_none_mode_reports_only_has_more() -> None:
+    """Without a total the page still knows whether another page exists."""
+    session = _RecordingSession([_Result([("t1",), ("t2",), ("t3",)])])
+
+    page = await fetch_page(session, _stmt(), limit=2, total_mode="none")  # type: ignore[arg-type]
+
+    assert "OVER" not in session.statements[0]
+    assert page.total is None
+    assert page.has_more is True
+
+
+@pytest.mark.asyncio
+async def test_estimate_mode_is_exact_when_the_page_is_not_full() -> None:
+    """A short first page already holds every row: no planner round trip needed."""
+    session = _RecordingSession([_Result([("t1",)])])
+
+    page = await fetch_page(session, _stmt(), limit=2, total_mode="estimate")  # type: ignore[arg-type]
+
+    assert len(session.statements) == 1
+    assert page.total == 1
+    assert page.total_is_estimate is False
+
+
+@pytest.mark.asyncio
+async def test_estimate_mode_uses_planner_rows() -> None:
+    """Broad results take the planner estimate, never below the rows already seen."""
+    plan = [{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 1}}]
+    session = _RecordingSession([_Result([("t1",), ("t2",), ("t3",)]), _Result(value=plan)])
+
+    page = await fetch_page(  # type: ignore[arg-type]
+        session, _stmt(), limit=2, offset=4, total_mode="estimate"
+    )
+
+    assert session.statements[1].startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "ORDER BY" not in session.statements[1]
+    assert page.total == 7
+    assert page.total_is_estimate is True
+
+
+@pytest.mark.asyncio
+async def test_seeking_cursor_pages_skip_the_total() -> None:
+    """After a keyset predicate the query only sees the remaining rows."""
+    session = _RecordingSession([_Result([("t3",)])])
+
+    page = await fetch_page(session, _stmt(), limit=2, seeking=True)  # type: ignore[arg-type]
+
+    assert "OVER" not in session.statements[0]
+    assert page.total is None
+    assert page.has_more is False
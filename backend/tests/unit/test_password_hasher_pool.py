@@ -0,0 +1,91 @@
+"""Unit tests for the bounded, off-event-loop bcrypt pool."""
+import asyncio
+import threading
+from typing import Optional
+
+import bcrypt
+import pytest
+
+from app.services.password_hasher import PasswordHasher, PasswordHasherOverloadedError
+
+pytestmark = pytest.mark.unit
+
+
+class _BlockingVerify:
+    """Verification that holds until released, to fill the pool on demand."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def __call__(self, password: str, password_hash: Optional[str]) -> bool:
+        self.release.wait(timeout=5)
+        return password == "piloto2026"
+
+
+async def test_event_loop_stays_responsive_while_verifying() -> None:
+    """A login burst must not freeze the other coroutines of the worker."""
+    verify = _BlockingVerify()
+    hasher = PasswordHasher(workers=1, max_queue=4, verify=verify)
+    try:
+        logins = [asyncio.create_task(hasher.verify("piloto2026", None)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0)
+            ticks += 1
+
+        assert ticks == 5 and not any(login.done() for login in logins)
+        assert hasher.stats().queue_depth == 2
+        verify.release.set()
+        assert await asyncio.gather(*logins) == [True, True, True]
+    finally:
+        hasher.shutdown()
+
+
+async def test_full_queue_is_rejected_with_retry_after() -> None:
+    verify = _BlockingVerify()
+    hasher = PasswordHasher(workers=1, max_queue=1, verify=verify)
+    try:
+        admitted = [asyncio.create_task(hasher.verify("x", None)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(PasswordHasherOverloadedError) as excinfo:
+            await hasher.verify("x", None)
+
+        assert excinfo.value.retry_after_seconds >= 1
+        verify.release.set()
+        await asyncio.gather(*admitted)
+        stats = hasher.stats()
+        assert stats.rejected == 1
+        assert stats.operations == 2
+        assert stats.in_flight == 0
+        # La segunda verificación esperó a que el único hilo quedara libre
+        assert stats.queue_seconds_max > 0
+    finally:
+        hasher.shutdown()
+
+
+async def test_hash_and_verify_round_trip_with_real_bcrypt() -> None:
+    hasher = PasswordHasher(workers=2, max_queue=0)
+    try:
+        password_hash = await hasher.hash("consulta2026")
+
+        assert bcrypt.checkpw(b"consulta2026", password_hash.encode())
+        assert await hasher.verify("consulta2026", password_hash) is True
+        assert await hasher.verify("otra-clave", password_hash) is False
+        assert hasher.stats().operations == 3
+    finally:
+        hasher.shutdown()
+
+
+async def test_invalid_password_errors_propagate_and_free_the_slot() -> None:
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    try:
+        with pytest.raises(ValueError, match="al menos"):
+            await hasher.hash("corta1")
+
+        await asyncio.sleep(0.01)
+        assert hasher.stats().in_flight == 0
+    finally:
+        hasher.shutdown()
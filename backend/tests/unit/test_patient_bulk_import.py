@@ -0,0 +1,105 @@
+"""Unit tests for the bulk patient import path (validation + batched insert)."""
+from datetime import date, timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.patient_service import PatientService
+
+pytestmark = pytest.mark.unit
+
+
+class _Scalars:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def all(self) -> list[Any]:
+        return self._rows
+
+
+class _Result:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def scalars(self) -> _Scalars:
+        return _Scalars(self._rows)
+
+
+class _RecordingSession:
+    """Session double that records SQL and the executemany parameter list."""
+
+    def __init__(self, returned: list[Any]) -> None:
+        self._returned = returned
+        self.statements: list[str] = []
+        self.params: list[Any] = []
+
+    async def execute(self, statement: Any, params: Any = None) -> _Result:
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        self.params.append(params)
+        return _Result(self._returned)
+
+
+def _row(**overrides: Any) -> dict[str, Any]:
+    row: dict[str, Any] = {
+        "identifier_value": " 12345678z ",
+        "name_given": "Ana",
+        "name_family": "Abad",
+        "birth_date": date(1980, 5, 1),
+    }
+    row.update(overrides)
+    return row
+
+
+def test_prepare_new_patient_formats_dni_and_fills_optional_fields() -> None:
+    values = PatientService.prepare_new_patient(_row())
+
+    assert values["identifier_value"] == "12345678Z"
+    assert values["gender"] is None
+    assert set(values) == {
+        "identifier_value",
+        "name_given",
+        "name_family",
+        "birth_date",
+        "gender",
+        "telecom_phone",
+        "telecom_email",
+    }
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"identifier_value": "12345678A"},
+        {"birth_date": date.today() + timedelta(days=1)},
+    ],
+)
+def test_prepare_new_patient_rejects_invalid_rows_in_memory(overrides: dict[str, Any]) -> None:
+    """Invalid rows fail before any database round trip."""
+    with pytest.raises(ValueError):
+        PatientService.prepare_new_patient(_row(**overrides))
+
+
+async def test_bulk_insert_is_one_statement_with_conflict_skip() -> None:
+    """A batch is a single INSERT that skips DNIs inserted concurrently."""
+    rows = [
+        PatientService.prepare_new_patient(_row()),
+        PatientService.prepare_new_patient(_row(identifier_value="X1234567L")),
+    ]
+    session = _RecordingSession(returned=["12345678Z"])
+
+    created = await PatientService(session).bulk_insert(rows)  # type: ignore[arg-type]
+
+    assert created == {"12345678Z"}
+    assert len(session.statements) == 1
+    sql = session.statements[0]
+    assert sql.startswith("INSERT INTO patients")
+    assert "ON CONFLICT (identifier_value) DO NOTHING RETURNING patients.identifier_value" in sql
+    assert session.params[0] == rows
+
+
+async def test_bulk_insert_skips_empty_batches() -> None:
+    session = _RecordingSession(returned=[])
+
+    assert await PatientService(session).bulk_insert([]) == set()  # type: ignore[arg-type]
+    assert session.statements == []
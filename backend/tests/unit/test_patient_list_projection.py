@@ -0,0 +1,140 @@
+"""Unit tests for the single-query, projection-only patient list."""
+import json
+from collections import namedtuple
+from datetime import date, datetime, timezone
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import app.api.patients as patients_api
+from app.models.patient import age_from_birth_date
+from app.services.pagination import decode_cursor
+from app.services.patient_service import PATIENT_CURSOR_SCOPE, PatientService
+
+pytestmark = pytest.mark.unit
+
+SummaryRow = namedtuple(
+    "SummaryRow",
+    [
+        "id",
+        "identifier_value",
+        "name_given",
+        "name_family",
+        "birth_date",
+        "gender",
+        "telecom_phone",
+        "allergy_count",
+        "encounter_count",
+        "last_encounter_at",
+        "window_total",
+    ],
+)
+
+LAST_VISIT = datetime(2026, 10, 1, 9, 30, tzinfo=timezone.utc)
+
+
+def _row(patient_id: str, family: str, allergies: int = 0, encounters: int = 0, total: int = 2) -> SummaryRow:
+    return SummaryRow(
+        patient_id,
+        "12345678Z",
+        "Sara",
+        family,
+        date(1990, 5, 15),
+        "female",
+        None,
+        allergies,
+        encounters,
+        LAST_VISIT if encounters else None,
+        total,
+    )
+
+
+class _Result:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def all(self) -> list[Any]:
+        return self._rows
+
+
+class _RecordingSession:
+    """Session double that records SQL and replays scripted results."""
+
+    def __init__(self, results: list[_Result]) -> None:
+        self._results = results
+        self.statements: list[str] = []
+
+    async def execute(self, statement: Any) -> _Result:
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return self._results.pop(0)
+
+
+@pytest.mark.asyncio
+async def test_summary_page_is_one_projection_query() -> None:
+    """Counts come from patient_summary in the page query, not from the clinical history."""
+    session = _RecordingSession([_Result([_row("p1", "Abad", allergies=2, encounters=3)])])
+
+    page = await PatientService(session).search_summaries("gar", limit=20)  # type: ignore[arg-type]
+
+    assert len(session.statements) == 1
+    sql = session.statements[0]
+    assert sql.startswith("SELECT patients.id, patients.identifier_value")
+    assert "patients.telecom_email" not in sql and "patients.meta_created_at" not in sql
+    assert "AS allergy_count" in sql
+    # Una sola búsqueda por PK en el resumen para las tres columnas
+    assert "LEFT OUTER JOIN patient_summary ON patient_summary.patient_id = patients.id" in sql
+    assert "(SELECT" not in sql  # sin subconsultas correlacionadas por columna
+    assert "allergy_intolerances" not in sql and "encounters" not in sql
+    assert "count(*) OVER ()" in sql
+    assert page.total == 2
+    assert page.items[0].allergy_count == 2
+
+
+@pytest.mark.asyncio
+async def test_summary_cursor_page_emits_next_cursor_from_row() -> None:
+    rows = [_row("p1", "Abad"), _row("p2", "Bravo"), _row("p3", "Cano")]
+    session = _RecordingSession([_Result(rows)])
+
+    page = await PatientService(session).search_summaries("", limit=2, mode="cursor")  # type: ignore[arg-type]
+
+    assert [row.id for row in page.items] == ["p1", "p2"]
+    assert decode_cursor(page.next_cursor or "", PATIENT_CURSOR_SCOPE, (str, str, str)) == [
+        "Bravo",
+        "Sara",
+        "p2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_list_patients_maps_rows_straight_into_summaries(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = _RecordingSession(
+        [_Result([_row("p1", "Abad", allergies=1, encounters=4), _row("p2", "Bravo")])]
+    )
+    monkeypatch.setattr(patients_api, "PatientService", lambda db: PatientService(session))  # type: ignore[arg-type]
+
+    response = await patients_api.list_patients(
+        search=None,
+        limit=20,
+        offset=0,
+        pagination="offset",
+        cursor=None,
+        total_mode="window",
+        db=object(),  # type: ignore[arg-type]
+        current_user=object(),  # type: ignore[arg-type]
+    )
+
+    body = json.loads(response.body)
+    first, second = body["items"]
+    assert len(session.statements) == 1
+    assert body["total"] == 2
+    assert first["has_allergies"] is True and first["allergy_count"] == 1
+    assert first["encounter_count"] == 4 and first["last_encounter_at"] == "2026-10-01T09:30:00Z"
+    assert first["age"] == age_from_birth_date(date(1990, 5, 15))
+    assert first["birth_date"] == "1990-05-15"
+    assert second["has_allergies"] is False and second["last_encounter_at"] is None
+
+
+def test_age_from_birth_date_counts_completed_years() -> None:
+    assert age_from_birth_date(date(1990, 5, 15), today=date(2026, 5, 14)) == 35
+    assert age_from_birth_date(date(1990, 5, 15), today=date(2026, 5, 15)) == 36
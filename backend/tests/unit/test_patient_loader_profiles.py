@@ -0,0 +1,98 @@
+"""Unit tests for the light/detail patient loader profiles."""
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.patient_service import RECENT_ENCOUNTERS_LIMIT, PatientService
+
+pytestmark = pytest.mark.unit
+
+
+class _Scalars:
+    def __init__(self, values: list[Any]) -> None:
+        self._values = values
+
+    def all(self) -> list[Any]:
+        return self._values
+
+
+class _Result:
+    def __init__(self, values: list[Any]) -> None:
+        self._values = values
+
+    def scalar_one_or_none(self) -> Any:
+        return self._values[0] if self._values else None
+
+    def scalars(self) -> _Scalars:
+        return _Scalars(self._values)
+
+
+class _RecordingSession:
+    """Session double that records SQL and replays scripted results."""
+
+    def __init__(self, results: list[_Result]) -> None:
+        self._results = results
+        self.statements: list[str] = []
+
+    async def execute(self, statement: Any) -> _Result:
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return self._results.pop(0)
+
+
+def _encounters(count: int) -> list[SimpleNamespace]:
+    return [SimpleNamespace(id=f"e{i}") for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_light_profile_never_touches_encounters() -> None:
+    session = _RecordingSession([_Result([SimpleNamespace(id="p1")])])
+
+    await PatientService(session).get_by_id("p1")  # type: ignore[arg-type]
+
+    assert "encounters" not in session.statements[0]
+
+
+@pytest.mark.asyncio
+async def test_exists_reads_only_the_primary_key() -> None:
+    session = _RecordingSession([_Result([]), _Result(["p1"])])
+    service = PatientService(session)  # type: ignore[arg-type]
+
+    assert await service.exists("missing") is False
+    assert await service.exists("p1") is True
+    assert session.statements[0].startswith("SELECT patients.id \nFROM patients")
+
+
+@pytest.mark.asyncio
+async def test_detail_profile_caps_recent_encounters() -> None:
+    patient = SimpleNamespace(id="p1")
+    history = _encounters(RECENT_ENCOUNTERS_LIMIT + 1)
+    session = _RecordingSession([_Result([patient]), _Result(history)])
+
+    detail = await PatientService(session).get_detail("p1")  # type: ignore[arg-type]
+
+    assert detail is not None and detail.patient is patient
+    assert detail.recent_encounters == history[:RECENT_ENCOUNTERS_LIMIT]
+    assert detail.has_more_encounters is True
+    sql = session.statements[1]
+    assert "ORDER BY encounters.period_start DESC, encounters.id DESC" in sql
+    assert "LIMIT" in sql
+
+
+@pytest.mark.asyncio
+async def test_detail_profile_short_history_has_no_more() -> None:
+    session = _RecordingSession([_Result([SimpleNamespace(id="p1")]), _Result(_encounters(2))])
+
+    detail = await PatientService(session).get_detail("p1")  # type: ignore[arg-type]
+
+    assert detail is not None and len(detail.recent_encounters) == 2
+    assert detail.has_more_encounters is False
+
+
+@pytest.mark.asyncio
+async def test_detail_profile_missing_patient_skips_history_query() -> None:
+    session = _RecordingSession([_Result([])])
+
+    assert await PatientService(session).get_detail("nope") is None  # type: ignore[arg-type]
+    assert len(session.statements) == 1
@@ -0,0 +1,66 @@
+"""Unit tests for the trigram/unaccent patient search path."""
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.patient import Patient
+from app.services.patient_service import PatientService
+from app.services.search_text import contains_pattern, normalize_search_text
+
+pytestmark = pytest.mark.unit
+
+
+def _compile(conditions: list[object], order_by: list[object]) -> tuple[str, dict[str, object]]:
+    """Render a patient search statement with the runtime PostgreSQL dialect."""
+    stmt = select(Patient.id).where(*conditions).order_by(*order_by)
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    return str(compiled), dict(compiled.params)
+
+
+def test_normalize_search_text_strips_accents_and_case() -> None:
+    """Python normalization must mirror lower(unaccent(...)) used by the index."""
+    assert normalize_search_text("  Martínez  PEÑA ") == "martinez pena"
+    assert normalize_search_text("Begoña Ibáñez") == "begona ibanez"
+    assert normalize_search_text("   ") == ""
+
+
+def test_contains_pattern_escapes_like_wildcards() -> None:
+    """User input must not inject LIKE wildcards into the pattern."""
+    assert contains_pattern("50%_a") == "%50\\%\\_a%"
+
+
+def test_search_conditions_use_indexed_search_expression() -> None:
+    """Search must go through patient_search_text so the GIN trigram index applies."""
+    conditions = PatientService._build_search_conditions("Martinez")
+    sql, params = _compile(conditions, [])
+
+    assert "patient_search_text(patients.name_given, patients.name_family) LIKE" in sql
+    assert "patients.identifier_value ILIKE" in sql
+    assert "%martinez%" in params.values()
+
+
+def test_search_term_is_accent_insensitive() -> None:
+    """Accented input and plain input must produce the same pattern."""
+    _, accented = _compile(PatientService._build_search_conditions("Martínez"), [])
+    _, plain = _compile(PatientService._build_search_conditions("martinez"), [])
+
+    assert accented == plain
+
+
+def test_empty_search_only_filters_active_patients() -> None:
+    """Without a term the listing keeps the active filter and alphabetical order."""
+    conditions = PatientService._build_search_conditions("  ")
+    order_by = PatientService._build_search_order("  ")
+    sql, _ = _compile(conditions, order_by)
+
+    assert "LIKE" not in sql
+    assert "similarity" not in sql
+    assert sql.endswith("ORDER BY patients.name_family, patients.name_given")
+
+
+def test_search_results_are_ranked_by_similarity() -> None:
+    """With a term, the best trigram match must come first."""
+    sql, _ = _compile([], PatientService._build_search_order("garcia"))
+
+    assert "ORDER BY greatest(word_similarity(" in sql
+    assert "DESC, patients.name_family, patients.name_given" in sql
@@ -0,0 +1,89 @@
+"""Unit tests for the content-addressed prescription PDF cache."""
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from app.services.pdf_cache import PDFCache, prescription_cache_key
+
+pytestmark = pytest.mark.unit
+
+
+def _payload(**overrides: Any) -> dict[str, Any]:
+    payload: dict[str, Any] = {
+        "patient": {"full_name": "Ana Abad", "identifier_value": "12345678Z", "age": 40},
+        "practitioner": {"full_name": "Sara Martin", "identifier_value": "COL-1"},
+        "encounter": {"date": "01/03/2026", "diagnosis": "Faringitis"},
+        "medications": [{"name": "Paracetamol 1 g", "dosage": "1/8h", "duration": "5 días"}],
+        "instructions": "Reposo",
+    }
+    payload.update(overrides)
+    return payload
+
+
+class _CountingRender:
+    def __init__(self, delay: float = 0) -> None:
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self) -> bytes:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return b"%PDF-" + str(self.calls).encode()
+
+
+def test_cache_key_ignores_dict_ordering_but_not_content() -> None:
+    """Same printed data → same key; any printed change → a new key."""
+    reordered = dict(reversed(list(_payload().items())))
+
+    assert prescription_cache_key(_payload()) == prescription_cache_key(reordered)
+    assert prescription_cache_key(_payload()) != prescription_cache_key(
+        _payload(instructions="Reposo relativo")
+    )
+
+
+async def test_unchanged_prescription_is_rendered_once() -> None:
+    cache = PDFCache(memory_max_bytes=1024)
+    render = _CountingRender()
+    key = prescription_cache_key(_payload())
+
+    first = await cache.get_or_render(key, render)
+    second = await cache.get_or_render(key, render)
+
+    assert first == second == b"%PDF-1"
+    assert render.calls == 1
+    assert cache.stats().memory_hits == 1
+
+
+async def test_concurrent_requests_share_a_single_render() -> None:
+    """A double click must not launch two WeasyPrint runs."""
+    cache = PDFCache(memory_max_bytes=1024)
+    render = _CountingRender(delay=0.01)
+
+    results = await asyncio.gather(*(cache.get_or_render("k", render) for _ in range(3)))
+
+    assert results == [b"%PDF-1"] * 3
+    assert render.calls == 1
+
+
+async def test_memory_tier_is_bounded_in_bytes() -> None:
+    cache = PDFCache(memory_max_bytes=10)
+    await cache.put("a", b"123456")
+    await cache.put("b", b"123456")
+
+    assert await cache.get("a") is None
+    assert await cache.get("b") == b"123456"
+    assert cache.stats().memory_bytes == 6
+
+
+async def test_disk_tier_survives_memory_and_evicts_by_size(tmp_path: Path) -> None:
+    """The disk tier is shared across workers/restarts and kept under its size cap."""
+    cache = PDFCache(memory_max_bytes=0, disk_dir=str(tmp_path), disk_max_bytes=10)
+    await cache.put("aa01", b"123456")
+    await cache.put("bb02", b"123456")
+
+    assert await cache.get("aa01") is None
+    assert await cache.get("bb02") == b"123456"
+    assert cache.stats().disk_hits == 1
+    assert [p.name for p in tmp_path.glob("*/*.pdf")] == ["bb02.pdf"]
@@ -0,0 +1,161 @@
+"""Unit tests for the bounded, off-event-loop PDF render pool."""
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+import pytest
+
+from app.services.pdf_renderer import PDFRenderOverloadedError, PDFRenderPool
+
+pytestmark = pytest.mark.unit
+
+
+def _fake_render(payload: dict[str, Any]) -> tuple[bytes, float]:
+    """Picklable stand-in for WeasyPrint (runs in the worker process)."""
+    time.sleep(payload.get("sleep", 0))
+    return b"%PDF-" + payload["name"].encode(), payload.get("sleep", 0)
+
+
+class _BlockingRender:
+    """In-thread render that holds until released, to fill the pool on demand."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def __call__(self, payload: dict[str, Any]) -> tuple[bytes, float]:
+        self.release.wait(timeout=5)
+        return b"%PDF-1.7", 0.2
+
+
+async def test_event_loop_stays_responsive_while_rendering() -> None:
+    """A slow render must not block other coroutines on the same worker."""
+    render = _BlockingRender()
+    pool = PDFRenderPool(workers=0, max_queue=0, render=render)
+    try:
+        pending = asyncio.create_task(pool.render({}))
+        await asyncio.sleep(0.01)
+
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0)
+            ticks += 1
+
+        assert ticks == 5 and not pending.done()
+        render.release.set()
+        assert await pending == b"%PDF-1.7"
+    finally:
+        pool.shutdown()
+
+
+async def test_full_queue_is_rejected_with_retry_after() -> None:
+    """Past workers + max_queue renders the pool fails fast instead of piling up."""
+    render = _BlockingRender()
+    pool = PDFRenderPool(workers=0, max_queue=1, render=render)
+    try:
+        admitted = [asyncio.create_task(pool.render({})) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(PDFRenderOverloadedError) as excinfo:
+            await pool.render({})
+
+        assert excinfo.value.retry_after_seconds >= 1
+        render.release.set()
+        await asyncio.gather(*admitted)
+        stats = pool.stats()
+        assert stats.rejected == 1
+        assert stats.renders == 2
+        assert stats.in_flight == 0
+    finally:
+        pool.shutdown()
+
+
+async def test_process_pool_renders_and_records_timing() -> None:
+    """With workers > 0 renders run in separate processes and are timed."""
+    pool = PDFRenderPool(workers=1, max_queue=2, render=_fake_render)
+    try:
+        pdf = await pool.render({"name": "receta", "sleep": 0.01})
+
+        stats = pool.stats()
+        assert pdf == b"%PDF-receta"
+        assert stats.renders == 1
+        assert stats.render_seconds_max == pytest.approx(0.01)
+        assert stats.queue_seconds_total >= 0
+    finally:
+        pool.shutdown()
+
+
+async def test_render_failures_free_the_slot() -> None:
+    def _broken(payload: dict[str, Any]) -> tuple[bytes, float]:
+        raise RuntimeError("fallo de WeasyPrint")
+
+    pool = PDFRenderPool(workers=0, max_queue=0, render=_broken)
+    try:
+        with pytest.raises(RuntimeError):
+            await pool.render({})
+
+        await asyncio.sleep(0.01)
+        assert pool.stats().failures == 1
+        assert pool.stats().in_flight == 0
+    finally:
+        pool.shutdown()
+
+
+class _BrokenExecutor(Executor):
+    """Executor double standing in for a process pool whose worker died."""
+
+    def __init__(self, fail_on_submit: bool) -> None:
+        self.fail_on_submit = fail_on_submit
+        self.futures: list[Future[Any]] = []
+        self.shut_down = False
+
+    def submit(self, fn: Any, /, *args: Any, **kwargs: Any) -> Future[Any]:
+        if self.fail_on_submit:
+            raise BrokenProcessPool("un worker murió")
+        future: Future[Any] = Future()
+        future.set_running_or_notify_cancel()  # ya en un worker: no se puede cancelar
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self.shut_down = True
+
+
+async def test_pool_broken_at_submit_is_discarded() -> None:
+    pool = PDFRenderPool(workers=0, max_queue=0, render=_fake_render)
+    broken = _BrokenExecutor(fail_on_submit=True)
+    pool._executor = broken
+    try:
+        with pytest.raises(BrokenProcessPool):
+            await pool.render({"name": "a"})
+
+        assert broken.shut_down
+        assert pool.stats().failures == 1
+        assert pool.stats().in_flight == 0
+        # La siguiente petición crea un pool nuevo y renderiza
+        assert await pool.render({"name": "b"}) == b"%PDF-b"
+    finally:
+        pool.shutdown()
+
+
+async def test_pool_broken_after_client_left_is_discarded() -> None:
+    pool = PDFRenderPool(workers=0, max_queue=0, render=_fake_render)
+    broken = _BrokenExecutor(fail_on_submit=False)
+    pool._executor = broken
+    try:
+        request = asyncio.create_task(pool.render({"name": "a"}))
+        await asyncio.sleep(0)
+        request.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await request
+
+        # El worker muere cuando ya nadie espera el resultado
+        broken.futures[0].set_exception(BrokenProcessPool("un worker murió"))
+
+        assert broken.shut_down
+        assert pool.stats().in_flight == 0
+        assert await pool.render({"name": "b"}) == b"%PDF-b"
+    finally:
+        pool.shutdown()
@@ -84,3 +84,13 @@ def test_generate_prescription_preview_includes_patient_gender() -> None:
     )
 
     assert preview["patient"]["gender"] == "Femenino"
+
+
+def test_render_resources_are_built_once_per_service() -> None:
+    """Template, stylesheets and fonts must be reused across documents."""
+    service = PDFService()
+
+    assert service.env.auto_reload is False
+    assert service.env.get_template("prescription.html") is service.template
+    assert len(service.stylesheets) == 2
+    assert "<style>" not in (service.env.loader.get_source(service.env, "prescription.html")[0])  # type: ignore[union-attr]
@@ -0,0 +1,184 @@
+"""Unit tests for the per-worker treatment template cache."""
+import json
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+import app.api.templates as templates_api
+from app.models.template import TreatmentTemplate
+from app.services.template_cache import (
+    get_template_catalog,
+    invalidate_templates,
+    template_cache,
+    template_usage_cache,
+)
+
+pytestmark = pytest.mark.unit
+
+UPDATED = datetime(2026, 10, 1, 9, 30, tzinfo=timezone.utc)
+PRACTITIONER = SimpleNamespace(id="pr1")
+
+
+def _template(
+    template_id: str, name: str, diagnosis: str, *, favorite: bool = False, owner: Optional[str] = "pr1"
+) -> TreatmentTemplate:
+    return TreatmentTemplate(
+        id=template_id,
+        name=name,
+        diagnosis_text=diagnosis,
+        medications=[{"medication": "Paracetamol 1g", "dosage": "1/8h", "duration": "3 días"}],
+        is_favorite=favorite,
+        practitioner_id=owner,
+        meta_updated_at=UPDATED,
+    )
+
+
+class _Rows:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def scalars(self) -> "_Rows":
+        return self
+
+    def all(self) -> list[Any]:
+        return self._rows
+
+
+class _TemplateSession:
+    """Session double: serves global and own templates and counts round trips."""
+
+    def __init__(self, templates: list[TreatmentTemplate]) -> None:
+        self.templates = templates
+        self.queries = 0
+        self.on_query: Any = None
+        self.statements: list[str] = []
+        self.usage_rows: list[Any] = []
+
+    async def execute(self, statement: Any) -> _Rows:
+        self.queries += 1
+        if self.on_query is not None:
+            self.on_query()
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        if "FROM conditions" in self.statements[-1]:
+            return _Rows(self.usage_rows)
+        return _Rows(list(self.templates))
+
+    def add(self, instance: Any) -> None:
+        self.templates.append(instance)
+
+    async def commit(self) -> None:
+        return None
+
+    async def refresh(self, instance: Any) -> None:
+        instance.id = instance.id or "t-new"
+        instance.meta_updated_at = UPDATED
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache() -> Iterator[None]:
+    template_cache.clear()
+    template_usage_cache.clear()
+    yield
+    template_cache.clear()
+    template_usage_cache.clear()
+
+
+def _catalog_templates() -> list[TreatmentTemplate]:
+    return [
+        _template("g1", "Otitis media", "Otitis media aguda", owner=None),
+        _template("g2", "Faringitis", "Faringitis aguda", favorite=True, owner=None),
+        _template("o1", "Ácido fólico", "Embarazo"),
+        _template("o2", "Bronquitis", "Bronquitis aguda", favorite=True),
+    ]
+
+
+async def _list(session: _TemplateSession, **params: Any) -> dict[str, Any]:
+    query: dict[str, Any] = {
+        "search": None, "favorites_only": False, "limit": 50, "offset": 0, "total_mode": "window",
+    }
+    query.update(params)
+    response = await templates_api.list_templates(
+        **query,
+        if_none_match=None,
+        db=session,  # type: ignore[arg-type]
+        current_practitioner=PRACTITIONER,  # type: ignore[arg-type]
+    )
+    body: dict[str, Any] = json.loads(response.body)
+    return body
+
+
+@pytest.mark.asyncio
+async def test_listing_orders_filters_and_paginates_in_memory() -> None:
+    session = _TemplateSession(_catalog_templates())
+
+    everything = await _list(session)
+    assert [item["id"] for item in everything["items"]] == ["o2", "g2", "o1", "g1"]
+    assert [item["is_global"] for item in everything["items"]] == [False, True, False, True]
+    assert session.queries == 1  # globales y propias en la misma consulta
+
+    page = await _list(session, limit=2, offset=1)
+    assert [item["id"] for item in page["items"]] == ["g2", "o1"]
+    assert page["total"] == 4 and page["has_more"] is True
+
+    assert [i["id"] for i in (await _list(session, favorites_only=True))["items"]] == ["o2", "g2"]
+    # Sin acentos ni mayúsculas, por nombre o diagnóstico
+    assert [i["id"] for i in (await _list(session, search="acido"))["items"]] == ["o1"]
+    assert [i["id"] for i in (await _list(session, search="AGUDA"))["items"]] == ["o2", "g2", "g1"]
+    assert (await _list(session, total_mode="none"))["total"] is None
+
+    assert session.queries == 1
+
+
+@pytest.mark.asyncio
+async def test_match_and_get_are_served_from_the_cache() -> None:
+    session = _TemplateSession(
+        _catalog_templates() + [_template("o3", "Amigdalitis", "Faringitis aguda")]
+    )
+    current: Any = PRACTITIONER
+
+    matched = await templates_api.match_template(diagnosis="faringitis", db=session, current_practitioner=current)  # type: ignore[arg-type]
+    fetched = await templates_api.get_template("g1", db=session, current_practitioner=current)  # type: ignore[arg-type]
+
+    # La favorita gana aunque otra vaya antes por nombre
+    assert matched.id == "g2"
+    assert fetched.is_global and fetched.medications[0].medication == "Paracetamol 1g"
+    with pytest.raises(HTTPException) as exc_info:
+        await templates_api.get_template("missing", db=session, current_practitioner=current)  # type: ignore[arg-type]
+    assert exc_info.value.status_code == 404
+    assert session.queries == 2  # plantillas + usos del profesional
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_only_the_practitioner_entry() -> None:
+    session = _TemplateSession(_catalog_templates())
+    await _list(session)
+
+    created = await templates_api.create_template(
+        templates_api.TemplateCreate(name="Cistitis", diagnosis_text="Cistitis aguda", medications=[]),
+        db=session,  # type: ignore[arg-type]
+        current_practitioner=PRACTITIONER,  # type: ignore[arg-type]
+    )
+    listed = await _list(session)
+
+    assert created.id in [item["id"] for item in listed["items"]]
+    assert session.queries == 2
+    assert "IS NULL" not in session.statements[-1]  # solo se recargan las propias
+
+
+@pytest.mark.asyncio
+async def test_load_racing_a_write_is_not_cached() -> None:
+    session = _TemplateSession(_catalog_templates())
+    # Una escritura de plantillas propias entra mientras se leen
+    session.on_query = lambda: invalidate_templates("pr1")
+
+    await get_template_catalog(session, "pr1")  # type: ignore[arg-type]
+    session.on_query = None
+    await get_template_catalog(session, "pr1")  # type: ignore[arg-type]
+
+    assert session.queries == 2
+    assert "IS NULL" not in session.statements[-1]  # las globales sí quedaron en caché
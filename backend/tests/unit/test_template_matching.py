@@ -0,0 +1,157 @@
+"""Unit tests for the ranked in-memory template matching engine."""
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Optional
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import app.api.templates as templates_api
+from app.models.template import TreatmentTemplate
+from app.services.template_cache import TemplateCatalog, TemplateSet, template_cache, template_usage_cache
+from app.services.template_matching import MIN_SIMILARITY, TemplateUsage, trigrams
+
+pytestmark = pytest.mark.unit
+
+UPDATED = datetime(2026, 10, 1, 9, 30, tzinfo=timezone.utc)
+
+
+def _template(
+    template_id: str,
+    name: str,
+    diagnosis: str,
+    code: Optional[str] = None,
+    *,
+    favorite: bool = False,
+    owner: Optional[str] = "pr1",
+) -> TreatmentTemplate:
+    return TreatmentTemplate(
+        id=template_id,
+        name=name,
+        diagnosis_text=diagnosis,
+        diagnosis_code=code,
+        medications=[],
+        is_favorite=favorite,
+        practitioner_id=owner,
+        meta_updated_at=UPDATED,
+    )
+
+
+def _catalog(*templates: TreatmentTemplate) -> TemplateCatalog:
+    return TemplateCatalog(
+        global_set=TemplateSet.from_models([t for t in templates if t.practitioner_id is None]),
+        own_set=TemplateSet.from_models([t for t in templates if t.practitioner_id is not None]),
+    )
+
+
+CATALOG = _catalog(
+    _template("faringitis", "Faringitis", "Faringoamigdalitis aguda", "J03.9", owner=None),
+    _template("otitis", "Otitis", "Otitis media aguda", "H66.9", owner=None),
+    _template("cistitis", "Cistitis", "Infección urinaria baja", "N30.0"),
+    _template("lumbalgia", "Lumbalgia", "Lumbalgia mecánica", "M54.5"),
+)
+
+
+def _best(query: str, usage: TemplateUsage = TemplateUsage({}, {})) -> Optional[str]:
+    ranked = CATALOG.rank(query, usage)
+    return ranked[0][0].id if ranked else None
+
+
+def test_trigrams_follow_pg_trgm_padding() -> None:
+    assert trigrams("Gripe") == {"  g", " gr", "gri", "rip", "ipe", "pe "}
+    assert trigrams("Ácido") == trigrams("acido")
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("faringoamigdalitis", "faringitis"),
+        ("FARINGOAMIGDALÍTIS", "faringitis"),  # acentos y mayúsculas
+        ("aguda otitis", "otitis"),  # orden de palabras
+        ("lumbalgia mecanica", "lumbalgia"),
+        ("lumbalga", "lumbalgia"),  # errata
+        ("infeccion urinaria", "cistitis"),
+        ("J03.9", "faringitis"),  # código exacto
+        ("h66", "otitis"),  # prefijo de código
+    ],
+)
+def test_close_matches_are_found(query: str, expected: str) -> None:
+    assert _best(query) == expected
+
+
+def test_unrelated_terms_do_not_match() -> None:
+    assert CATALOG.rank("fractura de tibia") == []
+    assert all(score >= MIN_SIMILARITY for _, score in CATALOG.rank("aguda", limit=5))
+
+
+def test_favourites_and_usage_order_similar_candidates() -> None:
+    catalog = _catalog(
+        _template("viral", "Faringitis viral", "Faringitis aguda", "J02.9"),
+        _template("estrepto", "Faringitis estreptocócica", "Faringitis aguda", "J02.0"),
+    )
+
+    plain = [t.id for t, _ in catalog.rank("faringitis aguda", limit=2)]
+    assert plain == ["estrepto", "viral"]  # empate: orden del listado
+
+    usage = TemplateUsage.from_rows([("J02.9", "Faringitis aguda", 12), ("J02.0", "Faringitis aguda", 1)])
+    assert [t.id for t, _ in catalog.rank("faringitis aguda", usage, limit=2)] == ["viral", "estrepto"]
+
+
+def test_bonuses_do_not_outrank_a_much_closer_match() -> None:
+    catalog = _catalog(
+        _template("otitis", "Otitis", "Otitis media aguda", "H66.9"),
+        _template("rinitis", "Rinitis", "Rinitis alérgica", "J30.4", favorite=True),
+    )
+    usage = TemplateUsage.from_rows([("J30.4", "Rinitis alérgica", 50), ("H66.9", "Otitis media aguda", 1)])
+
+    assert catalog.rank("otitis media", usage)[0][0].id == "otitis"
+
+
+class _Rows:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def scalars(self) -> "_Rows":
+        return self
+
+    def all(self) -> list[Any]:
+        return self._rows
+
+
+class _MatchSession:
+    def __init__(self, templates: list[TreatmentTemplate], usage_rows: list[Any]) -> None:
+        self.templates = templates
+        self.usage_rows = usage_rows
+        self.statements: list[str] = []
+
+    async def execute(self, statement: Any) -> _Rows:
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        self.statements.append(sql)
+        return _Rows(self.usage_rows if "FROM conditions" in sql else self.templates)
+
+
+@pytest.mark.asyncio
+async def test_matches_endpoint_returns_top_k_with_scores_from_cache() -> None:
+    template_cache.clear()
+    template_usage_cache.clear()
+    session = _MatchSession(
+        [
+            _template("viral", "Faringitis viral", "Faringitis aguda", "J02.9"),
+            _template("estrepto", "Faringitis estreptocócica", "Faringitis aguda", "J02.0"),
+            _template("otitis", "Otitis", "Otitis media aguda", "H66.9", owner=None),
+        ],
+        [("J02.9", "Faringitis aguda", 7)],
+    )
+    practitioner: Any = SimpleNamespace(id="pr1")
+
+    first = await templates_api.match_templates(diagnosis="faringitis", limit=5, db=session, current_practitioner=practitioner)  # type: ignore[arg-type]
+    again = await templates_api.match_templates(diagnosis="faringitis", limit=1, db=session, current_practitioner=practitioner)  # type: ignore[arg-type]
+
+    assert [item.id for item in first.items] == ["viral", "estrepto"]
+    assert first.items[0].score > first.items[1].score
+    assert [item.id for item in again.items] == ["viral"]
+    assert len(session.statements) == 2  # plantillas y usos, solo en frío
+    usage_sql = session.statements[1]
+    assert "encounters.participant_id" in usage_sql and "GROUP BY" in usage_sql
+    template_cache.clear()
+    template_usage_cache.clear()
@@ -0,0 +1,39 @@
+-- Migration: indexed, accent-insensitive patient search (pg_trgm + unaccent)
+-- Purpose: la búsqueda de pacientes usaba ILIKE '%término%' sobre nombre,
+--          apellidos y DNI. Ningún índice B-tree sirve un comodín inicial, así
+--          que cada pulsación recorría la tabla entera. Con índices GIN de
+--          trigramas el coste se mantiene plano aunque crezca `patients`, y
+--          "Martinez" encuentra "Martínez".
+-- Date: 2026-10-17
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() es STABLE (depende del search_path) y no puede usarse en un
+-- índice. Fijando el diccionario de forma explícita el resultado es
+-- determinista y la función puede declararse IMMUTABLE.
+CREATE OR REPLACE FUNCTION public.immutable_unaccent(value TEXT)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$
+  SELECT public.unaccent('public.unaccent'::regdictionary, value)
+$$;
+
+-- Texto normalizado (sin acentos, minúsculas) sobre el que busca el backend.
+-- El backend debe invocar exactamente esta función para que el planner use el
+-- índice de expresión (ver PatientService._build_search_conditions).
+CREATE OR REPLACE FUNCTION public.patient_search_text(name_given TEXT, name_family TEXT)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+  SELECT lower(public.immutable_unaccent(coalesce(name_given, '') || ' ' || coalesce(name_family, '')))
+$$;
+
+CREATE INDEX IF NOT EXISTS idx_patients_search_text_trgm
+  ON patients USING gin (public.patient_search_text(name_given, name_family) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_patients_identifier_trgm
+  ON patients USING gin (identifier_value gin_trgm_ops);
+
+COMMENT ON FUNCTION public.patient_search_text(TEXT, TEXT) IS
+'Nombre completo sin acentos y en minúsculas para búsqueda por trigramas';
@@ -0,0 +1,15 @@
+-- Migration: índices para paginación por keyset (cursor)
+-- Purpose: los listados de pacientes y de consultas admiten un modo cursor que
+--          continúa tras la última clave vista en lugar de usar OFFSET. Cada
+--          índice cubre exactamente la clave de ordenación, con `id` como
+--          desempate, para que cualquier página cueste lo mismo que la primera.
+-- Date: 2026-10-17
+
+-- Pacientes: (name_family, name_given, id)
+CREATE INDEX IF NOT EXISTS idx_patients_name_keyset
+  ON patients (name_family, name_given, id);
+
+-- Historial de un paciente: (period_start, id) descendente dentro de subject_id.
+-- Sirve también al modo offset y al recuento por paciente.
+CREATE INDEX IF NOT EXISTS idx_encounters_subject_period_keyset
+  ON encounters (subject_id, period_start DESC, id DESC);
@@ -0,0 +1,243 @@
+-- Migration: resumen de paciente mantenido por triggers
+-- Purpose: el listado de pacientes mostraba nº de consultas, última consulta y
+--          nº de alergias activas calculándolos sobre el historial en cada
+--          carga. `patient_summary` guarda esos tres valores por paciente y
+--          los triggers los mantienen al día, así que el listado solo lee una
+--          fila por paciente de la página, tenga el historial que tenga.
+-- Date: 2026-10-17
+
+CREATE TABLE IF NOT EXISTS patient_summary (
+    patient_id UUID PRIMARY KEY REFERENCES patients(id) ON DELETE CASCADE,
+    active_allergy_count INTEGER NOT NULL DEFAULT 0,
+    encounter_count INTEGER NOT NULL DEFAULT 0,
+    last_encounter_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+COMMENT ON TABLE patient_summary IS
+'Agregados por paciente para el listado; los mantienen triggers (no escribir desde la aplicación)';
+
+-- Recalcula desde cero el resumen de los pacientes indicados.
+--
+-- Se recalcula en lugar de sumar/restar: un DELETE o un cambio de fecha puede
+-- alterar `last_encounter_at`, y el recálculo por paciente son tres lecturas
+-- por índice. Antes se bloquean las filas del resumen (en orden, sin
+-- interbloqueos): en READ COMMITTED dos transacciones que añaden consultas al
+-- mismo paciente contarían cada una solo la suya; con el bloqueo la segunda
+-- espera y su recálculo ya ve la primera confirmada.
+CREATE OR REPLACE FUNCTION public.refresh_patient_summaries(patient_ids UUID[])
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  PERFORM 1
+    FROM patient_summary
+   WHERE patient_id = ANY(patient_ids)
+   ORDER BY patient_id
+     FOR UPDATE;
+
+  INSERT INTO patient_summary AS s (patient_id, active_allergy_count, encounter_count, last_encounter_at, updated_at)
+  SELECT p.id,
+         (SELECT count(*) FROM allergy_intolerances a
+           WHERE a.patient_id = p.id AND a.clinical_status = 'active'),
+         (SELECT count(*) FROM encounters e WHERE e.subject_id = p.id),
+         (SELECT max(e.period_start) FROM encounters e WHERE e.subject_id = p.id),
+         NOW()
+    FROM patients p
+   WHERE p.id = ANY(patient_ids)
+  ON CONFLICT (patient_id) DO UPDATE
+     SET active_allergy_count = EXCLUDED.active_allergy_count,
+         encounter_count = EXCLUDED.encounter_count,
+         last_encounter_at = EXCLUDED.last_encounter_at,
+         updated_at = EXCLUDED.updated_at;
+END;
+$$;
+
+-- Triggers por sentencia con tablas de transición: un INSERT masivo o un COPY
+-- recalcula cada paciente afectado una sola vez, no una vez por fila.
+-- PL/pgSQL solo resuelve `new_rows`/`old_rows` al ejecutar cada rama, así que
+-- una misma función sirve a los tres eventos.
+CREATE OR REPLACE FUNCTION public.patient_summary_encounters_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM refresh_patient_summaries(ARRAY(SELECT DISTINCT subject_id FROM new_rows));
+  ELSIF TG_OP = 'UPDATE' THEN
+    -- Solo si cambia el paciente o la fecha (no al editar notas SOAP)
+    PERFORM refresh_patient_summaries(ARRAY(
+      SELECT unnest(ARRAY[n.subject_id, o.subject_id])
+        FROM new_rows n JOIN old_rows o ON o.id = n.id
+       WHERE n.subject_id IS DISTINCT FROM o.subject_id
+          OR n.period_start IS DISTINCT FROM o.period_start
+    ));
+  ELSE
+    PERFORM refresh_patient_summaries(ARRAY(SELECT DISTINCT subject_id FROM old_rows));
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.patient_summary_allergies_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    PERFORM refresh_patient_summaries(ARRAY(SELECT DISTINCT patient_id FROM new_rows));
+  ELSIF TG_OP = 'UPDATE' THEN
+    -- Solo si cambia el paciente o el estado clínico
+    PERFORM refresh_patient_summaries(ARRAY(
+      SELECT unnest(ARRAY[n.patient_id, o.patient_id])
+        FROM new_rows n JOIN old_rows o ON o.id = n.id
+       WHERE n.patient_id IS DISTINCT FROM o.patient_id
+          OR n.clinical_status IS DISTINCT FROM o.clinical_status
+    ));
+  ELSE
+    PERFORM refresh_patient_summaries(ARRAY(SELECT DISTINCT patient_id FROM old_rows));
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+-- Paciente nuevo: fila a cero para que el bloqueo de `refresh_patient_summaries`
+-- tenga siempre algo que bloquear.
+CREATE OR REPLACE FUNCTION public.patient_summary_patients_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO patient_summary (patient_id)
+  SELECT id FROM new_rows
+  ON CONFLICT (patient_id) DO NOTHING;
+  RETURN NULL;
+END;
+$$;
+
+-- Las tablas de transición exigen un trigger por evento y no admiten lista de
+-- columnas (`UPDATE OF ...`): el filtrado de UPDATE se hace en la función.
+DROP TRIGGER IF EXISTS trg_patient_summary_encounters_insert ON encounters;
+CREATE TRIGGER trg_patient_summary_encounters_insert
+  AFTER INSERT ON encounters
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION patient_summary_encounters_trigger();
+
+DROP TRIGGER IF EXISTS trg_patient_summary_encounters_update ON encounters;
+CREATE TRIGGER trg_patient_summary_encounters_update
+  AFTER UPDATE ON encounters
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION patient_summary_encounters_trigger();
+
+DROP TRIGGER IF EXISTS trg_patient_summary_encounters_delete ON encounters;
+CREATE TRIGGER trg_patient_summary_encounters_delete
+  AFTER DELETE ON encounters
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION patient_summary_encounters_trigger();
+
+DROP TRIGGER IF EXISTS trg_patient_summary_allergies_insert ON allergy_intolerances;
+CREATE TRIGGER trg_patient_summary_allergies_insert
+  AFTER INSERT ON allergy_intolerances
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION patient_summary_allergies_trigger();
+
+DROP TRIGGER IF EXISTS trg_patient_summary_allergies_update ON allergy_intolerances;
+CREATE TRIGGER trg_patient_summary_allergies_update
+  AFTER UPDATE ON allergy_intolerances
+  REFERENCING NEW TABLE AS new_rows OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION patient_summary_allergies_trigger();
+
+DROP TRIGGER IF EXISTS trg_patient_summary_allergies_delete ON allergy_intolerances;
+CREATE TRIGGER trg_patient_summary_allergies_delete
+  AFTER DELETE ON allergy_intolerances
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION patient_summary_allergies_trigger();
+
+DROP TRIGGER IF EXISTS trg_patient_summary_patients_insert ON patients;
+CREATE TRIGGER trg_patient_summary_patients_insert
+  AFTER INSERT ON patients
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION patient_summary_patients_trigger();
+
+-- Reconstrucción completa (CLI `manage_patient_summary.py rebuild`): agrega
+-- todo el historial de una vez. Bloquea las escrituras de los triggers mientras
+-- dura para no mezclar recuentos de antes y después.
+CREATE OR REPLACE FUNCTION public.rebuild_patient_summary()
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  rebuilt INTEGER;
+BEGIN
+  LOCK TABLE patient_summary IN SHARE ROW EXCLUSIVE MODE;
+
+  INSERT INTO patient_summary AS s (patient_id, active_allergy_count, encounter_count, last_encounter_at, updated_at)
+  SELECT p.id,
+         coalesce(a.active_allergy_count, 0),
+         coalesce(e.encounter_count, 0),
+         e.last_encounter_at,
+         NOW()
+    FROM patients p
+    LEFT JOIN (
+      SELECT patient_id, count(*) AS active_allergy_count
+        FROM allergy_intolerances
+       WHERE clinical_status = 'active'
+       GROUP BY patient_id
+    ) a ON a.patient_id = p.id
+    LEFT JOIN (
+      SELECT subject_id, count(*) AS encounter_count, max(period_start) AS last_encounter_at
+        FROM encounters
+       GROUP BY subject_id
+    ) e ON e.subject_id = p.id
+  ON CONFLICT (patient_id) DO UPDATE
+     SET active_allergy_count = EXCLUDED.active_allergy_count,
+         encounter_count = EXCLUDED.encounter_count,
+         last_encounter_at = EXCLUDED.last_encounter_at,
+         updated_at = EXCLUDED.updated_at;
+  GET DIAGNOSTICS rebuilt = ROW_COUNT;
+  RETURN rebuilt;
+END;
+$$;
+
+-- Diferencias entre el resumen guardado y el historial real
+-- (CLI `manage_patient_summary.py verify`). Vacío = resumen correcto.
+CREATE OR REPLACE FUNCTION public.patient_summary_mismatches()
+RETURNS TABLE (
+  patient_id UUID,
+  stored_active_allergy_count INTEGER,
+  actual_active_allergy_count INTEGER,
+  stored_encounter_count INTEGER,
+  actual_encounter_count INTEGER,
+  stored_last_encounter_at TIMESTAMPTZ,
+  actual_last_encounter_at TIMESTAMPTZ
+)
+LANGUAGE sql STABLE
+AS $$
+  SELECT p.id,
+         s.active_allergy_count,
+         coalesce(a.active_allergy_count, 0)::INTEGER,
+         s.encounter_count,
+         coalesce(e.encounter_count, 0)::INTEGER,
+         s.last_encounter_at,
+         e.last_encounter_at
+    FROM patients p
+    LEFT JOIN patient_summary s ON s.patient_id = p.id
+    LEFT JOIN (
+      SELECT ai.patient_id, count(*) AS active_allergy_count
+        FROM allergy_intolerances ai
+       WHERE ai.clinical_status = 'active'
+       GROUP BY ai.patient_id
+    ) a ON a.patient_id = p.id
+    LEFT JOIN (
+      SELECT en.subject_id, count(*) AS encounter_count, max(en.period_start) AS last_encounter_at
+        FROM encounters en
+       GROUP BY en.subject_id
+    ) e ON e.subject_id = p.id
+   WHERE s.patient_id IS NULL
+      OR s.active_allergy_count <> coalesce(a.active_allergy_count, 0)
+      OR s.encounter_count <> coalesce(e.encounter_count, 0)
+      OR s.last_encounter_at IS DISTINCT FROM e.last_encounter_at
+$$;
+
+-- Carga inicial con el historial existente
+SELECT rebuild_patient_summary();
@@ -0,0 +1,44 @@
+-- Migration: orden de diagnósticos y prescripciones dentro de la consulta
+-- Purpose: la actualización de una consulta sincroniza conditions y
+--          medication_requests por diff en lugar de borrarlas y recrearlas.
+--          Sin columna de orden, las filas vuelven en orden físico: un cambio
+--          de orden se perdía y una fila editada pasaba detrás de las demás.
+--          El primer diagnóstico es el principal (ficha, receta impresa).
+-- Date: 2026-10-17
+
+-- Se añade y rellena solo la primera vez: reaplicar no debe pisar el orden
+-- guardado por los clientes. Las filas existentes se numeran por fecha de alta.
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1 FROM information_schema.columns
+     WHERE table_schema = 'public' AND table_name = 'conditions' AND column_name = 'sort_order'
+  ) THEN
+    ALTER TABLE conditions ADD COLUMN sort_order INTEGER NOT NULL DEFAULT 0;
+    UPDATE conditions c
+       SET sort_order = o.sort_order
+      FROM (
+        SELECT id, row_number() OVER (PARTITION BY encounter_id ORDER BY recorded_date, id) - 1 AS sort_order
+          FROM conditions
+      ) o
+     WHERE o.id = c.id AND o.sort_order > 0;
+  END IF;
+
+  IF NOT EXISTS (
+    SELECT 1 FROM information_schema.columns
+     WHERE table_schema = 'public' AND table_name = 'medication_requests' AND column_name = 'sort_order'
+  ) THEN
+    ALTER TABLE medication_requests ADD COLUMN sort_order INTEGER NOT NULL DEFAULT 0;
+    UPDATE medication_requests m
+       SET sort_order = o.sort_order
+      FROM (
+        SELECT id, row_number() OVER (PARTITION BY encounter_id ORDER BY authored_on, id) - 1 AS sort_order
+          FROM medication_requests
+      ) o
+     WHERE o.id = m.id AND o.sort_order > 0;
+  END IF;
+END;
+$$;
+
+COMMENT ON COLUMN conditions.sort_order IS 'Orden en la consulta (0 = diagnóstico principal)';
+COMMENT ON COLUMN medication_requests.sort_order IS 'Orden en la receta';
@@ -0,0 +1,24 @@
+-- Migration: patient_search_text colapsa espacios como el backend
+-- Purpose: `normalize_search_text` (Python) colapsa los espacios repetidos y
+--          recorta los extremos del término, pero `patient_search_text` no lo
+--          hacía. Con un nombre guardado con doble espacio o espacio final,
+--          "ana maria" no era subcadena de "ana  maria" y la búsqueda no
+--          encontraba al paciente. Ahora la función normaliza igual y el índice
+--          se reconstruye con el nuevo resultado.
+-- Date: 2026-10-17
+
+CREATE OR REPLACE FUNCTION public.patient_search_text(name_given TEXT, name_family TEXT)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE PARALLEL SAFE
+AS $$
+  SELECT btrim(regexp_replace(
+    lower(public.immutable_unaccent(coalesce(name_given, '') || ' ' || coalesce(name_family, ''))),
+    '\s+', ' ', 'g'
+  ))
+$$;
+
+-- Las entradas del índice de expresión se calcularon con el cuerpo anterior
+REINDEX INDEX idx_patients_search_text_trgm;
+
+COMMENT ON FUNCTION public.patient_search_text(TEXT, TEXT) IS
+'Nombre completo sin acentos, en minúsculas y con espacios colapsados para búsqueda por trigramas';
@@ -18,7 +18,9 @@ export interface paths {
          * @description Login endpoint.
          *
          *     Autentica al practitioner por email y contraseña verificando el `password_hash`
-         *     almacenado con bcrypt y devuelve un token JWT de acceso.
+         *     almacenado con bcrypt y devuelve un token JWT de acceso. bcrypt se ejecuta
+         *     en un pool de hilos acotado: una ráfaga de logins no bloquea el resto de la
+         *     API y, si la cola se llena, se responde 503 con Retry-After.
          */
         post: operations["login_api_v1_auth_login_post"];
         delete?: never;
@@ -109,7 +111,9 @@ export interface paths {
          * @description List patients with optional search.
          *
          *     - Search by partial name or DNI (minimum 2 characters)
-         *     - Paginated results
+         *     - Paginated results: offset (default) or keyset cursor (`pagination=cursor`)
+         *     - Total computed in the page query (`total_mode`), no separate COUNT
+         *     - Allergy and encounter counts projected in that same query
          */
         get: operations["list_patients_api_v1_patients__get"];
         put?: never;
@@ -140,7 +144,10 @@ export interface paths {
          * Get Patient
          * @description Get patient by ID.
          *
-         *     Returns full patient data including allergies and recent encounters.
+         *     Returns full patient data including allergies and the latest encounters
+         *     (bounded; older ones via GET /encounters/patient/{patient_id}).
+         *     Weak ETag: `If-None-Match` with the current one returns 304 after a
+         *     version-only query.
          */
         get: operations["get_patient_api_v1_patients__patient_id__get"];
         put?: never;
@@ -210,7 +217,9 @@ export interface paths {
          * List Patient Encounters
          * @description List all encounters for a patient.
          *
-         *     Returns encounters with conditions and medications.
+         *     Returns encounters with conditions and medications, newest first.
+         *     Paginated by offset (default) or keyset cursor over (period_start, id).
+         *     Total computed in the page query (`total_mode`), no separate COUNT.
          */
         get: operations["list_patient_encounters_api_v1_encounters_patient__patient_id__get"];
         put?: never;
@@ -219,6 +228,11 @@ export interface paths {
          * @description Create new encounter for patient (FHIR Create interaction).
          *
          *     Creates Encounter + Condition(s) + MedicationRequest(s).
+         *
+         *     Los IDs se generan en cliente, las filas hijas se insertan en un INSERT
+         *     masivo por tabla y la respuesta se construye con los datos ya conocidos
+         *     (sin releer). Un paciente inexistente se detecta por la FK (404), sin
+         *     consulta previa.
          */
         post: operations["create_encounter_api_v1_encounters_patient__patient_id__post"];
         delete?: never;
@@ -237,14 +251,17 @@ export interface paths {
         /**
          * Get Encounter
          * @description Get encounter by ID with full details.
+         *
+         *     Weak ETag: `If-None-Match` with the current one returns 304 after a
+         *     version-only query.
          */
         get: operations["get_encounter_api_v1_encounters__encounter_id__get"];
         /**
          * Update Encounter
          * @description Update an existing encounter (FHIR R5 Update interaction).
          *
-         *     Reemplaza campos SOAP y sub-recursos (Conditions, Medications)
-         *     mediante estrategia delete + recreate.
+         *     Reemplaza campos SOAP y sincroniza sub-recursos (Conditions, Medications)
+         *     por diff: las filas sin cambios conservan su ID y no se reescriben.
          */
         put: operations["update_encounter_api_v1_encounters__encounter_id__put"];
         post?: never;
@@ -264,6 +281,11 @@ export interface paths {
         /**
          * List Templates
          * @description List treatment templates.
+         *
+         *     Served from the per-worker template cache: filtering, favourites ordering
+         *     and pagination run in memory, so the total is always exact (`null` only
+         *     with `total_mode=none`). Weak ETag from the cached global and own template
+         *     versions: `If-None-Match` with the current one returns 304.
          */
         get: operations["list_templates_api_v1_templates__get"];
         put?: never;
@@ -289,7 +311,8 @@ export interface paths {
          * Match Template
          * @description Find best matching template for a diagnosis.
          *
-         *     Used for auto-loading treatment when selecting diagnosis.
+         *     Used for auto-loading treatment when selecting diagnosis. Best hit of
+         *     `GET /templates/matches`.
          */
         get: operations["match_template_api_v1_templates_match_get"];
         put?: never;
@@ -300,6 +323,31 @@ export interface paths {
         patch?: never;
         trace?: never;
     };
+    "/api/v1/templates/matches": {
+        parameters: {
+            query?: never;
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        /**
+         * Match Templates
+         * @description Top-k templates for a diagnosis, best first.
+         *
+         *     Trigram similarity (tolerates accents, word order and typos) over name,
+         *     diagnosis and ICD-10 code, plus a bonus for favourites and for diagnoses
+         *     the practitioner recorded often in the last year. Served from the template
+         *     cache; an empty list means nothing is similar enough.
+         */
+        get: operations["match_templates_api_v1_templates_matches_get"];
+        put?: never;
+        post?: never;
+        delete?: never;
+        options?: never;
+        head?: never;
+        patch?: never;
+        trace?: never;
+    };
     "/api/v1/templates/{template_id}": {
         parameters: {
             query?: never;
@@ -361,7 +409,10 @@ export interface paths {
          * Download Prescription Pdf
          * @description Generate prescription PDF.
          *
-         *     Uses WeasyPrint to generate PDF from HTML template.
+         *     Uses WeasyPrint to generate PDF from HTML template, rendered in a bounded
+         *     worker pool so the event loop keeps serving other requests. Responds 503
+         *     with Retry-After when the render queue is full. Identical prescriptions
+         *     are served from a content-addressed cache.
          */
         get: operations["download_prescription_pdf_api_v1_prescriptions__encounter_id__pdf_get"];
         put?: never;
@@ -585,9 +636,26 @@ export interface components {
             items: components["schemas"]["EncounterResponse"][];
             /**
              * Total
-             * @description Total de resultados disponibles
+             * @description Total de resultados; null con total_mode=none o en páginas de cursor tras la primera
+             */
+            total: number | null;
+            /**
+             * Next Cursor
+             * @description Cursor opaco de la página siguiente (solo en pagination=cursor)
              */
-            total: number;
+            next_cursor?: string | null;
+            /**
+             * Has More
+             * @description Hay más resultados tras esta página
+             * @default false
+             */
+            has_more: boolean;
+            /**
+             * Total Is Estimate
+             * @description total es una estimación del planificador (total_mode=estimate)
+             * @default false
+             */
+            total_is_estimate: boolean;
         };
         /**
          * EncounterResponse
@@ -823,6 +891,62 @@ export interface components {
             /** Telecom Email */
             telecom_email?: string | null;
         };
+        /**
+         * PatientDetailResponse
+         * @description Patient record with its latest encounters (bounded).
+         */
+        PatientDetailResponse: {
+            /**
+             * Identifier Value
+             * @description DNI/NIE
+             */
+            identifier_value: string;
+            /** Name Given */
+            name_given: string;
+            /** Name Family */
+            name_family: string;
+            /**
+             * Birth Date
+             * Format: date
+             */
+            birth_date: string;
+            /** Gender */
+            gender?: string | null;
+            /** Telecom Phone */
+            telecom_phone?: string | null;
+            /** Telecom Email */
+            telecom_email?: string | null;
+            /** Id */
+            id: string;
+            /** Age */
+            age: number;
+            /**
+             * Allergies
+             * @default []
+             */
+            allergies: components["schemas"]["AllergyResponse"][];
+            /**
+             * Meta Created At
+             * Format: date-time
+             */
+            meta_created_at: string;
+            /**
+             * Meta Updated At
+             * Format: date-time
+             */
+            meta_updated_at: string;
+            /**
+             * Recent Encounters
+             * @default []
+             */
+            recent_encounters: components["schemas"]["RecentEncounter"][];
+            /**
+             * Has More Encounters
+             * @description Hay consultas más antiguas: paginar con GET /encounters/patient/{id}
+             * @default false
+             */
+            has_more_encounters: boolean;
+        };
         /**
          * PatientListResponse
          * @description Paginated list of patients.
@@ -830,16 +954,36 @@ export interface components {
         PatientListResponse: {
             /** Items */
             items: components["schemas"]["PatientSummary"][];
-            /** Total */
-            total: number;
+            /**
+             * Total
+             * @description Total de resultados; null con total_mode=none o en páginas de cursor tras la primera
+             */
+            total: number | null;
             /** Limit */
             limit: number;
             /** Offset */
             offset: number;
+            /**
+             * Next Cursor
+             * @description Cursor opaco de la página siguiente (solo en pagination=cursor)
+             */
+            next_cursor?: string | null;
+            /**
+             * Has More
+             * @description Hay más resultados tras esta página
+             * @default false
+             */
+            has_more: boolean;
+            /**
+             * Total Is Estimate
+             * @description total es una estimación del planificador (total_mode=estimate)
+             * @default false
+             */
+            total_is_estimate: boolean;
         };
         /**
          * PatientResponse
-         * @description Full patient response with allergies and encounters.
+         * @description Full patient response with allergies.
          */
         PatientResponse: {
             /**
@@ -1006,6 +1150,23 @@ export interface components {
             /** Telecom Email */
             telecom_email: string | null;
         };
+        /**
+         * RecentEncounter
+         * @description Encounter line shown in the patient record (no SOAP notes).
+         */
+        RecentEncounter: {
+            /** Id */
+            id: string;
+            /** Status */
+            status: string;
+            /**
+             * Period Start
+             * Format: date-time
+             */
+            period_start: string;
+            /** Reason Text */
+            reason_text: string | null;
+        };
         /** TemplateCreate */
         TemplateCreate: {
             /** Name */
@@ -1029,7 +1190,46 @@ export interface components {
             /** Items */
             items: components["schemas"]["TemplateResponse"][];
             /** Total */
-            total: number;
+            total: number | null;
+            /**
+             * Has More
+             * @default false
+             */
+            has_more: boolean;
+            /**
+             * Total Is Estimate
+             * @default false
+             */
+            total_is_estimate: boolean;
+        };
+        /** TemplateMatch */
+        TemplateMatch: {
+            /** Id */
+            id: string;
+            /** Name */
+            name: string;
+            /** Diagnosis Text */
+            diagnosis_text: string;
+            /** Diagnosis Code */
+            diagnosis_code?: string | null;
+            /** Medications */
+            medications: components["schemas"]["MedicationItem"][];
+            /** Instructions */
+            instructions?: string | null;
+            /** Is Favorite */
+            is_favorite: boolean;
+            /**
+             * Is Global
+             * @default false
+             */
+            is_global: boolean;
+            /** Score */
+            score: number;
+        };
+        /** TemplateMatchListResponse */
+        TemplateMatchListResponse: {
+            /** Items */
+            items: components["schemas"]["TemplateMatch"][];
         };
         /** TemplateResponse */
         TemplateResponse: {
@@ -1122,6 +1322,13 @@ export interface operations {
                     "application/json": components["schemas"]["TokenResponse"];
                 };
             };
+            /** @description Demasiados inicios de sesión simultáneos (ver Retry-After) */
+            503: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content?: never;
+            };
             /** @description Validation Error */
             422: {
                 headers: {
@@ -1213,6 +1420,12 @@ export interface operations {
                 search?: string | null;
                 limit?: number;
                 offset?: number;
+                /** @description offset (por defecto) o cursor (keyset, coste constante) */
+                pagination?: "offset" | "cursor";
+                /** @description next_cursor de la página anterior */
+                cursor?: string | null;
+                /** @description window (exacto), estimate (planificador) o none (solo has_more) */
+                total_mode?: "window" | "estimate" | "none";
             };
             header?: never;
             path?: never;
@@ -1276,7 +1489,9 @@ export interface operations {
     get_patient_api_v1_patients__patient_id__get: {
         parameters: {
             query?: never;
-            header?: never;
+            header?: {
+                "if-none-match"?: string | null;
+            };
             path: {
                 patient_id: string;
             };
@@ -1290,7 +1505,7 @@ export interface operations {
                     [name: string]: unknown;
                 };
                 content: {
-                    "application/json": components["schemas"]["PatientResponse"];
+                    "application/json": components["schemas"]["PatientDetailResponse"];
                 };
             };
             /** @description Validation Error */
@@ -1440,6 +1655,12 @@ export interface operations {
             query?: {
                 limit?: number;
                 offset?: number;
+                /** @description offset (por defecto) o cursor (keyset, coste constante) */
+                pagination?: "offset" | "cursor";
+                /** @description next_cursor de la página anterior */
+                cursor?: string | null;
+                /** @description window (exacto), estimate (planificador) o none (solo has_more) */
+                total_mode?: "window" | "estimate" | "none";
             };
             header?: never;
             path: {
@@ -1507,7 +1728,9 @@ export interface operations {
     get_encounter_api_v1_encounters__encounter_id__get: {
         parameters: {
             query?: never;
-            header?: never;
+            header?: {
+                "if-none-match"?: string | null;
+            };
             path: {
                 encounter_id: string;
             };
@@ -1579,8 +1802,12 @@ export interface operations {
                 favorites_only?: boolean;
                 limit?: number;
                 offset?: number;
+                /** @description window (exacto), estimate (planificador) o none (solo has_more) */
+                total_mode?: "window" | "estimate" | "none";
+            };
+            header?: {
+                "if-none-match"?: string | null;
             };
-            header?: never;
             path?: never;
             cookie?: never;
         };
@@ -1671,6 +1898,39 @@ export interface operations {
             };
         };
     };
+    match_templates_api_v1_templates_matches_get: {
+        parameters: {
+            query: {
+                /** @description Diagnosis text or ICD-10 code to match */
+                diagnosis: string;
+                limit?: number;
+            };
+            header?: never;
+            path?: never;
+            cookie?: never;
+        };
+        requestBody?: never;
+        responses: {
+            /** @description Successful Response */
+            200: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["TemplateMatchListResponse"];
+                };
+            };
+            /** @description Validation Error */
+            422: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content: {
+                    "application/json": components["schemas"]["HTTPValidationError"];
+                };
+            };
+        };
+    };
     get_template_api_v1_templates__template_id__get: {
         parameters: {
             query?: never;
@@ -1817,6 +2077,13 @@ export interface operations {
                     "application/json": unknown;
                 };
             };
+            /** @description Cola de generación de PDF llena (ver Retry-After) */
+            503: {
+                headers: {
+                    [name: string]: unknown;
+                };
+                content?: never;
+            };
             /** @description Validation Error */
             422: {
                 headers: {